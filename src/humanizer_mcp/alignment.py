@@ -0,0 +1,586 @@
+"""Sentence alignment of an original text with its humanized rewrite.
+
+A humanization pass usually rewrites a minority of the sentences.
+:class:`TextAlignment` cuts both texts into sentences at the streaming
+analyser's safe cuts and aligns them on their exact text: sentences that
+occur once in each text anchor the alignment (the longest run of anchors
+in the same order, as in patience diff) and the gaps between anchors are
+aligned by :class:`difflib.SequenceMatcher`.
+
+No word, sentence or lexicon match runs across a safe cut, so the
+tokenisation of a text is the concatenation of its units' tokenisations.
+:data:`UNIT_CACHE` keeps one record per unit, keyed by the unit's text;
+:func:`compute_all_metrics_pair` tokenises only the units no cached record
+covers and splices each document together from the records, so an
+unchanged sentence is tokenised once however short the unchanged run
+around it.  Both results equal ``compute_all_metrics`` on the whole
+texts.  :func:`sentence_changes` lists the changed, inserted and deleted
+sentences with their per-sentence metric deltas.
+
+The cache budget counts characters of unit text, from
+``HUMANIZER_UNIT_CACHE_BYTES`` (default 8 MiB; ``0`` disables it).
+"""
+
+import difflib
+import math
+import os
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from itertools import accumulate, chain
+
+from humanizer_mcp import cache
+from humanizer_mcp.metrics import (
+    _CONTRACTION_RE,
+    _FIRST_PERSON_RE,
+    _LEXICON_MATCHER,
+    AnalyzedDocument,
+    TextSpans,
+    TOKEN_ABSTRACT,
+    TOKEN_ALPHA,
+    _scan_paragraphs,
+    _token_features,
+    compute_all_metrics,
+)
+from humanizer_mcp.parallel import wants_parallel
+from humanizer_mcp.streaming import _safe_cuts
+from humanizer_mcp.vocabulary import Vocabulary, current_vocabulary
+
+
+_UNIT_CACHE_BYTES_ENV = "HUMANIZER_UNIT_CACHE_BYTES"
+_DEFAULT_UNIT_CACHE_BYTES = 8 * 1024 * 1024
+
+_SENTENCE_METRICS = (
+    "length", "question", "hedges", "connectives", "pronouns", "contractions",
+    "abstract_nouns", "mean_surprisal",
+)
+
+
+# ---------------------------------------------------------------------------
+# Alignment
+# ---------------------------------------------------------------------------
+
+def sentence_units(text: str) -> list[str]:
+    """Cut *text* at every safe cut.
+
+    Each unit is one sentence with the whitespace before it (a sentence
+    holding a protected abbreviation or an open parenthesis runs on to
+    the next cut).  The units concatenate back to *text*.
+    """
+    units: list[str] = []
+    start = 0
+    for cut in _safe_cuts(text):
+        units.append(text[start:cut])
+        start = cut
+    if start < len(text):
+        units.append(text[start:])
+    return units
+
+
+def _anchors(a: list[str], b: list[str]) -> list[tuple[int, int]]:
+    """Return the positions of the units unique to both lists that stay in order.
+
+    Of the pairs of units occurring exactly once in *a* and once in *b*,
+    the longest run increasing in both lists (patience sorting).
+    """
+    counts_a, counts_b = Counter(a), Counter(b)
+    position = {unit: i for i, unit in enumerate(a) if counts_a[unit] == 1}
+    pairs = [(position[unit], j) for j, unit in enumerate(b) if counts_b[unit] == 1 and unit in position]
+
+    tails: list[int] = []  # smallest a-position ending a run of each length
+    ends: list[int] = []  # index in *pairs* of that run's last pair
+    previous = [-1] * len(pairs)
+    for k, (i, _) in enumerate(pairs):
+        length = bisect_left(tails, i)
+        if length:
+            previous[k] = ends[length - 1]
+        if length == len(tails):
+            tails.append(i)
+            ends.append(k)
+        else:
+            tails[length] = i
+            ends[length] = k
+    anchors: list[tuple[int, int]] = []
+    k = ends[-1] if ends else -1
+    while k >= 0:
+        anchors.append(pairs[k])
+        k = previous[k]
+    return anchors[::-1]
+
+
+def _append_opcode(opcodes: list, tag: str, i1: int, i2: int, j1: int, j2: int) -> None:
+    """Append an opcode, merging it into the last one if both are equal or both changes."""
+    if opcodes and (opcodes[-1][0] == "equal") == (tag == "equal"):
+        _, i1, _, j1, _ = opcodes.pop()
+    if tag != "equal":
+        tag = "replace" if i1 < i2 and j1 < j2 else "delete" if i1 < i2 else "insert"
+    opcodes.append((tag, i1, i2, j1, j2))
+
+
+def align_sentences(a: list[str], b: list[str]) -> list[tuple[str, int, int, int, int]]:
+    """Return ``difflib``-style opcodes turning the units *a* into *b*.
+
+    Equal runs and changes alternate; a change is ``"replace"``,
+    ``"delete"`` or ``"insert"``.
+    """
+    opcodes: list = []
+    i = j = 0
+    for anchor_a, anchor_b in _anchors(a, b) + [(len(a), len(b))]:
+        if anchor_a > i or anchor_b > j:
+            matcher = difflib.SequenceMatcher(None, a[i:anchor_a], b[j:anchor_b], autojunk=False)
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                _append_opcode(opcodes, tag, i + i1, i + i2, j + j1, j + j2)
+        if anchor_a < len(a):
+            _append_opcode(opcodes, "equal", anchor_a, anchor_a + 1, anchor_b, anchor_b + 1)
+        i, j = anchor_a + 1, anchor_b + 1
+    return opcodes
+
+
+class TextAlignment:
+    """The sentence units of an original and a humanized text, aligned.
+
+    ``original`` and ``humanized`` hold the units of :func:`sentence_units`
+    and ``opcodes`` the alignment of :func:`align_sentences`.
+    """
+
+    def __init__(self, original: str, humanized: str) -> None:
+        self.original = sentence_units(original)
+        self.humanized = sentence_units(humanized)
+        self.opcodes = align_sentences(self.original, self.humanized)
+
+
+# ---------------------------------------------------------------------------
+# Per-unit tokenisation records
+# ---------------------------------------------------------------------------
+
+class _UnitRecord:
+    """The tokenisation of one sentence unit, cut out of the document it was analysed in.
+
+    Offsets and word indices are those of that document, whose unit
+    started at character ``start`` and word ``first_word``; the slices
+    are rebased when spliced into another text.  Token IDs belong to the
+    vocabulary of the :class:`UnitCache` holding the record.
+    """
+
+    __slots__ = (
+        "start", "size", "first_word", "word_starts", "word_ends",
+        "sentence_starts", "sentence_ends", "sentence_first_words", "sentence_lengths",
+        "token_ids", "token_features", "lexicon", "pronouns", "contractions",
+    )
+
+
+def _unit_records(doc: AnalyzedDocument, units: list[str]) -> list[_UnitRecord]:
+    """Cut the tokenisation of *doc*, whose text is *units* joined, into one record per unit."""
+    text, spans = doc.text, doc.spans
+    offsets = list(accumulate(map(len, units), initial=0))
+    lower = doc.lower
+    if len(lower) == len(text):
+        lower_offsets = offsets
+    else:  # some character changes length when lower-cased
+        lower_offsets = list(accumulate((len(unit.lower()) for unit in units), initial=0))
+
+    # One scan per pattern serves both the records and the document.
+    hits = _LEXICON_MATCHER.find(lower)
+    hit_offsets = [hit[0] for hit in hits]
+    pronoun_matches = list(_FIRST_PERSON_RE.finditer(text))
+    contraction_matches = list(_CONTRACTION_RE.finditer(text))
+    doc.fill(
+        lexicon_counts=_lexicon_counts(hits),
+        pronouns=[m.group() for m in pronoun_matches],
+        contractions=[m.group() for m in contraction_matches],
+    )
+    pronouns, contractions = doc.pronouns, doc.contractions
+    pronoun_offsets = [m.start() for m in pronoun_matches]
+    contraction_offsets = [m.start() for m in contraction_matches]
+
+    word_starts, word_ends = spans.word_starts, spans.word_ends
+    sentence_starts = spans.sentence_starts
+    token_ids, features = doc.token_ids, doc.token_features
+    records: list[_UnitRecord] = []
+    word = sentence = hit = pronoun = contraction = 0
+    for k in range(len(units)):
+        start, end = offsets[k], offsets[k + 1]
+        last_word = bisect_left(word_starts, end, word)
+        last_sentence = bisect_left(sentence_starts, end, sentence)
+        last_hit = bisect_left(hit_offsets, lower_offsets[k + 1], hit)
+        last_pronoun = bisect_left(pronoun_offsets, end, pronoun)
+        last_contraction = bisect_left(contraction_offsets, end, contraction)
+        record = _UnitRecord()
+        record.start = start
+        record.size = end - start
+        record.first_word = word
+        record.word_starts = word_starts[word:last_word]
+        record.word_ends = word_ends[word:last_word]
+        record.sentence_starts = sentence_starts[sentence:last_sentence]
+        record.sentence_ends = spans.sentence_ends[sentence:last_sentence]
+        record.sentence_first_words = spans.sentence_first_words[sentence:last_sentence]
+        record.sentence_lengths = spans.sentence_lengths[sentence:last_sentence]
+        record.token_ids = token_ids[word:last_word]
+        record.token_features = features[word:last_word]
+        record.lexicon = hits[hit:last_hit]
+        record.pronouns = pronouns[pronoun:last_pronoun]
+        record.contractions = contractions[contraction:last_contraction]
+        records.append(record)
+        word, sentence, hit = last_word, last_sentence, last_hit
+        pronoun, contraction = last_pronoun, last_contraction
+    return records
+
+
+def _lexicon_counts(hits) -> dict[str, Counter]:
+    """Return ``LexiconMatcher.count`` of the ``(offset, category, entry)`` *hits*."""
+    counts: dict[str, Counter] = {category: Counter() for category in _LEXICON_MATCHER.categories}
+    for _, category, entry in hits:
+        counts[category][entry] += 1
+    return counts
+
+
+def _splice(text: str, records: list[_UnitRecord]) -> dict:
+    """Return the tokenisations of *text*, whose units have *records*, by name."""
+    spans = TextSpans()
+    word_starts, word_ends = spans.word_starts, spans.word_ends
+    sentence_starts, sentence_ends = spans.sentence_starts, spans.sentence_ends
+    token_ids = array("I")
+    start = word = 0
+    for record in records:
+        shift = start - record.start
+        if shift:
+            add = shift.__add__
+            word_starts.extend(map(add, record.word_starts))
+            word_ends.extend(map(add, record.word_ends))
+            sentence_starts.extend(map(add, record.sentence_starts))
+            sentence_ends.extend(map(add, record.sentence_ends))
+        else:
+            word_starts.extend(record.word_starts)
+            word_ends.extend(record.word_ends)
+            sentence_starts.extend(record.sentence_starts)
+            sentence_ends.extend(record.sentence_ends)
+        shift = word - record.first_word
+        spans.sentence_first_words.extend(
+            map(shift.__add__, record.sentence_first_words) if shift else record.sentence_first_words,
+        )
+        spans.sentence_lengths.extend(record.sentence_lengths)
+        token_ids.extend(record.token_ids)
+        start += record.size
+        word += len(record.token_ids)
+    _scan_paragraphs(text, spans)
+    return {
+        "spans": spans,
+        "token_ids": token_ids,
+        "token_features": b"".join(record.token_features for record in records),
+        "lexicon_counts": _lexicon_counts(chain.from_iterable(record.lexicon for record in records)),
+        "pronouns": list(chain.from_iterable(record.pronouns for record in records)),
+        "contractions": list(chain.from_iterable(record.contractions for record in records)),
+    }
+
+
+class UnitCache:
+    """Thread-safe LRU of per-unit tokenisation records keyed by unit text.
+
+    The budget counts characters of unit text; the records take a few
+    times that.  Records hold token IDs, so the cache empties itself when
+    it is used with a different vocabulary (the process-wide one is
+    replaced once full).
+    """
+
+    def __init__(self, max_bytes: int = _DEFAULT_UNIT_CACHE_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._records: OrderedDict[str, _UnitRecord] = OrderedDict()
+        self._bytes = 0
+        self._vocabulary: Vocabulary | None = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _bind(self, vocabulary: Vocabulary) -> None:
+        if vocabulary is not self._vocabulary:
+            self._records.clear()
+            self._bytes = 0
+            self._vocabulary = vocabulary
+
+    def get_many(self, vocabulary: Vocabulary, units) -> dict[str, _UnitRecord]:
+        """Return the cached records of those *units* that have one."""
+        found: dict[str, _UnitRecord] = {}
+        with self._lock:
+            self._bind(vocabulary)
+            records = self._records
+            for unit in units:
+                record = records.get(unit)
+                if record is None:
+                    self.misses += 1
+                    continue
+                records.move_to_end(unit)
+                found[unit] = record
+                self.hits += 1
+        return found
+
+    def put_many(self, vocabulary: Vocabulary, records: dict[str, _UnitRecord]) -> None:
+        with self._lock:
+            self._bind(vocabulary)
+            for unit, record in records.items():
+                if len(unit) > self.max_bytes:
+                    continue
+                if self._records.pop(unit, None) is not None:
+                    self._bytes -= len(unit)
+                self._records[unit] = record
+                self._bytes += len(unit)
+            while self._bytes > self.max_bytes:
+                evicted, _ = self._records.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._records),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+UNIT_CACHE = UnitCache(int(os.environ.get(_UNIT_CACHE_BYTES_ENV, _DEFAULT_UNIT_CACHE_BYTES)))
+
+
+def _own_document(source: "str | AnalyzedDocument", vocabulary: Vocabulary) -> AnalyzedDocument:
+    """Return *source* as a document whose token IDs come from *vocabulary*."""
+    if isinstance(source, AnalyzedDocument):
+        source.fill(vocabulary=vocabulary)
+        if source.vocabulary is vocabulary:
+            return source
+        source = source.text
+    return AnalyzedDocument(source, vocabulary)
+
+
+def _gather(
+    sources: "list[str | AnalyzedDocument]",
+    units: list[list[str]],
+    vocabulary: Vocabulary,
+) -> tuple[dict[str, _UnitRecord], list[AnalyzedDocument | None]]:
+    """Return the record of every unit in *units*, and the sources tokenised whole.
+
+    A source that is an already tokenised ``AnalyzedDocument`` supplies the
+    records of its units.  The units of any other source that no record
+    covers are joined in text order and tokenised as one batch; when that
+    is every unit, the source itself is tokenised.  New records are added
+    to :data:`UNIT_CACHE`.
+    """
+    records = UNIT_CACHE.get_many(vocabulary, dict.fromkeys(chain.from_iterable(units)))
+    fresh: dict[str, _UnitRecord] = {}
+    whole: list[AnalyzedDocument | None] = [None] * len(sources)
+    for k, source in enumerate(sources):
+        if (
+            isinstance(source, AnalyzedDocument) and "token_ids" in source.__dict__  # built already
+            and source.vocabulary is vocabulary
+        ):
+            fresh.update(zip(units[k], _unit_records(source, units[k])))
+            whole[k] = source
+    records.update(fresh)
+    for k, source in enumerate(sources):
+        if whole[k] is not None:
+            continue
+        missing = list(dict.fromkeys(unit for unit in units[k] if unit not in records))
+        if not missing:
+            continue
+        if len(missing) == len(units[k]):
+            batch = whole[k] = _own_document(source, vocabulary)
+        else:
+            batch = AnalyzedDocument("".join(missing), vocabulary)
+        found = dict(zip(missing, _unit_records(batch, missing)))
+        records.update(found)
+        fresh.update(found)
+    UNIT_CACHE.put_many(vocabulary, fresh)
+    return records, whole
+
+
+def unit_documents(
+    sources: "list[str | AnalyzedDocument]",
+    units: list[list[str]],
+) -> list[AnalyzedDocument]:
+    """Return a tokenised document for each source, whose sentence units are in *units*.
+
+    Units with a record in :data:`UNIT_CACHE` are not tokenised again (see
+    :func:`_gather`); the other documents are spliced together from the
+    records of their units.  A source ``AnalyzedDocument`` gets the
+    spliced tokenisations filled in, so later tools reading it reuse them.
+    """
+    vocabulary = current_vocabulary()
+    records, documents = _gather(sources, units, vocabulary)
+    for k, source in enumerate(sources):
+        if documents[k] is None:
+            doc = documents[k] = _own_document(source, vocabulary)
+            doc.fill(**_splice(doc.text, [records[unit] for unit in units[k]]))
+    return documents
+
+
+# ---------------------------------------------------------------------------
+# Metrics of both texts
+# ---------------------------------------------------------------------------
+
+def compute_all_metrics_pair(
+    alignment: TextAlignment,
+    before: dict | None = None,
+    after: dict | None = None,
+) -> tuple[dict, dict]:
+    """Return ``compute_all_metrics`` of both aligned texts, tokenising shared units once.
+
+    *before* and *after* are the keyword arguments of each analysis
+    (``pattern_score``, ``structural_penalty``, ``non_native``,
+    ``scoring_version``).
+    """
+    units = [alignment.original, alignment.humanized]
+    original, humanized = unit_documents(["".join(side) for side in units], units)
+    return (
+        compute_all_metrics(original, **(before or {})),
+        compute_all_metrics(humanized, **(after or {})),
+    )
+
+
+def _analyse_and_store(text: "str | AnalyzedDocument", pattern_score: float) -> dict:
+    kwargs = {
+        "pattern_score": pattern_score,
+        "structural_penalty": 0,
+        "non_native": False,
+        "scoring_version": "v3",
+        "metrics": None,
+    }
+    result = cache._analyse(text, kwargs)
+    cache.store_metrics(result, text, **kwargs)
+    return result
+
+
+def compute_all_metrics_pair_cached(
+    original: "str | AnalyzedDocument",
+    humanized: "str | AnalyzedDocument",
+    pattern_score_before: float = 0,
+    pattern_score_after: float = 0,
+    alignment: TextAlignment | None = None,
+) -> tuple[dict, dict]:
+    """Full results for an original and a humanized text, through the result cache.
+
+    A result already cached is reused.  The texts that miss are cut into
+    sentence units (those of *alignment* when given) and tokenised through
+    :func:`unit_documents`, so units either text shares with the other or
+    with an earlier call are not tokenised again.  Texts long enough to be
+    split across processes are always analysed whole.
+    """
+    sources = [original, humanized]
+    scores = (pattern_score_before, pattern_score_after)
+    results = [cache.cached_metrics(source, pattern_score=score) for source, score in zip(sources, scores)]
+    misses = [k for k, result in enumerate(results) if result is None]
+    texts = [source.text if isinstance(source, AnalyzedDocument) else source for source in sources]
+    if misses and not wants_parallel(max(len(texts[k]) for k in misses)):
+        if alignment is not None:
+            units = [(alignment.original, alignment.humanized)[k] for k in misses]
+        else:
+            units = [sentence_units(texts[k]) for k in misses]
+        for k, document in zip(misses, unit_documents([sources[k] for k in misses], units)):
+            sources[k] = document
+    for k in misses:
+        results[k] = _analyse_and_store(sources[k], scores[k])
+    return results[0], results[1]
+
+
+# ---------------------------------------------------------------------------
+# Sentence-level report
+# ---------------------------------------------------------------------------
+
+def _unit_metrics(units: list[str]) -> list[dict]:
+    """Return the per-sentence metrics of every unit in *units*.
+
+    Read from the units' records, so units with a cached record are not
+    tokenised again; the others are analysed as one text (see :func:`_gather`).
+    """
+    vocabulary = current_vocabulary()
+    records, _ = _gather(["".join(units)], [units], vocabulary)
+    surprisal_by_id = _token_features(vocabulary)[2]
+    metrics: list[dict] = []
+    for unit in units:
+        record = records[unit]
+        surprisals = [
+            surprisal_by_id[token]
+            for token, flags in zip(record.token_ids, record.token_features)
+            if flags & TOKEN_ALPHA
+        ]
+        categories = Counter(category for _, category, _ in record.lexicon)
+        metrics.append({
+            "length": sum(record.sentence_lengths),
+            "question": sum(1 for end in record.sentence_ends if unit[end - record.start - 1] == "?"),
+            "hedges": categories["hedge"],
+            "connectives": categories["connective"],
+            "pronouns": len(record.pronouns),
+            "contractions": len(record.contractions),
+            "abstract_nouns": sum(1 for flags in record.token_features if flags & TOKEN_ABSTRACT),
+            "mean_surprisal": math.fsum(surprisals) / len(surprisals) if surprisals else 0.0,
+        })
+    return metrics
+
+
+def _metric_delta(before: dict | None, after: dict | None) -> dict:
+    return {
+        name: round((after[name] if after else 0) - (before[name] if before else 0), 4)
+        for name in _SENTENCE_METRICS
+    }
+
+
+def sentence_changes(alignment: TextAlignment) -> dict:
+    """List the sentences a rewrite changed, inserted and deleted.
+
+    Within a changed region, sentences are paired in order; the surplus
+    on either side counts as deleted or inserted.  Indices are positions
+    in the alignment's sentence units.  Every entry carries ``delta``, the
+    change in per-sentence metrics (length in words, question, hedges,
+    connectives, first-person pronouns, contractions, abstract nouns and
+    mean word surprisal); only changed sentences are analysed.
+    """
+    pairs: list[tuple[int, int]] = []
+    deleted: list[int] = []
+    inserted: list[int] = []
+    unchanged = 0
+    for tag, i1, i2, j1, j2 in alignment.opcodes:
+        if tag == "equal":
+            unchanged += i2 - i1
+            continue
+        paired = min(i2 - i1, j2 - j1)
+        pairs.extend(zip(range(i1, i1 + paired), range(j1, j1 + paired)))
+        deleted.extend(range(i1 + paired, i2))
+        inserted.extend(range(j1 + paired, j2))
+
+    original = sorted([i for i, _ in pairs] + deleted)
+    humanized = sorted([j for _, j in pairs] + inserted)
+    before = dict(zip(original, _unit_metrics([alignment.original[i] for i in original])))
+    after = dict(zip(humanized, _unit_metrics([alignment.humanized[j] for j in humanized])))
+    return {
+        "original_sentences": len(alignment.original),
+        "humanized_sentences": len(alignment.humanized),
+        "unchanged": unchanged,
+        "changed": [
+            {
+                "original_index": i,
+                "humanized_index": j,
+                "original": alignment.original[i].strip(),
+                "humanized": alignment.humanized[j].strip(),
+                "delta": _metric_delta(before[i], after[j]),
+            }
+            for i, j in pairs
+        ],
+        "inserted": [
+            {"humanized_index": j, "text": alignment.humanized[j].strip(), "delta": _metric_delta(None, after[j])}
+            for j in inserted
+        ],
+        "deleted": [
+            {"original_index": i, "text": alignment.original[i].strip(), "delta": _metric_delta(before[i], None)}
+            for i in deleted
+        ],
+    }
@@ -0,0 +1,99 @@
+"""Corpus-scale batch scoring across worker processes.
+
+``compute_metrics_many`` runs ``compute_all_metrics`` over many documents
+on a ``ProcessPoolExecutor`` and returns the results in input order.
+"""
+
+import os
+from collections.abc import Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+
+from humanizer_mcp.metrics import _load_word_frequencies, compute_all_metrics, resolve_metrics
+from humanizer_mcp.streaming import compute_all_metrics_stream, iter_file_chunks
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+def _init_worker() -> None:
+    """Load the word frequency table once per worker, before any document."""
+    _load_word_frequencies()
+
+
+def _score_text(text: str, **kwargs) -> dict:
+    return compute_all_metrics(text, **kwargs)
+
+
+def _score_path(
+    path: str,
+    encoding: str = "utf-8",
+    metrics: list[str] | None = None,
+    **kwargs,
+) -> dict:
+    # Files are streamed so a book-length manuscript never sits in memory
+    # whole; the result is identical to compute_all_metrics on its text.
+    # The streaming analyser always computes the full set, so a *metrics*
+    # selection is applied afterwards.
+    try:
+        result = compute_all_metrics_stream(iter_file_chunks(path, encoding=encoding), **kwargs)
+    except (OSError, UnicodeDecodeError) as exc:
+        return {"path": path, "error": f"{type(exc).__name__}: {exc}"}
+    if metrics is not None:
+        selected = set(metrics)
+        result = {name: value for name, value in result.items() if name in selected}
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Dispatch
+# ---------------------------------------------------------------------------
+
+def _default_chunksize(item_count: int, workers: int) -> int:
+    # Same heuristic as multiprocessing.Pool.map: about four chunks per
+    # worker, enough to balance uneven document lengths.
+    chunksize, extra = divmod(item_count, workers * 4)
+    return chunksize + 1 if extra else max(chunksize, 1)
+
+
+def compute_metrics_many(
+    documents: Iterable[str],
+    from_files: bool = False,
+    max_workers: int | None = None,
+    chunksize: int | None = None,
+    encoding: str = "utf-8",
+    executor: Executor | None = None,
+    **kwargs,
+) -> list[dict]:
+    """Run ``compute_all_metrics`` over *documents* in parallel.
+
+    *documents* are texts, or file paths when *from_files* is true (each
+    worker then reads its own files; unreadable ones yield an ``error``
+    entry instead of aborting the batch).  Remaining keyword arguments,
+    including a ``metrics`` selection, are passed to ``compute_all_metrics``.  Results come back in input order.
+    With a single worker or document the work runs in-process.
+
+    Given an *executor* (the server's worker pool), the documents are
+    submitted to it rather than to a pool of their own, and *max_workers*
+    only sizes the chunks.
+    """
+    items = list(documents)
+    if kwargs.get("metrics") is not None:
+        resolve_metrics(kwargs["metrics"])  # reject unknown names before any work
+    if from_files:
+        score = partial(_score_path, encoding=encoding, **kwargs)
+    else:
+        score = partial(_score_text, **kwargs)
+
+    workers = min(max_workers or os.cpu_count() or 1, len(items))
+    if executor is not None and items:
+        chunksize = chunksize or _default_chunksize(len(items), workers)
+        return list(executor.map(score, items, chunksize=chunksize))
+    if workers <= 1:
+        return [score(item) for item in items]
+
+    if chunksize is None:
+        chunksize = _default_chunksize(len(items), workers)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return list(pool.map(score, items, chunksize=chunksize))
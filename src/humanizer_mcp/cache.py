@@ -0,0 +1,400 @@
+"""Content-addressed result cache for ``compute_all_metrics``.
+
+Humanization sessions re-score the same text many times (every verify pass
+re-analyses the original, status and diff follow a fresh analysis).  The
+cache keys results by a BLAKE2b digest of the text and the scoring
+arguments and evicts least-recently-used entries under a byte budget.
+
+Two tiers are available:
+
+* an in-process LRU, budget from ``HUMANIZER_CACHE_BYTES`` (default
+  64 MiB; ``0`` disables it);
+* an optional SQLite file shared by every server process on the machine
+  and surviving restarts, enabled by pointing ``HUMANIZER_DISK_CACHE`` at
+  a database path, capped by ``HUMANIZER_DISK_CACHE_BYTES`` (default
+  256 MiB of compressed results).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from humanizer_mcp import __version__
+from humanizer_mcp.metrics import AnalyzedDocument, compute_all_metrics
+from humanizer_mcp.parallel import compute_all_metrics_parallel, wants_parallel
+
+
+_CACHE_BYTES_ENV = "HUMANIZER_CACHE_BYTES"
+_DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_DISK_CACHE_ENV = "HUMANIZER_DISK_CACHE"
+_DISK_CACHE_BYTES_ENV = "HUMANIZER_DISK_CACHE_BYTES"
+_DEFAULT_DISK_MAX_BYTES = 256 * 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+# Results computed by a different release are never served: the version is
+# part of every disk key and stale rows are purged when a cache is opened.
+ENGINE_VERSION = __version__
+
+
+def result_key(text: str, **kwargs) -> bytes:
+    """Return the cache key for analysing *text* with *kwargs*."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(text.encode("utf-8", "surrogatepass"))
+    digest.update(b"\0")
+    digest.update(json.dumps(kwargs, sort_keys=True).encode("ascii"))
+    return digest.digest()
+
+
+class ResultCache:
+    """Thread-safe LRU cache of result dicts bounded by serialised size.
+
+    Entries are stored as JSON, which is also what the budget counts, so
+    every hit returns a fresh object the caller is free to modify.
+    """
+
+    def __init__(self, max_bytes: int = _DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[bytes, str] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: bytes) -> dict | None:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return json.loads(payload)
+
+    def put(self, key: bytes, result: dict) -> None:
+        payload = json.dumps(result)
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = payload
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class DiskCache:
+    """SQLite-backed result cache shared between processes.
+
+    The database runs in WAL mode so concurrent readers never block the
+    writer, and every thread uses its own connection.  Results are stored
+    as zlib-compressed JSON; once their total size exceeds *max_bytes* the
+    least recently read rows are deleted until the cache is back under 90%
+    of the cap.  SQLite errors are counted and treated as misses so a
+    locked or damaged cache file never fails an analysis.
+
+    The size of the table is tracked as a running total of this process's
+    writes; it is summed exactly only when that total passes the cap or
+    every ``_SYNC_INTERVAL`` writes, which picks up other processes' rows.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS results (
+            key      BLOB PRIMARY KEY,
+            engine   TEXT NOT NULL,
+            payload  BLOB NOT NULL,
+            size     INTEGER NOT NULL,
+            accessed REAL NOT NULL
+        )
+    """
+
+    _SYNC_INTERVAL = 64
+
+    def __init__(self, path: str, max_bytes: int = _DEFAULT_DISK_MAX_BYTES) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._bytes = 0
+        self._unsynced = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        with conn:
+            conn.execute(self._SCHEMA)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)",
+            )
+            conn.execute("DELETE FROM results WHERE engine != ?", (ENGINE_VERSION,))
+        self._bytes = self._total(conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _total(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, key: bytes) -> dict | None:
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT payload FROM results WHERE key = ?", (key,),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key),
+                )
+        except sqlite3.Error:
+            self._count("errors")
+            return None
+        if row is None:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key: bytes, result: dict) -> None:
+        payload = zlib.compress(json.dumps(result).encode("utf-8"))
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, engine, payload, size, accessed)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, ENGINE_VERSION, payload, len(payload), time.time()),
+            )
+            # A replaced row is counted twice, which only brings the next
+            # exact check forward.
+            with self._lock:
+                self._bytes += len(payload)
+                self._unsynced += 1
+                check = self._bytes > self.max_bytes or self._unsynced >= self._SYNC_INTERVAL
+            if check:
+                self._evict(conn)
+        except sqlite3.Error:
+            self._count("errors")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = self._total(conn)
+        if total > self.max_bytes:
+            self._delete_oldest(conn, total - int(self.max_bytes * 0.9))
+            total = self._total(conn)
+        with self._lock:
+            self._bytes = total
+            self._unsynced = 0
+
+    @staticmethod
+    def _delete_oldest(conn: sqlite3.Connection, excess: int) -> None:
+        # Delete the least recently read rows until *excess* bytes are freed.
+        conn.execute(
+            """
+            DELETE FROM results WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, size, SUM(size) OVER (
+                        ORDER BY accessed, key ROWS UNBOUNDED PRECEDING
+                    ) AS running
+                    FROM results
+                )
+                WHERE running - size < ?
+            )
+            """,
+            (excess,),
+        )
+
+    def clear(self) -> None:
+        try:
+            self._connect().execute("DELETE FROM results")
+        except sqlite3.Error:
+            self._count("errors")
+        with self._lock:
+            self.hits = self.misses = self.errors = 0
+            self._bytes = self._unsynced = 0
+
+    def stats(self) -> dict:
+        try:
+            entries, size = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results",
+            ).fetchone()
+        except sqlite3.Error:
+            entries = size = None
+        with self._lock:
+            return {
+                "path": self.path,
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+            }
+
+
+RESULT_CACHE = ResultCache(int(os.environ.get(_CACHE_BYTES_ENV, _DEFAULT_MAX_BYTES)))
+
+
+
+def _open_disk_cache() -> DiskCache | None:
+    """Open the cache named by ``HUMANIZER_DISK_CACHE``, or None if unset or unusable."""
+    path = os.environ.get(_DISK_CACHE_ENV)
+    if not path:
+        return None
+    try:
+        return DiskCache(
+            os.path.expanduser(path),
+            int(os.environ.get(_DISK_CACHE_BYTES_ENV, _DEFAULT_DISK_MAX_BYTES)),
+        )
+    except (OSError, sqlite3.Error) as exc:
+        logger.warning("disk cache %s is unavailable, continuing without it: %s", path, exc)
+        return None
+
+
+DISK_CACHE = _open_disk_cache()
+
+
+def _analyse(text: "str | AnalyzedDocument", kwargs: dict) -> dict:
+    """Compute a result on a miss, splitting large full analyses across processes."""
+    raw = text.text if isinstance(text, AnalyzedDocument) else text
+    if kwargs["metrics"] is None and wants_parallel(len(raw)):
+        return compute_all_metrics_parallel(raw, **kwargs)
+    return compute_all_metrics(text, **kwargs)
+
+
+def _cache_key(
+    text: "str | AnalyzedDocument",
+    pattern_score: float,
+    structural_penalty: float,
+    non_native: bool,
+    scoring_version: str,
+    metrics: list[str] | None,
+) -> bytes:
+    key_args = {
+        "pattern_score": float(pattern_score),
+        "structural_penalty": float(structural_penalty),
+        "non_native": bool(non_native),
+        "scoring_version": scoring_version,
+        "engine": ENGINE_VERSION,
+    }
+    if metrics is not None:
+        # Full results keep their original key; selections add a canonical list.
+        key_args["metrics"] = sorted(set(metrics))
+    return result_key(text.text if isinstance(text, AnalyzedDocument) else text, **key_args)
+
+
+def cached_metrics(
+    text: "str | AnalyzedDocument",
+    pattern_score: float = 0,
+    structural_penalty: float = 0,
+    non_native: bool = False,
+    scoring_version: str = "v3",
+    metrics: list[str] | None = None,
+) -> dict | None:
+    """Return the cached ``compute_all_metrics`` result for these arguments, or None.
+
+    A hit on disk is copied into memory.
+    """
+    memory = RESULT_CACHE if RESULT_CACHE.max_bytes > 0 else None
+    disk = DISK_CACHE
+    if memory is None and disk is None:
+        return None
+    key = _cache_key(text, pattern_score, structural_penalty, non_native, scoring_version, metrics)
+    result = memory.get(key) if memory is not None else None
+    if result is None and disk is not None:
+        result = disk.get(key)
+        if result is not None and memory is not None:
+            memory.put(key, result)
+    return result
+
+
+def store_metrics(
+    result: dict,
+    text: "str | AnalyzedDocument",
+    pattern_score: float = 0,
+    structural_penalty: float = 0,
+    non_native: bool = False,
+    scoring_version: str = "v3",
+    metrics: list[str] | None = None,
+) -> None:
+    """Cache *result* as ``compute_all_metrics`` of *text* with these arguments."""
+    memory = RESULT_CACHE if RESULT_CACHE.max_bytes > 0 else None
+    disk = DISK_CACHE
+    if memory is None and disk is None:
+        return
+    key = _cache_key(text, pattern_score, structural_penalty, non_native, scoring_version, metrics)
+    if disk is not None:
+        disk.put(key, result)
+    if memory is not None:
+        memory.put(key, result)
+
+
+def compute_all_metrics_cached(
+    text: "str | AnalyzedDocument",
+    pattern_score: float = 0,
+    structural_penalty: float = 0,
+    non_native: bool = False,
+    scoring_version: str = "v3",
+    metrics: list[str] | None = None,
+) -> dict:
+    """``compute_all_metrics`` backed by ``RESULT_CACHE`` and ``DISK_CACHE``.
+
+    *text* may be an ``AnalyzedDocument``; it is keyed by its text and, on
+    a miss, analysed with the tokenisation it already holds.  A *metrics*
+    selection is cached separately from the full result.
+    """
+    kwargs = {
+        "pattern_score": pattern_score,
+        "structural_penalty": structural_penalty,
+        "non_native": non_native,
+        "scoring_version": scoring_version,
+        "metrics": metrics,
+    }
+    result = cached_metrics(text, **kwargs)
+    if result is None:
+        result = _analyse(text, kwargs)
+        store_metrics(result, text, **kwargs)
+    return result
@@ -0,0 +1,83 @@
+"""Server-side document store for referencing texts by handle.
+
+A client uploads a manuscript once with ``humanizer_load_document`` and
+passes the returned ``doc_id`` to later tool calls instead of re-sending
+the text.  Each stored entry is an ``AnalyzedDocument``, so its
+tokenisation is built once and shared by every tool that reads it; full
+metric results are additionally kept by the content-hash result cache.
+
+The store is an LRU bounded by total text size, from
+``HUMANIZER_DOCUMENT_STORE_BYTES`` (default 32 MiB).
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from humanizer_mcp.metrics import AnalyzedDocument
+
+
+_STORE_BYTES_ENV = "HUMANIZER_DOCUMENT_STORE_BYTES"
+_DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+def document_id(text: str) -> str:
+    """Return the content-addressed handle of *text*."""
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+class DocumentStore:
+    """Thread-safe LRU of ``AnalyzedDocument`` objects keyed by ``doc_id``.
+
+    The budget counts characters of stored text; cached tokenisations add
+    a few times that on top.
+    """
+
+    def __init__(self, max_bytes: int = _DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._documents: OrderedDict[str, AnalyzedDocument] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def add(self, text: str) -> str:
+        """Store *text* (if not already present) and return its ``doc_id``."""
+        doc_id = document_id(text)
+        with self._lock:
+            if doc_id in self._documents:
+                self._documents.move_to_end(doc_id)
+                return doc_id
+            self._documents[doc_id] = AnalyzedDocument(text)
+            self._bytes += len(text)
+            # Always keep the newest document, even if it alone exceeds the budget.
+            while self._bytes > self.max_bytes and len(self._documents) > 1:
+                _, evicted = self._documents.popitem(last=False)
+                self._bytes -= len(evicted.text)
+        return doc_id
+
+    def get(self, doc_id: str) -> AnalyzedDocument:
+        """Return the stored document, raising ValueError for unknown handles."""
+        with self._lock:
+            doc = self._documents.get(doc_id)
+            if doc is None:
+                raise ValueError(
+                    f"Unknown doc_id {doc_id!r}: it was never loaded or has been "
+                    "evicted; load the text again with humanizer_load_document",
+                )
+            self._documents.move_to_end(doc_id)
+            return doc
+
+    def __contains__(self, doc_id: object) -> bool:
+        with self._lock:
+            return doc_id in self._documents
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "documents": len(self._documents),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+DOCUMENT_STORE = DocumentStore(int(os.environ.get(_STORE_BYTES_ENV, _DEFAULT_MAX_BYTES)))
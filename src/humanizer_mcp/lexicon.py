@@ -0,0 +1,274 @@
+"""Lexicon data structures shared by the metric functions.
+
+All algorithms are pure Python — no external NLP libraries required.
+"""
+
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import zlib
+from array import array
+from collections import Counter
+from collections.abc import Iterable, Iterator, Mapping
+from itertools import accumulate
+
+
+# ---------------------------------------------------------------------------
+# Multi-pattern lexicon matcher
+# ---------------------------------------------------------------------------
+
+# Splits text into alternating word / separator runs: [word, sep, word, ...].
+# "Word" follows the regex definition of ``\w`` so single-word entries behave
+# exactly like ``\bentry\b``.
+_WORD_SPLIT_RE = re.compile(r"(\W+)")
+
+# Trie key under which a node stores the (category, entry) pairs ending there.
+# ``None`` can never collide with a word token.
+_TERMINAL = None
+
+
+class LexiconMatcher:
+    """Count entries from several word lists in one pass over a text.
+
+    All entries are compiled once into a trie keyed on word tokens, so the
+    cost of a scan grows with the length of the text rather than with the
+    number or size of the lexicons.  A single-word entry matches on word
+    boundaries (like ``\\bentry\\b``); a multi-word entry matches when its
+    words appear consecutively, separated only by whitespace.  Matching is
+    case-sensitive, so callers pass lowercased text.
+    """
+
+    def __init__(self, lexicons: dict[str, Iterable[str]]) -> None:
+        self._root: dict = {}
+        self.categories = tuple(lexicons)
+        for category, entries in lexicons.items():
+            for entry in entries:
+                self._add(category, entry)
+
+    def _add(self, category: str, entry: str) -> None:
+        words = entry.lower().split()
+        if not words or any(_WORD_SPLIT_RE.search(w) for w in words):
+            raise ValueError(
+                f"Lexicon entry {entry!r} must be one or more words separated by spaces",
+            )
+        node = self._root
+        for word in words:
+            node = node.setdefault(word, {})
+        node.setdefault(_TERMINAL, []).append((category, entry))
+
+    def count(self, text: str) -> dict[str, Counter]:
+        """Return ``{category: Counter(entry -> occurrences)}`` for *text*."""
+        counts: dict[str, Counter] = {category: Counter() for category in self.categories}
+        for _, (category, entry) in self._matches(_WORD_SPLIT_RE.split(text)):
+            counts[category][entry] += 1
+        return counts
+
+    def find(self, text: str) -> list[tuple[int, str, str]]:
+        """Return ``(offset, category, entry)`` for each match in *text*, in order."""
+        parts = _WORD_SPLIT_RE.split(text)
+        offsets = list(accumulate(map(len, parts), initial=0))
+        return [(offsets[i], category, entry) for i, (category, entry) in self._matches(parts)]
+
+    def _matches(self, parts: list[str]) -> Iterator[tuple[int, tuple[str, str]]]:
+        """Yield ``(part index, (category, entry))`` for each match in *parts*."""
+        root = self._root
+        n = len(parts)
+
+        # Words sit at even indices, separators at odd ones.
+        for i in range(0, n, 2):
+            node = root.get(parts[i])
+            j = i
+            while node is not None:
+                for hit in node.get(_TERMINAL, ()):
+                    yield i, hit
+                j += 2
+                if j >= n or not parts[j - 1].isspace():
+                    break
+                node = node.get(parts[j])
+
+
+# ---------------------------------------------------------------------------
+# Memory-mapped word frequency table
+# ---------------------------------------------------------------------------
+
+# File layout (little-endian), all sections 4-byte aligned:
+#
+#   header   magic "HZFQ", u16 version, u16 scale, u32 entries, u32 buckets
+#   buckets  u32[buckets + 1]  index of the first entry in each hash bucket
+#   offsets  u32[entries + 1]  byte offsets of each word in the string blob
+#   values   u16[entries]      round(value * scale), padded to 4 bytes
+#   blob     UTF-8 words, concatenated
+#
+# Entries are grouped by bucket ``crc32(word) & (buckets - 1)`` (then sorted
+# by word), so a lookup compares the key against the one or two words of a
+# single bucket.  With about two entries per bucket the index costs two
+# bytes per word on top of the offsets and values.
+_FREQ_MAGIC = b"HZFQ"
+_FREQ_VERSION = 1
+_FREQ_SCALE = 100  # centi-Zipf: the bundled values carry two decimals
+_FREQ_HEADER = struct.Struct("<4sHHII")
+
+
+def _u32_view(buf, start: int, count: int):
+    """Return ``count`` little-endian u32 values of *buf* from byte *start*."""
+    view = memoryview(buf)[start:start + 4 * count]
+    if sys.byteorder == "little":
+        return view.cast("I")
+    swapped = array("I", view.tobytes())
+    swapped.byteswap()
+    return swapped
+
+
+def _u16_view(buf, start: int, count: int):
+    view = memoryview(buf)[start:start + 2 * count]
+    if sys.byteorder == "little":
+        return view.cast("H")
+    swapped = array("H", view.tobytes())
+    swapped.byteswap()
+    return swapped
+
+
+class FrequencyTable(Mapping):
+    """Read-only ``word -> value`` mapping backed by a memory-mapped file.
+
+    Opening the table maps the file and reads its header; no dict is built,
+    so start-up cost and private memory stay flat however large the lexicon
+    is, and worker processes share the mapped pages.  Values are quantised
+    to ``1 / scale`` and returned as floats.
+    """
+
+    def __init__(self, buffer) -> None:
+        magic, version, scale, entries, buckets = _FREQ_HEADER.unpack_from(buffer, 0)
+        if magic != _FREQ_MAGIC or version != _FREQ_VERSION:
+            raise ValueError("not a frequency table (bad magic or version)")
+        self._buffer = buffer
+        self._scale = scale
+        self._entries = entries
+        self._mask = buckets - 1
+
+        pos = _FREQ_HEADER.size
+        self._buckets = _u32_view(buffer, pos, buckets + 1)
+        pos += 4 * (buckets + 1)
+        self._offsets = _u32_view(buffer, pos, entries + 1)
+        pos += 4 * (entries + 1)
+        self._values = _u16_view(buffer, pos, entries)
+        pos += (2 * entries + 3) & ~3
+        self._blob_start = pos
+
+    @classmethod
+    def open(cls, path: str) -> "FrequencyTable":
+        """Memory-map the table at *path*."""
+        with open(path, "rb") as fh:
+            return cls(mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def _word(self, index: int) -> bytes:
+        base = self._blob_start
+        return self._buffer[base + self._offsets[index]:base + self._offsets[index + 1]]
+
+    def _find(self, word: str) -> int:
+        key = word.encode("utf-8")
+        size = len(key)
+        bucket = zlib.crc32(key) & self._mask
+        buffer, offsets, base = self._buffer, self._offsets, self._blob_start
+        for index in range(self._buckets[bucket], self._buckets[bucket + 1]):
+            start = base + offsets[index]
+            end = base + offsets[index + 1]
+            if end - start == size and buffer[start:end] == key:
+                return index
+        return -1
+
+    def get(self, word: str, default=None):
+        index = self._find(word)
+        if index < 0:
+            return default
+        return self._values[index] / self._scale
+
+    def __getitem__(self, word: str) -> float:
+        index = self._find(word)
+        if index < 0:
+            raise KeyError(word)
+        return self._values[index] / self._scale
+
+    def __contains__(self, word: object) -> bool:
+        return isinstance(word, str) and self._find(word) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self._entries):
+            yield self._word(index).decode("utf-8")
+
+    def __len__(self) -> int:
+        return self._entries
+
+
+def build_frequency_table(
+    frequencies: Mapping[str, float],
+    path: str,
+    scale: int = _FREQ_SCALE,
+) -> None:
+    """Write *frequencies* to *path* in the ``FrequencyTable`` format.
+
+    Raises ValueError if a value does not survive quantisation to
+    ``1 / scale`` exactly or falls outside the u16 range.
+    """
+    bucket_count = 1
+    while 2 * bucket_count < len(frequencies):
+        bucket_count *= 2
+    mask = bucket_count - 1
+
+    def bucket_of(word: str) -> int:
+        return zlib.crc32(word.encode("utf-8")) & mask
+
+    words = sorted(frequencies, key=lambda w: (bucket_of(w), w))
+    values = array("H")
+    for word in words:
+        value = frequencies[word]
+        quantised = round(value * scale)
+        if not 0 <= quantised <= 0xFFFF or quantised / scale != value:
+            raise ValueError(f"value {value!r} for {word!r} is not representable at scale {scale}")
+        values.append(quantised)
+
+    encoded = [w.encode("utf-8") for w in words]
+    offsets = array("I", [0])
+    for key in encoded:
+        offsets.append(offsets[-1] + len(key))
+
+    bucket_sizes = Counter(bucket_of(w) for w in words)
+    buckets = array("I", [0])
+    for bucket in range(bucket_count):
+        buckets.append(buckets[-1] + bucket_sizes[bucket])
+
+    if sys.byteorder != "little":
+        for section in (buckets, offsets, values):
+            section.byteswap()
+
+    with open(path, "wb") as fh:
+        fh.write(_FREQ_HEADER.pack(_FREQ_MAGIC, _FREQ_VERSION, scale, len(words), bucket_count))
+        fh.write(buckets.tobytes())
+        fh.write(offsets.tobytes())
+        fh.write(values.tobytes())
+        fh.write(b"\0" * (-2 * len(values) % 4))
+        fh.write(b"".join(encoded))
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Regenerate the binary frequency table from its JSON source.
+
+    Usage: ``python -m humanizer_mcp.lexicon [SOURCE.json [TARGET.bin]]``;
+    both default to the bundled ``data/word_frequencies`` files.
+    """
+    args = sys.argv[1:] if argv is None else argv
+    data_dir = os.path.join(os.path.dirname(__file__), "data")
+    source = args[0] if args else os.path.join(data_dir, "word_frequencies.json")
+    target = args[1] if len(args) > 1 else os.path.splitext(source)[0] + ".bin"
+
+    with open(source, "r", encoding="utf-8") as fh:
+        frequencies = json.load(fh)
+    build_frequency_table(frequencies, target)
+    print(f"wrote {len(frequencies)} entries to {target}")
+
+
+if __name__ == "__main__":
+    main()
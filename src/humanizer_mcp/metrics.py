@@ -8,7 +8,18 @@ import math
 import os
 import re
 import string
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
 from collections import Counter
+from collections.abc import Mapping
+from functools import cached_property
+from itertools import accumulate, compress
+from operator import sub
+
+from humanizer_mcp.lexicon import FrequencyTable, LexiconMatcher
+from humanizer_mcp.stats import RunningStats
+from humanizer_mcp.vocabulary import Vocabulary, current_vocabulary
 
 
 # ---------------------------------------------------------------------------
@@ -41,78 +52,370 @@ _ABBREVIATIONS = (
     r"Inc", r"Ltd", r"vs", r"i\.e", r"e\.g", r"etc",
 )
 
-# Build a negative‐lookbehind‐style protection pattern.  We replace known
-# abbreviation dots with a placeholder, split, then restore.
+# Matches a known abbreviation together with its final dot.
 _ABBREV_RE = re.compile(
     r"\b(?:" + "|".join(_ABBREVIATIONS) + r")\.",
     re.IGNORECASE,
 )
 
-_PLACEHOLDER = "\x00ABBRDOT\x00"
+# A sentence ends at ".", "!" or "?" followed by whitespace or the end of
+# the text, unless the dot is protected:
+#   * an abbreviation dot ("et al.", "Fig.", "e.g.");
+#   * a dot inside a parenthetical citation closed by ".)", e.g.
+#     "(see Smith et al. 2020. Jones, 2021.)" — the group runs from the
+#     first "(" after the previous ")" and does not count when its closing
+#     dot is itself an abbreviation dot.
+# Decimal dots ("0.45", "p = .001") are always followed by a digit and so
+# never end a sentence.
+_SENTENCE_END_RE = re.compile(r"[.!?](?!\S)")
+_PAREN_RE = re.compile(r"[()]")
+_WHITESPACE_SPLIT_RE = re.compile(r"(\s+)")
+
+
+class TextSpans:
+    """Word, sentence and paragraph boundaries of a text, as offsets.
+
+    Words are the whitespace-delimited runs ``text[word_starts[i]:word_ends[i]]``.
+    Sentences (of three or more words) and paragraphs are recorded as
+    stripped character spans and as word ranges: ``*_first_words[i]`` is
+    the index of their first word and ``*_lengths[i]`` their word count.
+    Everything is computed by :func:`_scan_text` without copying the text.
+    """
 
-# Protect decimal numbers like 0.45 or p = .001
-_DECIMAL_RE = re.compile(r"(\d)\.(\d)")
-_LEADING_DECIMAL_RE = re.compile(r"(?<=\s)\.(\d)")
-_DECIMAL_PLACEHOLDER = "\x00DECDOT\x00"
-_LEADING_DEC_PLACEHOLDER = "\x00LDDOT\x00"
+    __slots__ = (
+        "word_starts", "word_ends",
+        "sentence_starts", "sentence_ends", "sentence_first_words", "sentence_lengths",
+        "paragraph_starts", "paragraph_ends", "paragraph_first_words", "paragraph_lengths",
+    )
 
-# Protect periods inside parenthetical citations e.g. (Author, 2024).
-_PAREN_PERIOD_RE = re.compile(r"\(([^)]*)\.\)")
-_PAREN_PLACEHOLDER = "\x00PARDOT\x00"
+    def __init__(self) -> None:
+        for name in self.__slots__:
+            setattr(self, name, array("I"))
+
+
+def _scan_words(text: str) -> tuple[array, array]:
+    # Splitting with a captured separator yields word, gap, word, ... whose
+    # running lengths are the offsets; only the outer words can be empty.
+    parts = _WHITESPACE_SPLIT_RE.split(text)
+    offsets = array("I", accumulate(map(len, parts), initial=0))
+    first = 0 if parts[0] else 1
+    last = len(parts) // 2 + 1 - (0 if parts[-1] else 1)
+    return offsets[2 * first:2 * last:2], offsets[2 * first + 1:2 * last + 1:2]
+
+
+def _is_abbreviation_dot(text: str, dot: int, word_starts: array) -> bool:
+    # Abbreviations span at most two words ("et al."), and no match can
+    # straddle a word start in a way that hides one ending at *dot*, so
+    # scanning from the previous word reproduces the whole-text matches.
+    word = bisect_right(word_starts, dot) - 1
+    start = word_starts[max(word - 1, 0)]
+    return any(m.end() == dot + 1 for m in _ABBREV_RE.finditer(text, start, dot + 1))
+
+
+def _citation_groups(text: str, word_starts: array) -> tuple[list[int], list[int]]:
+    """Return the (first, last) offsets of parenthetical groups closed by ".)"."""
+    firsts: list[int] = []
+    lasts: list[int] = []
+    opened = -1
+    for m in _PAREN_RE.finditer(text):
+        i = m.start()
+        if text[i] == "(":
+            if opened < 0:
+                opened = i
+            continue
+        if (
+            opened >= 0 and i - 1 > opened and text[i - 1] == "."
+            and not _is_abbreviation_dot(text, i - 1, word_starts)
+        ):
+            firsts.append(opened + 1)
+            lasts.append(i - 1)
+        opened = -1
+    return firsts, lasts
+
+
+def _scan_text(text: str) -> TextSpans:
+    """Find every word, sentence and paragraph boundary of *text* in one pass."""
+    spans = TextSpans()
+    word_starts, word_ends = _scan_words(text)
+    spans.word_starts, spans.word_ends = word_starts, word_ends
+    word_count = len(word_starts)
+
+    # -- sentences: word ranges between unprotected sentence ends
+    if "(" in text and ".)" in text:
+        group_firsts, group_lasts = _citation_groups(text, word_starts)
+    else:
+        group_firsts = group_lasts = []
+    first_word = 0
+    for m in _SENTENCE_END_RE.finditer(text):
+        end = m.start()
+        if text[end] == ".":
+            if _is_abbreviation_dot(text, end, word_starts):
+                continue
+            g = bisect_left(group_lasts, end)
+            if g < len(group_lasts) and group_firsts[g] <= end:
+                continue
+        last_word = bisect_left(word_ends, end + 1) + 1
+        _add_sentence(spans, first_word, last_word)
+        first_word = last_word
+    _add_sentence(spans, first_word, word_count)
+    _scan_paragraphs(text, spans)
+    return spans
+
+
+def _scan_paragraphs(text: str, spans: TextSpans) -> None:
+    """Record the paragraphs of *text*, whose words are already in *spans*."""
+    word_starts = spans.word_starts
+    first_word = 0
+    for m in _PARAGRAPH_SPLIT_RE.finditer(text):
+        last_word = bisect_left(word_starts, m.start(), first_word)
+        _add_paragraph(spans, first_word, last_word)
+        first_word = last_word
+    _add_paragraph(spans, first_word, len(word_starts))
+
+
+_MIN_SENTENCE_WORDS = 3  # shorter sentences are not counted
+
+
+def _add_sentence(spans: TextSpans, first_word: int, last_word: int) -> None:
+    if last_word - first_word >= _MIN_SENTENCE_WORDS:
+        spans.sentence_starts.append(spans.word_starts[first_word])
+        spans.sentence_ends.append(spans.word_ends[last_word - 1])
+        spans.sentence_first_words.append(first_word)
+        spans.sentence_lengths.append(last_word - first_word)
+
+
+def _add_paragraph(spans: TextSpans, first_word: int, last_word: int) -> None:
+    if last_word > first_word:
+        spans.paragraph_starts.append(spans.word_starts[first_word])
+        spans.paragraph_ends.append(spans.word_ends[last_word - 1])
+        spans.paragraph_first_words.append(first_word)
+        spans.paragraph_lengths.append(last_word - first_word)
 
 
 def _tokenize_sentences(text: str) -> list[str]:
     """Split *text* into sentences with abbreviation / decimal protection."""
-    working = text
+    spans = _scan_text(text)
+    return [text[s:e] for s, e in zip(spans.sentence_starts, spans.sentence_ends)]
 
-    # 1. Protect abbreviation dots
-    working = _ABBREV_RE.sub(lambda m: m.group(0)[:-1] + _PLACEHOLDER, working)
 
-    # 2. Protect decimal numbers
-    working = _DECIMAL_RE.sub(rf"\1{_DECIMAL_PLACEHOLDER}\2", working)
-    working = _LEADING_DECIMAL_RE.sub(rf"{_LEADING_DEC_PLACEHOLDER}\1", working)
+# ---------------------------------------------------------------------------
+# Helper: tokenise text into lowercase words
+# ---------------------------------------------------------------------------
 
-    # 3. Protect parenthetical citation dots
-    working = _PAREN_PERIOD_RE.sub(
-        lambda m: "(" + m.group(1).replace(".", _PAREN_PLACEHOLDER) + _PAREN_PLACEHOLDER + ")",
-        working,
-    )
+def _tokenize_words(text: str) -> list[str]:
+    """Return lowercase alphabetic tokens from *text*."""
+    return AnalyzedDocument(text).word_tokens
+
+
+# ---------------------------------------------------------------------------
+# Per-type token features
+# ---------------------------------------------------------------------------
+
+# Lexical classes in the feature bitmask of a vocabulary entry.
+TOKEN_ALNUM = 1      # at least one alphanumeric character (MTLD stream)
+TOKEN_ALPHA = 2      # at least one alphabetic character (word stream)
+TOKEN_ABSTRACT = 4   # abstract-noun suffix heuristic
+
+# bytes.translate tables reducing a feature byte to one class bit, so a
+# document's feature bytes select a class stream without a Python loop.
+_CLASS_SELECTORS = {
+    flag: bytes(value & flag for value in range(256))
+    for flag in (TOKEN_ALNUM, TOKEN_ALPHA, TOKEN_ABSTRACT)
+}
+
+
+def _token_record(token: str) -> tuple[int, float, float]:
+    """Return ``(feature bitmask, Zipf value, surprisal)`` of one token type.
+
+    Words missing from the frequency table have Zipf value 0.
+    """
+    features = 0
+    if any(c.isalnum() for c in token):
+        features |= TOKEN_ALNUM
+    if any(c.isalpha() for c in token):
+        features |= TOKEN_ALPHA
+        if len(token) > 4 and token.endswith(_ABSTRACT_SUFFIXES):
+            features |= TOKEN_ABSTRACT
+    zipf = _load_word_frequencies().get(token) or 0.0
+    return features, zipf, _zipf_surprisal(zipf)
+
+
+def _token_features(vocabulary: Vocabulary) -> tuple[array, array, array]:
+    """Return the per-ID feature bitmask, Zipf and surprisal arrays."""
+    return vocabulary.columns("features", _token_record, "Bdd")
+
+
+# ---------------------------------------------------------------------------
+# Analysed document (shared, lazily built tokenisations)
+# ---------------------------------------------------------------------------
+
+# Blank line(s) between paragraphs.
+_PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n")
 
-    # 4. Split on sentence‐ending punctuation followed by whitespace or EOS
-    parts = re.split(r"(?<=[.!?])(?:\s+|$)", working)
-
-    # 5. Restore placeholders and filter
-    sentences: list[str] = []
-    for part in parts:
-        restored = (
-            part.replace(_PLACEHOLDER, ".")
-            .replace(_DECIMAL_PLACEHOLDER, ".")
-            .replace(_LEADING_DEC_PLACEHOLDER, ".")
-            .replace(_PAREN_PLACEHOLDER, ".")
-            .strip()
-        )
-        if not restored:
-            continue
-        word_count = len(restored.split())
-        if word_count >= 3:
-            sentences.append(restored)
 
-    return sentences
+class AnalyzedDocument:
+    """A text together with its lazily computed tokenisations.
 
+    Every ``compute_*`` function that takes text also accepts an
+    ``AnalyzedDocument``.  Sentences, paragraphs, word tokens and surprisals
+    are built on first access and then shared, so analysing one document
+    with many metrics tokenises it only once.  Boundaries come from a
+    single :func:`_scan_text` pass; metrics that only need counts or
+    positions read ``spans`` rather than slicing out sentence strings.
+    Token streams are also interned into ``array('I')`` IDs of a
+    :class:`~humanizer_mcp.vocabulary.Vocabulary` (the process-wide one
+    unless *vocabulary* is given), on which MTLD, the frequency spectrum
+    and the surprisal lookup run.  Every per-word feature comes from one
+    per-type record (:func:`_token_record`), read by ID.
+    """
 
-def _word_count(sentence: str) -> int:
-    return len(sentence.split())
+    def __init__(self, text: str, vocabulary: Vocabulary | None = None) -> None:
+        self.text = text
+        if vocabulary is not None:
+            self.vocabulary = vocabulary
+
+    def fill(self, **tokenisations) -> None:
+        """Set tokenisations already known, keeping any built before.
+
+        Each keyword names a cached property (``spans``, ``token_ids``, ...)
+        and gives the value it would compute; IDs are those of ``vocabulary``.
+        """
+        for name, value in tokenisations.items():
+            if not isinstance(getattr(type(self), name, None), cached_property):
+                raise ValueError(f"{name!r} is not a tokenisation of AnalyzedDocument")
+            self.__dict__.setdefault(name, value)
+
+    @cached_property
+    def vocabulary(self) -> Vocabulary:
+        return current_vocabulary()
+
+    @cached_property
+    def lower(self) -> str:
+        return self.text.lower()
+
+    @cached_property
+    def spans(self) -> TextSpans:
+        return _scan_text(self.text)
+
+    @cached_property
+    def sentences(self) -> list[str]:
+        spans = self.spans
+        return [self.text[s:e] for s, e in zip(spans.sentence_starts, spans.sentence_ends)]
+
+    @cached_property
+    def sentence_lengths(self) -> array:
+        return self.spans.sentence_lengths
+
+    @cached_property
+    def question_count(self) -> int:
+        """Sentences ending in a question mark."""
+        text = self.text
+        return sum(1 for end in self.spans.sentence_ends if text[end - 1] == "?")
+
+    @cached_property
+    def paragraphs(self) -> list[str]:
+        """Non-empty, stripped blocks separated by blank lines."""
+        spans = self.spans
+        return [self.text[s:e] for s, e in zip(spans.paragraph_starts, spans.paragraph_ends)]
+
+    @cached_property
+    def token_ids(self) -> array:
+        """Vocabulary IDs of the lowercase, punctuation-stripped tokens.
+
+        Index-aligned with ``spans.word_starts``: lower-casing never adds or
+        removes whitespace.  Tokens may be empty (pure punctuation).
+        """
+        return self.vocabulary.intern([t.strip(string.punctuation) for t in self.lower.split()])
+
+    @cached_property
+    def token_features(self) -> bytes:
+        """Feature bitmask of every token, aligned with ``token_ids``."""
+        ids = self.token_ids  # intern first: the feature record must cover every ID
+        features = _token_features(self.vocabulary)[0]
+        return bytes(map(features.__getitem__, ids))
+
+    def _class_ids(self, flag: int) -> array:
+        selected = self.token_features.translate(_CLASS_SELECTORS[flag])
+        return array("I", compress(self.token_ids, selected))
+
+    @cached_property
+    def mtld_ids(self) -> array:
+        """IDs of the tokens containing at least one alphanumeric character."""
+        return self._class_ids(TOKEN_ALNUM)
+
+    @cached_property
+    def word_ids(self) -> array:
+        """IDs of the tokens containing at least one alphabetic character."""
+        return self._class_ids(TOKEN_ALPHA)
+
+    @cached_property
+    def abstract_ids(self) -> array:
+        """IDs of the words that look like abstract nouns."""
+        return self._class_ids(TOKEN_ABSTRACT)
+
+    @cached_property
+    def mtld_tokens(self) -> list[str]:
+        """Lowercase tokens containing at least one alphanumeric character."""
+        return self.vocabulary.lookup(self.mtld_ids)
+
+    @cached_property
+    def word_tokens(self) -> list[str]:
+        """Lowercase tokens containing at least one alphabetic character."""
+        return self.vocabulary.lookup(self.word_ids)
+
+    @cached_property
+    def lexicon_counts(self) -> dict[str, Counter]:
+        """Occurrences of every hedge and connective entry, by category."""
+        return _LEXICON_MATCHER.count(self.lower)
+
+    @cached_property
+    def pronouns(self) -> list[str]:
+        """First-person pronouns, as written."""
+        return _FIRST_PERSON_RE.findall(self.text)
+
+    @cached_property
+    def contractions(self) -> list[str]:
+        """Contractions, as written."""
+        return _CONTRACTION_RE.findall(self.text)
+
+    @cached_property
+    def frequency_spectrum(self) -> Counter:
+        """Occurrences of every word type, keyed by vocabulary ID."""
+        return Counter(self.word_ids)
+
+    @cached_property
+    def surprisals(self) -> array:
+        """Per-word surprisal, aligned with ``word_tokens``."""
+        return _compute_word_surprisals(self.word_ids, self.vocabulary)
+
+    @cached_property
+    def surprisal_stats(self) -> "_SurprisalStats":
+        return _SurprisalStats.from_values(self.surprisals)
+
+    @cached_property
+    def sentence_statistics(self) -> "_SentenceStatistics":
+        """Document totals for evaluating sentence removals and rewrites."""
+        return _SentenceStatistics(self)
+
+
+def _as_document(text: "str | AnalyzedDocument") -> AnalyzedDocument:
+    """Wrap *text* in an ``AnalyzedDocument`` unless it already is one."""
+    if isinstance(text, AnalyzedDocument):
+        return text
+    return AnalyzedDocument(text)
 
 
 # ---------------------------------------------------------------------------
 # Burstiness (coefficient of variation of sentence lengths)
 # ---------------------------------------------------------------------------
 
-def compute_burstiness(text: str, non_native: bool = False) -> dict:
+def compute_burstiness(text: "str | AnalyzedDocument", non_native: bool = False) -> dict:
     """Return burstiness metrics based on sentence‐length variation."""
-    sentences = _tokenize_sentences(text)
-    lengths = [_word_count(s) for s in sentences]
+    return _burstiness_result(list(_as_document(text).sentence_lengths), non_native)
+
 
+def _burstiness_result(lengths: list[int], non_native: bool = False) -> dict:
+    """Build the burstiness result dict from the sentence word counts."""
     if len(lengths) < 2:
         return {
             "cv": 0.0,
@@ -124,9 +427,9 @@ def compute_burstiness(text: str, non_native: bool = False) -> dict:
             "label": "Minimal burstiness",
         }
 
-    mean_length = sum(lengths) / len(lengths)
-    variance = sum((x - mean_length) ** 2 for x in lengths) / len(lengths)
-    std_dev = math.sqrt(variance)
+    acc = RunningStats.from_values(lengths)
+    mean_length = acc.mean
+    std_dev = math.sqrt(acc.variance)
     cv = std_dev / mean_length if mean_length > 0 else 0.0
 
     threshold = 0.35 if non_native else 0.45
@@ -161,11 +464,22 @@ def compute_burstiness(text: str, non_native: bool = False) -> dict:
 # MTLD (Measure of Textual Lexical Diversity)
 # ---------------------------------------------------------------------------
 
-def _mtld_one_direction(tokens: list[str], threshold: float = 0.72) -> float:
-    """Run one pass of MTLD and return the factor count (including partial)."""
-    factors = 0.0
-    type_set: set[str] = set()
-    token_count = 0
+_MTLD_THRESHOLD = 0.72
+
+
+def _mtld_advance(
+    tokens,
+    state: tuple[float, set, int] = (0.0, frozenset(), 0),
+    threshold: float = _MTLD_THRESHOLD,
+) -> tuple[float, set, int]:
+    """Feed *tokens* through the MTLD state machine.
+
+    *state* is ``(completed factors, current type set, current token count)``
+    and the updated state is returned, so a long token stream can be
+    processed in pieces.  The input state is never mutated.
+    """
+    factors, type_set, token_count = state
+    type_set = set(type_set)
 
     for token in tokens:
         type_set.add(token)
@@ -176,37 +490,203 @@ def _mtld_one_direction(tokens: list[str], threshold: float = 0.72) -> float:
             type_set = set()
             token_count = 0
 
-    # Partial factor for remaining tokens
-    if token_count > 0:
-        current_ttr = len(type_set) / token_count
-        partial = (1.0 - current_ttr) / (1.0 - threshold) if threshold < 1.0 else 0.0
-        factors += partial
+    return factors, type_set, token_count
+
+
+def _mtld_speculate(
+    tokens,
+    threshold: float = _MTLD_THRESHOLD,
+) -> tuple[array, tuple[float, set, int]]:
+    """Run the MTLD state machine over *tokens* from a fresh state.
+
+    Returns the positions at which factors completed and the end state.
+    Together with the tokens this lets :func:`_mtld_stitch` continue from
+    any incoming state without rerunning the whole chunk, so chunks can be
+    speculated independently (in other processes) and stitched in order.
+    """
+    resets = array("q")
+    type_set: set = set()
+    token_count = 0
+    for position, token in enumerate(tokens):
+        type_set.add(token)
+        token_count += 1
+        if len(type_set) / token_count <= threshold:
+            resets.append(position)
+            type_set = set()
+            token_count = 0
+    return resets, (float(len(resets)), type_set, token_count)
+
+
+def _mtld_stitch(
+    tokens,
+    speculation: tuple[array, tuple[float, set, int]],
+    state: tuple[float, set, int],
+    threshold: float = _MTLD_THRESHOLD,
+) -> tuple[float, set, int]:
+    """Return ``_mtld_advance(tokens, state)`` using a speculative run.
+
+    A factor boundary resets the state machine, so once the true run
+    completes a factor at a position where the speculative run (started
+    fresh at the chunk start) also did, the two coincide from there on and
+    the rest of the chunk is read off the speculation.  *tokens* is consumed
+    only up to that point.
+    """
+    resets, (spec_factors, spec_types, spec_count) = speculation
+    factors, type_set, token_count = state
+    if not token_count:
+        return factors + spec_factors, spec_types, spec_count
+
+    type_set = set(type_set)
+    j = 0  # first speculative reset not yet passed
+    for position, token in enumerate(tokens):
+        type_set.add(token)
+        token_count += 1
+        if len(type_set) / token_count <= threshold:
+            factors += 1
+            while j < len(resets) and resets[j] < position:
+                j += 1
+            if j < len(resets) and resets[j] == position:
+                return factors + spec_factors - (j + 1), spec_types, spec_count
+            type_set = set()
+            token_count = 0
+    return factors, type_set, token_count
+
 
+def _mtld_factors(state: tuple[float, set, int], threshold: float = _MTLD_THRESHOLD) -> float:
+    """Return the factor count of *state*, including the partial factor."""
+    factors, type_set, token_count = state
+    if token_count > 0:
+        factors += _mtld_partial(len(type_set), token_count, threshold)
     return factors
 
 
-def compute_mtld(text: str) -> dict:
-    """Compute Measure of Textual Lexical Diversity (McCarthy & Jarvis 2010)."""
-    # Tokenise: lowercase, strip punctuation, keep only alphanumeric tokens
-    raw_tokens = text.lower().split()
-    tokens = [t.strip(string.punctuation) for t in raw_tokens]
-    tokens = [t for t in tokens if t and any(c.isalnum() for c in t)]
+def _mtld_partial(type_count: int, token_count: int, threshold: float = _MTLD_THRESHOLD) -> float:
+    """Return the partial factor of an unfinished segment."""
+    current_ttr = type_count / token_count
+    return (1.0 - current_ttr) / (1.0 - threshold) if threshold < 1.0 else 0.0
+
+
+def _mtld_one_direction(tokens, threshold: float = _MTLD_THRESHOLD) -> float:
+    """Run one pass of MTLD and return the factor count (including partial)."""
+    return _mtld_factors(_mtld_advance(tokens, threshold=threshold), threshold)
+
+
+class _MTLDRuns:
+    """MTLD factor counts for runs re-entering a token stream at any point.
+
+    A factor boundary resets the state machine, so a run entering the
+    stream in any state only has to be followed to its first boundary;
+    from there on it is the fresh run from the next position, whose factor
+    count and final partial factor are memoised by start position.  Runs
+    from different starts merge as soon as they share a boundary, so each
+    position is walked as a start at most once over all queries.  The
+    stream's own run seeds the memo and records its state before each of
+    *offsets*.
+    """
+
+    def __init__(self, tokens, offsets=(), threshold: float = _MTLD_THRESHOLD) -> None:
+        self.tokens = tokens
+        self.threshold = threshold
+        marks = sorted(set(offsets))
+        # State of the stream's own run before each offset in *marks*
+        self.snapshots: dict[int, tuple[float, frozenset, int]] = {}
+        resets: list[int] = []
+        type_set: set = set()
+        token_count = 0
+        k = 0
+        for position, token in enumerate(tokens):
+            if k < len(marks) and marks[k] == position:
+                self.snapshots[position] = (float(len(resets)), frozenset(type_set), token_count)
+                k += 1
+            type_set.add(token)
+            token_count += 1
+            if len(type_set) / token_count <= threshold:
+                resets.append(position)
+                type_set = set()
+                token_count = 0
+        for mark in marks[k:]:
+            self.snapshots[mark] = (float(len(resets)), frozenset(type_set), token_count)
+
+        # start -> (factors to the end, types and tokens of the final partial factor)
+        self._tails: dict[int, tuple[int, int, int]] = {len(tokens): (0, 0, 0)}
+        for j, position in enumerate(resets):
+            self._tails[position + 1] = (len(resets) - j - 1, len(type_set), token_count)
+        self._tails.setdefault(0, (len(resets), len(type_set), token_count))
+
+    def _tail(self, start: int) -> tuple[int, int, int]:
+        """Return the memoised outcome of a fresh run from *start*."""
+        tails = self._tails
+        tokens = self.tokens
+        threshold = self.threshold
+        path: list[int] = []
+        position = start
+        while position not in tails:
+            type_set: set = set()
+            token_count = 0
+            for i in range(position, len(tokens)):
+                type_set.add(tokens[i])
+                token_count += 1
+                if len(type_set) / token_count <= threshold:
+                    path.append(position)
+                    position = i + 1
+                    break
+            else:
+                tails[position] = (0, len(type_set), token_count)
+        factors, type_count, token_count = tails[position]
+        for position in reversed(path):
+            factors += 1
+            tails[position] = (factors, type_count, token_count)
+        return tails[start]
+
+    def factors_from(self, state: tuple[float, set, int], start: int) -> float:
+        """Return ``_mtld_factors`` of a run in *state* continuing over ``tokens[start:]``."""
+        factors, type_set, token_count = state
+        type_set = set(type_set)
+        tokens = self.tokens
+        for i in range(start, len(tokens)):
+            type_set.add(tokens[i])
+            token_count += 1
+            if len(type_set) / token_count <= self.threshold:
+                tail_factors, type_count, token_count = self._tail(i + 1)
+                factors += 1 + tail_factors
+                if token_count:
+                    factors += _mtld_partial(type_count, token_count, self.threshold)
+                return factors
+        return _mtld_factors((factors, type_set, token_count), self.threshold)
+
+
+def compute_mtld(text: "str | AnalyzedDocument") -> dict:
+    """Compute Measure of Textual Lexical Diversity (McCarthy & Jarvis 2010).
+
+    The forward and backward passes run one after the other.  Only texts
+    analysed by :func:`~humanizer_mcp.parallel.compute_all_metrics_parallel`
+    overlap them, by speculating both passes per chunk in worker processes.
+    """
+    # Tokens: lowercase, punctuation stripped, at least one alphanumeric char
+    tokens = _as_document(text).mtld_ids
 
     if len(tokens) < 10:
+        return _mtld_result(len(tokens), 0.0, 0.0)
+
+    factors_fwd = _mtld_one_direction(tokens)
+    factors_bwd = _mtld_one_direction(tokens[::-1])
+    return _mtld_result(len(tokens), factors_fwd, factors_bwd)
+
+
+def _mtld_result(token_count: int, factors_fwd: float, factors_bwd: float) -> dict:
+    """Build the MTLD result dict from the forward and backward factor counts."""
+    if token_count < 10:
         return {
             "mtld": 0.0,
             "mtld_forward": 0.0,
             "mtld_backward": 0.0,
             "penalty": 0.0,
-            "token_count": len(tokens),
+            "token_count": token_count,
             "label": "Minimal diversity",
         }
 
-    factors_fwd = _mtld_one_direction(tokens)
-    mtld_forward = len(tokens) / factors_fwd if factors_fwd > 0 else 0.0
-
-    factors_bwd = _mtld_one_direction(list(reversed(tokens)))
-    mtld_backward = len(tokens) / factors_bwd if factors_bwd > 0 else 0.0
+    mtld_forward = token_count / factors_fwd if factors_fwd > 0 else 0.0
+    mtld_backward = token_count / factors_bwd if factors_bwd > 0 else 0.0
 
     mtld = (mtld_forward + mtld_backward) / 2
 
@@ -231,7 +711,7 @@ def compute_mtld(text: str) -> dict:
         "mtld_forward": round(mtld_forward, 2),
         "mtld_backward": round(mtld_backward, 2),
         "penalty": round(penalty, 2),
-        "token_count": len(tokens),
+        "token_count": token_count,
         "label": label,
     }
 
@@ -244,11 +724,10 @@ def compute_fano_factor(sentence_lengths: list[int]) -> float:
     """Return variance / mean of *sentence_lengths* (population variance)."""
     if not sentence_lengths:
         return 0.0
-    mean = sum(sentence_lengths) / len(sentence_lengths)
-    if mean == 0:
+    acc = RunningStats.from_values(sentence_lengths)
+    if acc.mean == 0:
         return 0.0
-    variance = sum((x - mean) ** 2 for x in sentence_lengths) / len(sentence_lengths)
-    return round(variance / mean, 4)
+    return round(acc.variance / acc.mean, 4)
 
 
 # ---------------------------------------------------------------------------
@@ -266,8 +745,8 @@ def compute_sentence_length_range(sentence_lengths: list[int]) -> dict:
             "label": "Minimal",
         }
 
-    min_len = min(sentence_lengths)
-    max_len = max(sentence_lengths)
+    acc = RunningStats.from_values(sentence_lengths)
+    min_len, max_len = acc.min, acc.max
     rng = max_len - min_len
 
     if rng >= 25:
@@ -299,41 +778,51 @@ def compute_sentence_length_range(sentence_lengths: list[int]) -> dict:
 # Paragraph opener diversity
 # ---------------------------------------------------------------------------
 
-def _has_multiple_sentences(paragraph: str) -> bool:
-    """Return True if *paragraph* contains at least 2 sentences."""
+def _has_multiple_sentences(text: str, start: int = 0, end: int | None = None) -> bool:
+    """Return True if ``text[start:end]`` contains at least 2 sentences."""
     # Count sentence-ending punctuation (beyond the first occurrence)
-    endings = re.findall(r"[.!?]", paragraph)
-    return len(endings) >= 2
+    if end is None:
+        end = len(text)
+    endings = text.count(".", start, end) + text.count("!", start, end) + text.count("?", start, end)
+    return endings >= 2
+
+
+def _paragraph_opener(words: list[str]) -> str:
+    """Normalise the first three *words* of a paragraph into an opener key."""
+    return " ".join(w.lower().strip(string.punctuation) for w in words[:3])
 
 
-def compute_paragraph_opener_diversity(text: str) -> dict:
+def compute_paragraph_opener_diversity(text: "str | AnalyzedDocument") -> dict:
     """Measure how diverse the opening words of paragraphs are."""
-    paragraphs = re.split(r"\n\s*\n", text)
-    paragraphs = [p.strip() for p in paragraphs if p.strip()]
+    doc = _as_document(text)
+    spans = doc.spans
     # Keep only paragraphs with at least 2 sentences
-    paragraphs = [p for p in paragraphs if _has_multiple_sentences(p)]
-
-    if len(paragraphs) <= 1:
-        openers = []
-        if paragraphs:
-            words = paragraphs[0].split()[:3]
-            opener = " ".join(w.lower().strip(string.punctuation) for w in words)
-            openers.append(opener)
+    openers = [
+        _paragraph_opener([
+            doc.text[spans.word_starts[i]:spans.word_ends[i]]
+            for i in range(first, first + min(length, 3))
+        ])
+        for start, end, first, length in zip(
+            spans.paragraph_starts, spans.paragraph_ends,
+            spans.paragraph_first_words, spans.paragraph_lengths,
+        )
+        if _has_multiple_sentences(doc.text, start, end)
+    ]
+    return _opener_diversity_result(openers)
+
+
+def _opener_diversity_result(openers: list[str]) -> dict:
+    """Build the opener diversity result dict from multi-sentence paragraph openers."""
+    if len(openers) <= 1:
         return {
             "diversity": 1.0,
             "unique_openers": len(openers),
-            "total_paragraphs": len(paragraphs),
+            "total_paragraphs": len(openers),
             "penalty": 0.0,
             "openers": openers,
             "label": "High diversity",
         }
 
-    openers: list[str] = []
-    for para in paragraphs:
-        words = para.split()[:3]
-        opener = " ".join(w.lower().strip(string.punctuation) for w in words)
-        openers.append(opener)
-
     unique = len(set(openers))
     total = len(openers)
     diversity = unique / total
@@ -380,28 +869,21 @@ _HEDGE_WORDS = [
 ]
 
 
-def compute_hedge_density(text: str) -> dict:
+def compute_hedge_density(text: "str | AnalyzedDocument") -> dict:
     """Count hedging language relative to sentence count."""
-    sentences = _tokenize_sentences(text)
-    sentence_count = len(sentences) if sentences else 1
-    text_lower = text.lower()
+    doc = _as_document(text)
+    return _hedge_result(doc.lexicon_counts["hedge"], len(doc.sentence_lengths))
 
-    hedge_count = 0
-    hedges_found: list[str] = []
 
-    # Count multi‐word phrases first
-    for phrase in _HEDGE_PHRASES:
-        count = len(re.findall(re.escape(phrase), text_lower))
-        if count > 0:
-            hedge_count += count
-            hedges_found.extend([phrase] * count)
+def _hedge_result(counts: Counter, sentence_count: int) -> dict:
+    """Build the hedge density result dict from per-entry hedge counts."""
+    sentence_count = sentence_count or 1
 
-    # Count single hedge words (word‐boundary match)
-    for word in _HEDGE_WORDS:
-        count = len(re.findall(rf"\b{word}\b", text_lower))
-        if count > 0:
-            hedge_count += count
-            hedges_found.extend([word] * count)
+    # Multi‐word phrases first, then single words, in lexicon order
+    hedges_found: list[str] = []
+    for entry in _HEDGE_PHRASES + _HEDGE_WORDS:
+        hedges_found.extend([entry] * counts[entry])
+    hedge_count = len(hedges_found)
 
     density = hedge_count / sentence_count
 
@@ -417,21 +899,28 @@ def compute_hedge_density(text: str) -> dict:
 # Word frequency data (lazy-loaded, cached)
 # ---------------------------------------------------------------------------
 
-_WORD_FREQUENCIES: dict[str, float] | None = None
+_WORD_FREQUENCIES: Mapping[str, float] | None = None
 
 
-def _load_word_frequencies() -> dict[str, float]:
-    """Load the bundled word frequency dictionary (log10 values).
+def _load_word_frequencies() -> Mapping[str, float]:
+    """Load the bundled word frequency table (log10 values).
 
-    The file is loaded once and cached in a module-level variable.
+    The memory-mapped ``word_frequencies.bin`` is preferred; if it is
+    missing or unreadable the JSON source is parsed into a dict instead.
+    Either is loaded once and cached in a module-level variable.
     """
     global _WORD_FREQUENCIES
     if _WORD_FREQUENCIES is not None:
         return _WORD_FREQUENCIES
 
-    data_path = os.path.join(
-        os.path.dirname(__file__), "data", "word_frequencies.json",
-    )
+    data_dir = os.path.join(os.path.dirname(__file__), "data")
+    try:
+        _WORD_FREQUENCIES = FrequencyTable.open(os.path.join(data_dir, "word_frequencies.bin"))
+        return _WORD_FREQUENCIES
+    except (OSError, ValueError, struct.error):
+        pass
+
+    data_path = os.path.join(data_dir, "word_frequencies.json")
     try:
         with open(data_path, "r", encoding="utf-8") as fh:
             _WORD_FREQUENCIES = json.load(fh)
@@ -441,30 +930,27 @@ def _load_word_frequencies() -> dict[str, float]:
     return _WORD_FREQUENCIES
 
 
-# ---------------------------------------------------------------------------
-# Helper: tokenise text into lowercase words
-# ---------------------------------------------------------------------------
-
-def _tokenize_words(text: str) -> list[str]:
-    """Return lowercase alphabetic tokens from *text*."""
-    raw = text.lower().split()
-    tokens = [t.strip(string.punctuation) for t in raw]
-    return [t for t in tokens if t and any(c.isalpha() for c in t)]
-
-
 # ---------------------------------------------------------------------------
 # Hapax legomena rate
 # ---------------------------------------------------------------------------
 
-def compute_hapax_rate(text: str) -> dict:
+def compute_hapax_rate(text: "str | AnalyzedDocument") -> dict:
     """Compute hapax legomena rate (words appearing exactly once / total words).
 
     Human writing typically exceeds 0.50; AI-generated text tends to fall
     below 0.35 due to repetitive vocabulary selection.
     """
-    tokens = _tokenize_words(text)
-    total_words = len(tokens)
+    doc = _as_document(text)
+    return _hapax_result(_hapax_count(doc.frequency_spectrum), len(doc.word_ids))
+
+
+def _hapax_count(freq: Mapping[int, int]) -> int:
+    """Return the number of types occurring exactly once in *freq*."""
+    return sum(1 for count in freq.values() if count == 1)
 
+
+def _hapax_result(hapax_count: int, total_words: int) -> dict:
+    """Build the hapax rate result dict from the hapax and word counts."""
     if total_words == 0:
         return {
             "rate": 0.0,
@@ -473,8 +959,6 @@ def compute_hapax_rate(text: str) -> dict:
             "label": "Insufficient text",
         }
 
-    freq = Counter(tokens)
-    hapax_count = sum(1 for count in freq.values() if count == 1)
     rate = hapax_count / total_words
 
     if rate >= 0.50:
@@ -504,16 +988,19 @@ _CONTRACTION_RE = re.compile(
 )
 
 
-def compute_contraction_density(text: str) -> dict:
+def compute_contraction_density(text: "str | AnalyzedDocument") -> dict:
     """Compute contractions per sentence.
 
     Human academic writing: > 0.15 contractions/sentence.
     AI-generated text: < 0.05 contractions/sentence.
     """
-    sentences = _tokenize_sentences(text)
-    sentence_count = len(sentences) if sentences else 1
+    doc = _as_document(text)
+    return _contraction_result(doc.contractions, len(doc.sentence_lengths))
+
 
-    contractions_found = _CONTRACTION_RE.findall(text)
+def _contraction_result(contractions_found: list[str], sentence_count: int) -> dict:
+    """Build the contraction density result dict from the matched contractions."""
+    sentence_count = sentence_count or 1
     contraction_count = len(contractions_found)
     density = contraction_count / sentence_count
 
@@ -529,39 +1016,39 @@ def compute_contraction_density(text: str) -> dict:
 # Paragraph length variance
 # ---------------------------------------------------------------------------
 
-def compute_paragraph_length_variance(text: str) -> dict:
+def compute_paragraph_length_variance(text: "str | AnalyzedDocument") -> dict:
     """Compute the coefficient of variation (CV) of paragraph word counts.
 
     Human: CV > 0.40 (varied paragraph sizes).
     AI: CV < 0.25 (uniform paragraph sizes).
     """
-    paragraphs = re.split(r"\n\s*\n", text)
-    paragraphs = [p.strip() for p in paragraphs if p.strip()]
+    return _paragraph_variance_result(_as_document(text).spans.paragraph_lengths.tolist())
+
 
-    if len(paragraphs) < 2:
-        lengths = [len(p.split()) for p in paragraphs] if paragraphs else []
+def _paragraph_variance_result(lengths: list[int]) -> dict:
+    """Build the paragraph length variance result dict from paragraph word counts."""
+    if len(lengths) < 2:
         return {
             "cv": 0.0,
             "mean_length": float(lengths[0]) if lengths else 0.0,
             "std_dev": 0.0,
-            "paragraph_count": len(paragraphs),
+            "paragraph_count": len(lengths),
             "paragraph_lengths": lengths,
             "label": "Insufficient paragraphs",
         }
 
-    lengths = [len(p.split()) for p in paragraphs]
-    mean_length = sum(lengths) / len(lengths)
+    acc = RunningStats.from_values(lengths)
+    mean_length, variance = acc.mean, acc.variance
     if mean_length == 0:
         return {
             "cv": 0.0,
             "mean_length": 0.0,
             "std_dev": 0.0,
-            "paragraph_count": len(paragraphs),
+            "paragraph_count": len(lengths),
             "paragraph_lengths": lengths,
             "label": "Insufficient text",
         }
 
-    variance = sum((x - mean_length) ** 2 for x in lengths) / len(lengths)
     std_dev = math.sqrt(variance)
     cv = std_dev / mean_length
 
@@ -578,7 +1065,7 @@ def compute_paragraph_length_variance(text: str) -> dict:
         "cv": round(cv, 4),
         "mean_length": round(mean_length, 2),
         "std_dev": round(std_dev, 2),
-        "paragraph_count": len(paragraphs),
+        "paragraph_count": len(lengths),
         "paragraph_lengths": lengths,
         "label": label,
     }
@@ -591,146 +1078,162 @@ def compute_paragraph_length_variance(text: str) -> dict:
 _MAX_SURPRISAL = 20.0  # Cap for words not in frequency dictionary
 
 
-def _compute_word_surprisals(tokens: list[str]) -> list[float]:
-    """Return per-word surprisal values using the bundled frequency data.
-
-    surprisal = log2(1 / 10^log_freq)  =  -log_freq * log2(10)
-    """
-    freqs = _load_word_frequencies()
-    log2_of_10 = math.log2(10)
-    surprisals: list[float] = []
-    for token in tokens:
-        log_freq = freqs.get(token)
-        if log_freq is not None and log_freq > 0:
-            surprisals.append(log_freq * log2_of_10)  # Higher freq -> lower surprisal... invert:
-        else:
-            surprisals.append(_MAX_SURPRISAL)
-
-    # Actually: surprisal = -log2(p). If log10(freq) = lf, then p ~ 10^lf (normalized).
-    # Higher lf means more common = LESS surprising.
-    # surprisal = -log2(10^lf) = -lf * log2(10).  But lf is positive, so surprisal is negative?
-    # The convention: lf is log10 of frequency count or Zipf value.
-    # For a Zipf value z, surprisal ~ -z * log2(10) would be negative.
-    # Let's use: surprisal = max_surprisal - lf * log2(10).
-    # This way: high-freq word (lf=5) -> low surprisal; rare word (lf=1) -> high surprisal.
-    surprisals_corrected: list[float] = []
-    for token in tokens:
-        log_freq = freqs.get(token)
-        if log_freq is not None and log_freq > 0:
-            s = _MAX_SURPRISAL - log_freq * log2_of_10
-            surprisals_corrected.append(max(s, 0.0))
-        else:
-            surprisals_corrected.append(_MAX_SURPRISAL)
-    return surprisals_corrected
+_LOG2_OF_10 = math.log2(10)
 
 
-def compute_surprisal_proxy(text: str) -> dict:
-    """Compute word surprisal proxy using bundled frequency data.
+def _zipf_surprisal(zipf: float) -> float:
+    """Return the surprisal of a word with Zipf value *zipf*.
 
-    Variance of surprisal across words measures the mix of common and rare
-    words.  Human text shows high variance (unpredictable mix); AI text
-    shows low variance (uniformly medium-frequency vocabulary).
+    With Zipf value ``z`` (log10 frequency per billion words), surprisal is
+    ``max_surprisal - z * log2(10)``: common words score low, rare ones
+    high, and words missing from the table get the ``_MAX_SURPRISAL`` cap.
     """
-    tokens = _tokenize_words(text)
-
-    if len(tokens) < 10:
-        return {
-            "variance": 0.0,
-            "mean_surprisal": 0.0,
-            "std_dev": 0.0,
-            "token_count": len(tokens),
-            "label": "Insufficient text",
-        }
+    if zipf > 0:
+        return max(_MAX_SURPRISAL - zipf * _LOG2_OF_10, 0.0)
+    return _MAX_SURPRISAL
 
-    surprisals = _compute_word_surprisals(tokens)
 
-    mean_s = sum(surprisals) / len(surprisals)
-    variance = sum((s - mean_s) ** 2 for s in surprisals) / len(surprisals)
-    std_dev = math.sqrt(variance)
+def _compute_word_surprisals(ids: array, vocabulary: Vocabulary) -> array:
+    """Return per-word surprisal values for the vocabulary IDs *ids*.
 
-    if variance >= 25.0:
-        label = "High surprisal variance (human-like)"
-    elif variance >= 15.0:
-        label = "Moderate surprisal variance"
-    elif variance >= 8.0:
-        label = "Low surprisal variance (AI-typical)"
-    else:
-        label = "Very low surprisal variance"
+    Surprisal is part of the per-type token record, so each distinct word
+    is looked up in the frequency table once per vocabulary.  The result is
+    a compact ``array('d')`` so the values match the float arithmetic of
+    the metrics.
+    """
+    by_id = _token_features(vocabulary)[2]
+    return array("d", map(by_id.__getitem__, ids))
 
-    return {
-        "variance": round(variance, 4),
-        "mean_surprisal": round(mean_s, 4),
-        "std_dev": round(std_dev, 4),
-        "token_count": len(tokens),
-        "label": label,
-    }
 
+class _SurprisalStats:
+    """Mergeable one-pass statistics of a surprisal sequence.
 
-# ---------------------------------------------------------------------------
-# Surprisal autocorrelation
-# ---------------------------------------------------------------------------
-
-def compute_surprisal_autocorrelation(text: str) -> dict:
-    """Compute 2nd-order autocorrelation of surprisal differences.
-
-    Human text has high autocorrelation (irregular rhythm of word difficulty).
-    AI text has low autocorrelation (smooth, predictable difficulty flow).
+    ``values`` accumulates the surprisals themselves and ``diffs`` their
+    first differences, with the lag-2 product sums the autocorrelation
+    needs.  :meth:`merge` appends the statistics of the following stretch
+    of text (a streamed piece, or a chunk analysed by a worker) via Chan's
+    formula; the finalised results agree with a single pass to the
+    reported rounding.
     """
-    tokens = _tokenize_words(text)
 
-    if len(tokens) < 15:
+    def __init__(self) -> None:
+        self.values = RunningStats()
+        self.diffs = RunningStats(lag=2)
+        self.first: float | None = None
+        self.last: float | None = None
+
+    @classmethod
+    def from_values(cls, values) -> "_SurprisalStats":
+        """Build the statistics of a complete sequence in one go.
+
+        Long sequences are reduced with the NumPy backend when it is
+        active; the finalised results agree to the reported rounding.
+        """
+        stats = cls()
+        if len(values):
+            stats.values = RunningStats.from_values(values)
+            stats.diffs = RunningStats.from_values(list(map(sub, values[1:], values[:-1])), lag=2)
+            stats.first, stats.last = values[0], values[-1]
+        return stats
+
+    def merge(self, other: "_SurprisalStats") -> "_SurprisalStats":
+        """Append the statistics of the sequence that follows this one."""
+        if other.first is None:
+            return self
+        self.values.merge(other.values)
+        if self.last is not None:
+            self.diffs.update([other.first - self.last])
+        else:
+            self.first = other.first
+        self.diffs.merge(other.diffs)
+        self.last = other.last
+        return self
+
+    def proxy_result(self) -> dict:
+        """Build the ``compute_surprisal_proxy`` result dict."""
+        count = self.values.count
+        if count < 10:
+            return {
+                "variance": 0.0,
+                "mean_surprisal": 0.0,
+                "std_dev": 0.0,
+                "token_count": count,
+                "label": "Insufficient text",
+            }
+
+        mean_s = self.values.mean
+        variance = self.values.variance
+        std_dev = math.sqrt(variance)
+
+        if variance >= 25.0:
+            label = "High surprisal variance (human-like)"
+        elif variance >= 15.0:
+            label = "Moderate surprisal variance"
+        elif variance >= 8.0:
+            label = "Low surprisal variance (AI-typical)"
+        else:
+            label = "Very low surprisal variance"
+
         return {
-            "autocorrelation": 0.0,
-            "label": "Insufficient text",
+            "variance": round(variance, 4),
+            "mean_surprisal": round(mean_s, 4),
+            "std_dev": round(std_dev, 4),
+            "token_count": count,
+            "label": label,
         }
 
-    surprisals = _compute_word_surprisals(tokens)
-
-    # First differences
-    diffs = [surprisals[i + 1] - surprisals[i] for i in range(len(surprisals) - 1)]
+    def autocorrelation_result(self) -> dict:
+        """Build the ``compute_surprisal_autocorrelation`` result dict."""
+        diffs = self.diffs
+        if self.values.count < 15 or diffs.count < 4:
+            return {
+                "autocorrelation": 0.0,
+                "label": "Insufficient text",
+            }
+
+        var_d = diffs.variance
+        if var_d <= 0:
+            return {
+                "autocorrelation": 0.0,
+                "label": "No variation in surprisal",
+            }
+
+        autocorr = diffs.autocovariance() / var_d
+
+        if abs(autocorr) >= 0.30:
+            label = "High autocorrelation (human-like)"
+        elif abs(autocorr) >= 0.15:
+            label = "Moderate autocorrelation"
+        else:
+            label = "Low autocorrelation (AI-typical)"
 
-    if len(diffs) < 4:
         return {
-            "autocorrelation": 0.0,
-            "label": "Insufficient text",
+            "autocorrelation": round(autocorr, 4),
+            "label": label,
         }
 
-    # Lag-2 autocorrelation
-    n = len(diffs)
-    mean_d = sum(diffs) / n
-    var_d = sum((d - mean_d) ** 2 for d in diffs) / n
 
-    if var_d == 0:
-        return {
-            "autocorrelation": 0.0,
-            "label": "No variation in surprisal",
-        }
+def compute_surprisal_proxy(text: "str | AnalyzedDocument") -> dict:
+    """Compute word surprisal proxy using bundled frequency data.
 
-    lag = 2
-    if n <= lag:
-        return {
-            "autocorrelation": 0.0,
-            "label": "Insufficient text",
-        }
+    Variance of surprisal across words measures the mix of common and rare
+    words.  Human text shows high variance (unpredictable mix); AI text
+    shows low variance (uniformly medium-frequency vocabulary).
+    """
+    return _as_document(text).surprisal_stats.proxy_result()
 
-    cov = sum(
-        (diffs[i] - mean_d) * (diffs[i + lag] - mean_d)
-        for i in range(n - lag)
-    ) / (n - lag)
 
-    autocorr = cov / var_d
+# ---------------------------------------------------------------------------
+# Surprisal autocorrelation
+# ---------------------------------------------------------------------------
 
-    if abs(autocorr) >= 0.30:
-        label = "High autocorrelation (human-like)"
-    elif abs(autocorr) >= 0.15:
-        label = "Moderate autocorrelation"
-    else:
-        label = "Low autocorrelation (AI-typical)"
+def compute_surprisal_autocorrelation(text: "str | AnalyzedDocument") -> dict:
+    """Compute 2nd-order autocorrelation of surprisal differences.
 
-    return {
-        "autocorrelation": round(autocorr, 4),
-        "label": label,
-    }
+    Human text has high autocorrelation (irregular rhythm of word difficulty).
+    AI text has low autocorrelation (smooth, predictable difficulty flow).
+    """
+    return _as_document(text).surprisal_stats.autocorrelation_result()
 
 
 # ---------------------------------------------------------------------------
@@ -764,26 +1267,29 @@ _CONNECTIVE_PHRASES = [
     "to that end", "in this context", "with respect to", "in light of",
 ]
 
+# Every word list compiled into one trie, so hedges and connectives are
+# counted together in a single scan of the text.
+_LEXICON_MATCHER = LexiconMatcher({
+    "hedge": _HEDGE_PHRASES + _HEDGE_WORDS,
+    "connective": _CONNECTIVE_PHRASES + _CONNECTIVES,
+})
 
-def compute_connective_diversity(text: str) -> dict:
+
+def compute_connective_diversity(text: "str | AnalyzedDocument") -> dict:
     """Compute unique connectives / total connectives.
 
     Human: > 0.70 (varied connective usage).
     AI: < 0.50 (repetitive connective patterns).
     """
-    text_lower = text.lower()
-
-    found: list[str] = []
+    return _connective_result(_as_document(text).lexicon_counts["connective"])
 
-    # Multi-word phrases first
-    for phrase in _CONNECTIVE_PHRASES:
-        count = len(re.findall(re.escape(phrase), text_lower))
-        found.extend([phrase] * count)
 
-    # Single-word connectives
-    for conn in _CONNECTIVES:
-        count = len(re.findall(rf"\b{re.escape(conn)}\b", text_lower))
-        found.extend([conn] * count)
+def _connective_result(counts: Counter) -> dict:
+    """Build the connective diversity result dict from per-entry connective counts."""
+    # Multi-word phrases first, then single-word connectives
+    found: list[str] = []
+    for entry in _CONNECTIVE_PHRASES + _CONNECTIVES:
+        found.extend([entry] * counts[entry])
 
     total_count = len(found)
 
@@ -827,16 +1333,19 @@ _FIRST_PERSON_RE = re.compile(
 )
 
 
-def compute_pronoun_density(text: str) -> dict:
+def compute_pronoun_density(text: "str | AnalyzedDocument") -> dict:
     """Compute first-person pronouns (I/we/my/our/me/us) per sentence.
 
     Density varies by discipline.  AI-generated text typically has near-zero
     first-person pronoun usage.
     """
-    sentences = _tokenize_sentences(text)
-    sentence_count = len(sentences) if sentences else 1
+    doc = _as_document(text)
+    return _pronoun_result(doc.pronouns, len(doc.sentence_lengths))
+
 
-    pronouns_found = _FIRST_PERSON_RE.findall(text)
+def _pronoun_result(pronouns_found: list[str], sentence_count: int) -> dict:
+    """Build the pronoun density result dict from the matched pronouns."""
+    sentence_count = sentence_count or 1
     pronoun_count = len(pronouns_found)
     density = pronoun_count / sentence_count
 
@@ -852,16 +1361,19 @@ def compute_pronoun_density(text: str) -> dict:
 # Question ratio
 # ---------------------------------------------------------------------------
 
-def compute_question_ratio(text: str) -> dict:
+def compute_question_ratio(text: "str | AnalyzedDocument") -> dict:
     """Compute the ratio of questions to total sentences.
 
     Human: > 0.03 (occasional rhetorical questions).
     AI: < 0.01 (almost never asks questions).
     """
-    sentences = _tokenize_sentences(text)
-    total_sentences = len(sentences) if sentences else 1
+    doc = _as_document(text)
+    return _question_result(doc.question_count, len(doc.sentence_lengths))
+
 
-    question_count = sum(1 for s in sentences if s.rstrip().endswith("?"))
+def _question_result(question_count: int, sentence_count: int) -> dict:
+    """Build the question ratio result dict."""
+    total_sentences = sentence_count or 1
     ratio = question_count / total_sentences
 
     return {
@@ -879,16 +1391,24 @@ _ABSTRACT_SUFFIXES = (
     "tion", "sion", "ness", "ity", "ment", "ance", "ence", "ism", "ship",
 )
 
+_ABSTRACTS_LISTED = 50  # Limit of the abstracts_found list
 
-def compute_abstract_noun_ratio(text: str) -> dict:
+
+def compute_abstract_noun_ratio(text: "str | AnalyzedDocument") -> dict:
     """Compute abstract nouns / total words (by suffix heuristic).
 
     Human: < 0.30 (balanced vocabulary).
     AI: > 0.45 (over-reliance on abstract nominalisations).
     """
-    tokens = _tokenize_words(text)
-    total_words = len(tokens)
+    doc = _as_document(text)
+    abstracts = doc.abstract_ids
+    return _abstract_result(
+        doc.vocabulary.lookup(abstracts[:_ABSTRACTS_LISTED]), len(abstracts), len(doc.word_ids),
+    )
+
 
+def _abstract_result(abstracts_found: list[str], abstract_count: int, total_words: int) -> dict:
+    """Build the abstract noun ratio result dict."""
     if total_words == 0:
         return {
             "ratio": 0.0,
@@ -898,12 +1418,6 @@ def compute_abstract_noun_ratio(text: str) -> dict:
             "label": "Insufficient text",
         }
 
-    abstracts_found: list[str] = []
-    for token in tokens:
-        if len(token) > 4 and token.endswith(_ABSTRACT_SUFFIXES):
-            abstracts_found.append(token)
-
-    abstract_count = len(abstracts_found)
     ratio = abstract_count / total_words
 
     if ratio <= 0.15:
@@ -919,11 +1433,937 @@ def compute_abstract_noun_ratio(text: str) -> dict:
         "ratio": round(ratio, 4),
         "abstract_count": abstract_count,
         "total_words": total_words,
-        "abstracts_found": abstracts_found[:50],  # Limit list size
+        "abstracts_found": abstracts_found[:_ABSTRACTS_LISTED],
         "label": label,
     }
 
 
+# ---------------------------------------------------------------------------
+# Sliding-window profile
+# ---------------------------------------------------------------------------
+
+_PROFILE_UNITS = ("sentences", "tokens")
+_PROFILE_PREVIEW_WORDS = 8
+
+
+def compute_window_profile(
+    text: "str | AnalyzedDocument",
+    window: int = 10,
+    step: int = 1,
+    unit: str = "sentences",
+) -> dict:
+    """Return burstiness CV, MTLD, hapax rate and surprisal variance along the text.
+
+    The window spans *window* sentences, or *window* whitespace-delimited
+    words of those sentences when ``unit="tokens"``, and advances by *step*.
+    Sentence-length sums, the frequency spectrum and surprisal sums are
+    updated as words enter and leave the window, so each move costs
+    O(step) rather than O(window).  MTLD is a sequential measure with no
+    such update and is recomputed per window.  In token windows, burstiness
+    uses the sentences lying wholly inside the window.
+    """
+    if unit not in _PROFILE_UNITS:
+        raise ValueError(f"unit must be one of {_PROFILE_UNITS}, got {unit!r}")
+    if window < 1 or step < 1:
+        raise ValueError("window and step must be positive")
+
+    doc = _as_document(text)
+    spans = doc.spans
+    # Document word index of every word inside a sentence, and the position
+    # in that list at which each sentence starts.
+    words: list[int] = []
+    sentence_offsets = [0]
+    for first, length in zip(spans.sentence_first_words, spans.sentence_lengths):
+        words.extend(range(first, first + length))
+        sentence_offsets.append(len(words))
+
+    # Word index -> position in the alphabetic (hapax / surprisal) and
+    # alphanumeric (MTLD) ID streams, with one trailing sentinel each.
+    token_ids = doc.token_ids
+    features = doc.token_features
+    alpha = array("I")
+    alpha_pos: list[int] = []
+    mtld_ids = array("I")
+    mtld_pos: list[int] = []
+    for word in words:
+        alpha_pos.append(len(alpha))
+        mtld_pos.append(len(mtld_ids))
+        if features[word] & TOKEN_ALPHA:
+            alpha.append(token_ids[word])
+        if features[word] & TOKEN_ALNUM:
+            mtld_ids.append(token_ids[word])
+    alpha_pos.append(len(alpha))
+    mtld_pos.append(len(mtld_ids))
+    surprisals = _compute_word_surprisals(alpha, doc.vocabulary)
+
+    length_sums = [0]
+    length_sq_sums = [0]
+    for length in doc.sentence_lengths:
+        length_sums.append(length_sums[-1] + length)
+        length_sq_sums.append(length_sq_sums[-1] + length * length)
+
+    unit_count = len(spans.sentence_lengths) if unit == "sentences" else len(words)
+    starts = range(0, max(unit_count - window, 0) + 1, step) if unit_count else ()
+
+    freq: dict[int, int] = {}
+    hapax_count = 0
+    s_sum = s_sq_sum = 0.0
+    s_moves = 0
+    a_lo = a_hi = 0
+    windows: list[dict] = []
+
+    for start in starts:
+        end = min(start + window, unit_count)
+        if unit == "sentences":
+            s_lo, s_hi = start, end
+            lo, hi = sentence_offsets[start], sentence_offsets[end]
+        else:
+            lo, hi = start, end
+            s_lo = bisect_left(sentence_offsets, lo)
+            s_hi = max(bisect_right(sentence_offsets, hi) - 1, s_lo)
+
+        # -- slide the alphabetic token window: add new words, drop old ones
+        new_lo, new_hi = alpha_pos[lo], alpha_pos[hi]
+        for i in range(a_hi, new_hi):
+            token = alpha[i]
+            count = freq.get(token, 0) + 1
+            freq[token] = count
+            hapax_count += 1 if count == 1 else -1 if count == 2 else 0
+            s_sum += surprisals[i]
+            s_sq_sum += surprisals[i] * surprisals[i]
+        for i in range(a_lo, new_lo):
+            token = alpha[i]
+            count = freq[token] - 1
+            if count:
+                freq[token] = count
+            else:
+                del freq[token]
+            hapax_count += 1 if count == 1 else -1 if count == 0 else 0
+            s_sum -= surprisals[i]
+            s_sq_sum -= surprisals[i] * surprisals[i]
+        s_moves += (new_hi - a_hi) + (new_lo - a_lo)
+        a_lo, a_hi = new_lo, new_hi
+        n_alpha = a_hi - a_lo
+
+        # Re-sum once the running float sums have absorbed a window's worth
+        # of updates, which bounds rounding drift at amortised O(1) cost.
+        if s_moves > n_alpha:
+            in_window = surprisals[a_lo:a_hi]
+            s_sum = sum(in_window)
+            s_sq_sum = sum(s * s for s in in_window)
+            s_moves = 0
+
+        # -- burstiness: exact from integer prefix sums
+        n_sent = s_hi - s_lo
+        cv = 0.0
+        if n_sent >= 2:
+            total = length_sums[s_hi] - length_sums[s_lo]
+            sq_total = length_sq_sums[s_hi] - length_sq_sums[s_lo]
+            variance = (n_sent * sq_total - total * total) / (n_sent * n_sent)
+            cv = math.sqrt(variance) / (total / n_sent)
+
+        # -- surprisal variance (population, as in compute_surprisal_proxy)
+        s_variance = 0.0
+        if n_alpha >= 10:
+            s_variance = max((s_sq_sum - s_sum * s_sum / n_alpha) / n_alpha, 0.0)
+
+        window_tokens = mtld_ids[mtld_pos[lo]:mtld_pos[hi]]
+        mtld = 0.0
+        if len(window_tokens) >= 10:
+            mtld = _mtld_result(
+                len(window_tokens),
+                _mtld_one_direction(window_tokens),
+                _mtld_one_direction(window_tokens[::-1]),
+            )["mtld"]
+
+        windows.append({
+            "start": start,
+            "end": end,
+            "burstiness_cv": round(cv, 4),
+            "mtld": mtld,
+            "hapax_rate": round(hapax_count / n_alpha, 4) if n_alpha else 0.0,
+            "surprisal_variance": round(s_variance, 4),
+            "preview": " ".join(
+                doc.text[spans.word_starts[i]:spans.word_ends[i]]
+                for i in words[lo:min(hi, lo + _PROFILE_PREVIEW_WORDS)]
+            ),
+        })
+
+    return {
+        "unit": unit,
+        "window": window,
+        "step": step,
+        "unit_count": unit_count,
+        "window_count": len(windows),
+        "windows": windows,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Sentence-level sufficient statistics (attribution and candidate rewrites)
+# ---------------------------------------------------------------------------
+
+class _SpanShare:
+    """What one stretch of text contributes to the document totals."""
+
+    __slots__ = (
+        "lengths", "questions", "hedges", "connectives", "pronouns", "contractions",
+        "types", "abstracts", "surprisals", "mtld_ids",
+    )
+
+
+def _span_share(
+    doc: AnalyzedDocument,
+    start: int,
+    end: int,
+    first_word: int,
+    last_word: int,
+    lengths: list[int],
+    questions: int,
+) -> _SpanShare:
+    """Count the contribution of ``doc.text[start:end]`` (words *first_word* to *last_word*)."""
+    share = _SpanShare()
+    span = doc.text[start:end]
+    counts = _LEXICON_MATCHER.count(span.lower())
+    share.lengths = lengths
+    share.questions = questions
+    share.hedges = sum(counts["hedge"].values())
+    share.connectives = counts["connective"]
+    share.pronouns = len(_FIRST_PERSON_RE.findall(span))
+    share.contractions = len(_CONTRACTION_RE.findall(span))
+
+    token_ids = doc.token_ids
+    features = doc.token_features
+    surprisal_by_id = _token_features(doc.vocabulary)[2]
+    types: dict[int, int] = {}
+    surprisals: list[float] = []
+    mtld_ids = array("I")
+    abstracts = 0
+    for word in range(first_word, last_word):
+        flags = features[word]
+        token = token_ids[word]
+        if flags & TOKEN_ALNUM:
+            mtld_ids.append(token)
+        if flags & TOKEN_ABSTRACT:
+            abstracts += 1
+        if flags & TOKEN_ALPHA:
+            types[token] = types.get(token, 0) + 1
+            surprisals.append(surprisal_by_id[token])
+    share.types = types
+    share.abstracts = abstracts
+    share.surprisals = surprisals
+    share.mtld_ids = mtld_ids
+    return share
+
+
+class _SentenceStatistics:
+    """Document totals from which sentence edits are evaluated without re-analysis.
+
+    ``totals`` holds sentence-length sums, hedge, connective, question,
+    pronoun and contraction counts, word, hapax and abstract-noun counts,
+    and surprisal sums.  Replacing a sentence subtracts its share and adds
+    the replacement's; only the hapax count and the number of connective
+    types need the frequency spectrum and connective counts, and only for
+    the types involved.  MTLD is re-stitched exactly from checkpoints of
+    the document's own forward and backward runs (see :func:`_mtld_stitch`).
+    Built once per document and cached on it.
+    """
+
+    def __init__(self, doc: AnalyzedDocument) -> None:
+        self.doc = doc
+        lengths = doc.sentence_lengths
+        lexicon = doc.lexicon_counts
+        self.connective_counts = lexicon["connective"]
+        self.spectrum = doc.frequency_spectrum
+        surprisals = doc.surprisals
+        self.totals = (
+            len(lengths),
+            sum(lengths),
+            sum(length * length for length in lengths),
+            sum(lexicon["hedge"].values()),
+            sum(self.connective_counts.values()),
+            len(self.connective_counts),
+            doc.question_count,
+            len(doc.pronouns),
+            len(doc.contractions),
+            len(doc.word_ids),
+            _hapax_count(self.spectrum),
+            len(doc.abstract_ids),
+            math.fsum(surprisals),
+            math.fsum(s * s for s in surprisals),
+        )
+
+    def share(self, index: int) -> _SpanShare:
+        """Return the share of sentence *index*."""
+        spans = self.doc.spans
+        start, end = spans.sentence_starts[index], spans.sentence_ends[index]
+        first = spans.sentence_first_words[index]
+        length = spans.sentence_lengths[index]
+        return _span_share(
+            self.doc, start, end, first, first + length, [length], int(self.doc.text[end - 1] == "?"),
+        )
+
+    def text_share(self, text: str) -> _SpanShare:
+        """Return the share of *text* analysed on its own, as a replacement."""
+        doc = AnalyzedDocument(text, self.doc.vocabulary)
+        return _span_share(
+            doc, 0, len(text), 0, len(doc.token_ids), list(doc.sentence_lengths), doc.question_count,
+        )
+
+    def replaced(self, old: _SpanShare, new: _SpanShare | None = None) -> tuple:
+        """Return the totals with *old* replaced by *new* (or removed)."""
+        (
+            n, length_sum, length_sq_sum, hedges, connectives, connective_types,
+            questions, pronouns, contractions, words, hapax, abstracts, s_sum, s_sq_sum,
+        ) = self.totals
+        changes: Counter = Counter()
+        entries: Counter = Counter()
+        for sign, part in ((-1, old), (1, new)):
+            if part is None:
+                continue
+            n += sign * len(part.lengths)
+            length_sum += sign * sum(part.lengths)
+            length_sq_sum += sign * sum(length * length for length in part.lengths)
+            hedges += sign * part.hedges
+            connectives += sign * sum(part.connectives.values())
+            questions += sign * part.questions
+            pronouns += sign * part.pronouns
+            contractions += sign * part.contractions
+            words += sign * len(part.surprisals)
+            abstracts += sign * part.abstracts
+            s_sum += sign * math.fsum(part.surprisals)
+            s_sq_sum += sign * math.fsum(s * s for s in part.surprisals)
+            for token, count in part.types.items():
+                changes[token] += sign * count
+            for entry, count in part.connectives.items():
+                entries[entry] += sign * count
+
+        spectrum = self.spectrum
+        for token, change in changes.items():
+            if change:
+                count = spectrum.get(token, 0)
+                hapax += (count + change == 1) - (count == 1)
+        connective_counts = self.connective_counts
+        for entry, change in entries.items():
+            if change:
+                count = connective_counts.get(entry, 0)
+                connective_types += (count + change > 0) - (count > 0)
+        return (
+            n, length_sum, length_sq_sum, hedges, connectives, connective_types,
+            questions, pronouns, contractions, words, hapax, abstracts, s_sum, s_sq_sum,
+        )
+
+    @cached_property
+    def mtld_ranges(self) -> list[tuple[int, int]]:
+        """Range of every sentence in the MTLD token stream."""
+        spans = self.doc.spans
+        selected = self.doc.token_features.translate(_CLASS_SELECTORS[TOKEN_ALNUM])
+        before = array("I", accumulate(selected, initial=0))
+        return [
+            (before[first], before[first + length])
+            for first, length in zip(spans.sentence_first_words, spans.sentence_lengths)
+        ]
+
+    @cached_property
+    def mtld_forward(self) -> _MTLDRuns:
+        return _MTLDRuns(self.doc.mtld_ids, [a for r in self.mtld_ranges for a in r])
+
+    @cached_property
+    def mtld_backward(self) -> _MTLDRuns:
+        n = len(self.doc.mtld_ids)
+        return _MTLDRuns(self.doc.mtld_ids[::-1], [n - a for r in self.mtld_ranges for a in r])
+
+    @cached_property
+    def mtld(self) -> dict:
+        """MTLD result of the document itself."""
+        fresh = (0.0, frozenset(), 0)
+        return _mtld_result(
+            len(self.doc.mtld_ids),
+            self.mtld_forward.factors_from(fresh, 0),
+            self.mtld_backward.factors_from(fresh, 0),
+        )
+
+    def mtld_replaced(self, index: int, ids: array) -> dict:
+        """Return the MTLD result with sentence *index*'s tokens replaced by *ids*."""
+        n = len(self.doc.mtld_ids)
+        a, b = self.mtld_ranges[index]
+        count = n - (b - a) + len(ids)
+        if count < 10:
+            return _mtld_result(count, 0.0, 0.0)
+        # Each pass: the stream's own state before the sentence, then the
+        # inserted tokens, then the rest of the stream.
+        forward, backward = self.mtld_forward, self.mtld_backward
+        factors_fwd = forward.factors_from(_mtld_advance(ids, forward.snapshots[a]), b)
+        factors_bwd = backward.factors_from(
+            _mtld_advance(reversed(ids), backward.snapshots[n - b]), n - a,
+        )
+        return _mtld_result(count, factors_fwd, factors_bwd)
+
+
+def _rewrite_values(totals: tuple, mtld: dict, options: dict) -> dict:
+    """Evaluate the sentence-dependent metrics and composite from *totals*.
+
+    Values are rounded as the full results round them before the
+    penalties and the composite read them, so unchanged totals reproduce
+    ``compute_all_metrics``.
+    """
+    (
+        n, length_sum, length_sq_sum, hedges, connectives, connective_types,
+        questions, pronouns, contractions, words, hapax, abstracts, s_sum, s_sq_sum,
+    ) = totals
+    cv, fano = _length_moments(n, length_sum, length_sq_sum)
+    sentence_count = n or 1
+    threshold = 0.35 if options["non_native"] else 0.45
+    burstiness_penalty = (threshold - cv) / threshold * 100 if n >= 2 and cv < threshold else 0.0
+    s_variance = 0.0
+    if words >= 10:
+        s_variance = max((s_sq_sum - s_sum * s_sum / words) / words, 0.0)
+
+    values = {
+        "burstiness_cv": cv,
+        "fano_factor": fano,
+        "mtld": mtld["mtld"],
+        "hedge_density": hedges / sentence_count,
+        "connective_diversity": connective_types / connectives if connectives else 0.0,
+        "question_ratio": questions / sentence_count,
+        "pronoun_density": pronouns / sentence_count,
+        "hapax_rate": hapax / words if words else 0.0,
+        "contraction_density": contractions / sentence_count,
+        "abstract_noun_ratio": abstracts / words if words else 0.0,
+        "surprisal_variance": s_variance,
+    }
+    values["discourse_penalty"] = _compute_discourse_penalty(
+        {"diversity": round(values["connective_diversity"], 4)},
+        {"ratio": round(values["question_ratio"], 4)},
+        {"density": round(values["pronoun_density"], 4)},
+    )
+    values["psycholinguistic_penalty"] = _compute_psycholinguistic_penalty(
+        {"rate": round(values["hapax_rate"], 4)},
+        {"density": round(values["contraction_density"], 4)},
+        {"ratio": round(values["abstract_noun_ratio"], 4)},
+        {"variance": round(s_variance, 4)},
+    )
+    values["composite_score"] = compute_composite_score(
+        options["pattern_score"],
+        {
+            "burstiness_penalty": round(burstiness_penalty, 2),
+            "vocab_diversity_penalty": mtld["penalty"],
+            "structural_penalty": options["structural_penalty"],
+            "discourse_penalty": values["discourse_penalty"],
+            "psycholinguistic_penalty": values["psycholinguistic_penalty"],
+        },
+        scoring_version=options["scoring_version"],
+    )["composite_score"]
+    return values
+
+
+def _length_moments(n: int, length_sum: int, length_sq_sum: int) -> tuple[float, float]:
+    """Return (burstiness CV, Fano factor) of sentence lengths given their sums."""
+    if not n or length_sum <= 0:
+        return 0.0, 0.0
+    mean = length_sum / n
+    variance = (n * length_sq_sum - length_sum * length_sum) / (n * n)
+    cv = math.sqrt(variance) / mean if n >= 2 else 0.0
+    return cv, variance / mean
+
+
+# ---------------------------------------------------------------------------
+# Per-sentence attribution (closed-form leave-one-out)
+# ---------------------------------------------------------------------------
+
+# Attributed metrics and the direction that reads as more human-like.
+_ATTRIBUTION_DIRECTIONS = {
+    "burstiness_cv": 1,
+    "fano_factor": 1,
+    "hedge_density": -1,
+    "connective_diversity": 1,
+    "composite_score": -1,
+}
+_ATTRIBUTION_TOP = 5
+
+
+def compute_sentence_attribution(
+    text: "str | AnalyzedDocument",
+    pattern_score: float = 0,
+    structural_penalty: float = 0,
+    non_native: bool = False,
+    scoring_version: str = "v3",
+    top: int = _ATTRIBUTION_TOP,
+) -> dict:
+    """Report how each sentence moves burstiness, Fano, hedges, connectives and composite.
+
+    For every sentence, ``removal`` gives the change in burstiness CV, Fano
+    factor, hedge density, connective diversity and composite score if the
+    sentence were deleted, and ``one_more_word`` the change in CV and Fano
+    if it were one word longer.  Document totals are built once
+    (``AnalyzedDocument.sentence_statistics``); each sentence's effect
+    subtracts its own share and re-evaluates the metrics, so the whole
+    report costs about one pass over the text.  ``top_removals`` lists, per
+    metric, the sentences whose removal moves it furthest in the
+    human-like direction.
+    """
+    doc = _as_document(text)
+    stats = doc.sentence_statistics
+    options = _metric_options(pattern_score, structural_penalty, non_native, scoring_version)
+    baseline = _rewrite_values(stats.totals, stats.mtld, options)
+    n, length_sum, length_sq_sum = stats.totals[:3]
+
+    sentences: list[dict] = []
+    for index in range(n):
+        share = stats.share(index)
+        removed = _rewrite_values(
+            stats.replaced(share), stats.mtld_replaced(index, array("I")), options,
+        )
+        length = share.lengths[0]
+        cv, fano = _length_moments(n, length_sum + 1, length_sq_sum + 2 * length + 1)
+        start, end = doc.spans.sentence_starts[index], doc.spans.sentence_ends[index]
+        sentences.append({
+            "index": index,
+            "start": start,
+            "end": end,
+            "length": length,
+            "preview": " ".join(doc.text[start:end].split()[:_PROFILE_PREVIEW_WORDS]),
+            "removal": {
+                name: round(removed[name] - baseline[name], 4) for name in _ATTRIBUTION_DIRECTIONS
+            },
+            "one_more_word": {
+                "burstiness_cv": round(cv - baseline["burstiness_cv"], 4),
+                "fano_factor": round(fano - baseline["fano_factor"], 4),
+            },
+        })
+
+    top_removals: dict[str, list[int]] = {}
+    for name, direction in _ATTRIBUTION_DIRECTIONS.items():
+        gains = sorted(
+            ((direction * s["removal"][name], s["index"]) for s in sentences),
+            key=lambda gain: -gain[0],
+        )
+        top_removals[name] = [index for gain, index in gains[:top] if gain > 0]
+
+    return {
+        "sentence_count": len(sentences),
+        "baseline": {name: round(baseline[name], 4) for name in _ATTRIBUTION_DIRECTIONS},
+        "sentences": sentences,
+        "top_removals": top_removals,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Candidate sentence rewrites
+# ---------------------------------------------------------------------------
+
+def evaluate_sentence_candidates(
+    text: "str | AnalyzedDocument",
+    sentence_index: int,
+    candidates: list[str],
+    pattern_score: float = 0,
+    structural_penalty: float = 0,
+    non_native: bool = False,
+    scoring_version: str = "v3",
+) -> dict:
+    """Score rewrites of one sentence without re-analysing the document.
+
+    Each candidate replaces sentence *sentence_index* (an empty string
+    deletes it) and is applied as a delta to the document totals: its own
+    sentences, lexicon hits, pronouns, contractions, words and surprisals
+    are counted, the old sentence's are subtracted, and MTLD is stitched
+    exactly onto the document's own runs.  The cost per candidate grows
+    with the candidate, not the document.  Candidates are analysed as
+    standalone text, so each should end with sentence punctuation.
+    Returns the sentence-dependent metrics and composite for every
+    candidate, their change from the current text, and the candidate with
+    the lowest composite.
+    """
+    doc = _as_document(text)
+    if not 0 <= sentence_index < len(doc.sentence_lengths):
+        raise ValueError(
+            f"sentence_index must be in [0, {len(doc.sentence_lengths)}), got {sentence_index}",
+        )
+    stats = doc.sentence_statistics
+    options = _metric_options(pattern_score, structural_penalty, non_native, scoring_version)
+    baseline = _rewrite_values(stats.totals, stats.mtld, options)
+    old = stats.share(sentence_index)
+
+    evaluated: list[dict] = []
+    for index, candidate in enumerate(candidates):
+        new = stats.text_share(candidate)
+        values = _rewrite_values(
+            stats.replaced(old, new), stats.mtld_replaced(sentence_index, new.mtld_ids), options,
+        )
+        evaluated.append({
+            "index": index,
+            "sentence_count": len(new.lengths),
+            "metrics": {name: round(value, 4) for name, value in values.items()},
+            "delta": {name: round(values[name] - baseline[name], 4) for name in values},
+        })
+
+    start = doc.spans.sentence_starts[sentence_index]
+    end = doc.spans.sentence_ends[sentence_index]
+    return {
+        "sentence_index": sentence_index,
+        "original": doc.text[start:end],
+        "baseline": {name: round(value, 4) for name, value in baseline.items()},
+        "candidates": evaluated,
+        "best_candidate": min(
+            range(len(evaluated)), key=lambda i: evaluated[i]["metrics"]["composite_score"],
+        ) if evaluated else None,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Edit planner (closed-form edit counts for the thresholds)
+# ---------------------------------------------------------------------------
+
+_PLAN_SHORT_LENGTH = 4
+_PLAN_LONG_LENGTH = 40
+_PLAN_PENALTY_TARGET = 20.0  # as in humanizer_status
+
+# Edits that address each penalty, in order of preference on ties.
+_PLAN_SECTIONS = {
+    "discourse_penalty": ("add_question", "add_first_person", "vary_connective"),
+    "psycholinguistic_penalty": ("add_contraction", "add_hapax_word", "replace_abstract_noun"),
+}
+_PLAN_SENTENCE_EDITS = ("add_short_sentence", "add_long_sentence")
+_PLAN_COMPOSITE_EDITS = (
+    *_PLAN_SECTIONS["discourse_penalty"], *_PLAN_SECTIONS["psycholinguistic_penalty"],
+    *_PLAN_SENTENCE_EDITS,
+)
+_CONNECTIVE_TYPES = len(_CONNECTIVE_PHRASES) + len(_CONNECTIVES)
+
+
+def _planned_totals(totals: tuple, edit: str, units: int, sizes: dict) -> tuple:
+    """Return *totals* after *units* applications of *edit*.
+
+    Sentence edits add sentences of ``sizes[edit]`` words and change only
+    the sentence-length sums; every other edit changes a single count.
+    """
+    (
+        n, length_sum, length_sq_sum, hedges, connectives, connective_types,
+        questions, pronouns, contractions, words, hapax, abstracts, s_sum, s_sq_sum,
+    ) = totals
+    if edit in _PLAN_SENTENCE_EDITS:
+        length = sizes[edit]
+        n += units
+        length_sum += units * length
+        length_sq_sum += units * length * length
+    elif edit == "add_question":
+        questions += units
+    elif edit == "add_first_person":
+        pronouns += units
+    elif edit == "vary_connective":
+        if not connectives:  # nothing to vary: add a connective instead
+            connectives += units
+        connective_types += units
+    elif edit == "add_contraction":
+        contractions += units
+    elif edit == "add_hapax_word":
+        hapax += units
+    elif edit == "replace_abstract_noun":
+        abstracts -= units
+    return (
+        n, length_sum, length_sq_sum, hedges, connectives, connective_types,
+        questions, pronouns, contractions, words, hapax, abstracts, s_sum, s_sq_sum,
+    )
+
+
+def _units_to_reach(count: int, denominator: int, ratio: float) -> int:
+    """Smallest number of units to add to *count* so count / denominator >= ratio."""
+    return max(0, math.ceil(round(ratio * denominator - count, 9)))
+
+
+def _sentences_to_reach(
+    n: int, length_sum: int, length_sq_sum: int, length: int, threshold: float,
+) -> int | None:
+    """Fewest sentences of *length* words to add for a burstiness CV >= *threshold*.
+
+    None if no number of them gets there.
+    """
+    def reaches(k: int) -> bool:
+        moments = _length_moments(n + k, length_sum + k * length, length_sq_sum + k * length * length)
+        return moments[0] >= threshold
+
+    if reaches(0):
+        return 0
+    # CV >= t  <=>  (n + k)(Q + k l^2) >= (1 + t^2)(S + k l)^2, a quadratic
+    # in k that opens downwards: the CV rises, peaks and falls back.
+    r = 1 + threshold * threshold
+    a = -threshold * threshold * length * length
+    b = n * length * length + length_sq_sum - 2 * r * length_sum * length
+    c = n * length_sq_sum - r * length_sum * length_sum
+    discriminant = b * b - 4 * a * c
+    if discriminant < 0 or not a:
+        return None
+    root = math.sqrt(discriminant)
+    low, high = sorted(((-b + root) / (2 * a), (-b - root) / (2 * a)))
+    k = max(math.ceil(low), 1)
+    # Correct for rounding in the roots.
+    while k > 1 and reaches(k - 1):
+        k -= 1
+    while k <= high + 1 and not reaches(k):
+        k += 1
+    return k if reaches(k) else None
+
+
+def _split_plan(totals: tuple, lengths, threshold: float, piece: int) -> tuple[list[int], tuple]:
+    """Split sentences until the burstiness CV reaches *threshold*.
+
+    Each split cuts a *piece*-word sentence off one sentence.  That keeps
+    the length sum and lowers the sum of squares by ``2 * piece * (L - piece)``,
+    so the shortest sentences that can spare the piece gain the most.
+    Stops once a split no longer raises the CV.  Returns the indices split
+    and the totals after them.
+    """
+    n, length_sum, length_sq_sum = totals[:3]
+    cv = _length_moments(n, length_sum, length_sq_sum)[0]
+    indices: list[int] = []
+    for length, index in sorted((length, i) for i, length in enumerate(lengths) if length >= 2 * piece):
+        if cv >= threshold:
+            break
+        sq_sum = length_sq_sum - 2 * piece * (length - piece)
+        split = _length_moments(n + 1, length_sum, sq_sum)[0]
+        if split <= cv:
+            break
+        n, length_sq_sum, cv = n + 1, sq_sum, split
+        indices.append(index)
+    return indices, (n, length_sum, length_sq_sum) + totals[3:]
+
+
+def _plan_limits(totals: tuple, burstiness_threshold: float, sizes: dict) -> dict[str, int]:
+    """Return, per edit, the number of units after which it stops helping.
+
+    Ratios are taken to the ideals of ``_compute_discourse_penalty`` and
+    ``_compute_psycholinguistic_penalty``.
+    """
+    (
+        n, length_sum, length_sq_sum, _, connectives, connective_types,
+        questions, pronouns, contractions, words, hapax, abstracts, _, _,
+    ) = totals
+    sentence_count = n or 1
+    limits = {
+        edit: _sentences_to_reach(n, length_sum, length_sq_sum, sizes[edit], burstiness_threshold) or 0
+        for edit in _PLAN_SENTENCE_EDITS
+    }
+    limits["add_question"] = min(_units_to_reach(questions, sentence_count, 0.03), n - questions)
+    limits["add_first_person"] = _units_to_reach(pronouns, sentence_count, 0.05)
+    limits["vary_connective"] = 1 if not connectives else min(
+        _units_to_reach(connective_types, connectives, 0.70),
+        connectives - connective_types,
+        _CONNECTIVE_TYPES - connective_types,
+    )
+    limits["add_contraction"] = _units_to_reach(contractions, sentence_count, 0.10)
+    limits["add_hapax_word"] = min(_units_to_reach(hapax, words, 0.45), words - hapax)
+    limits["replace_abstract_noun"] = max(0, abstracts - math.floor(round(0.30 * words, 9)))
+    return limits
+
+
+def _plan_edits(totals: tuple, limits: dict, score, target: float, sizes: dict) -> tuple[dict, tuple]:
+    """Choose edit counts that bring ``score(totals)`` down to *target*.
+
+    Each edit helps linearly up to its limit, so edits are taken whole in
+    order of score gained per unit; the last one is cut to the fewest units
+    that pass, by bisection on the exact score.  Returns the edit counts and
+    the totals after them (short of *target* if the edits run out).
+    """
+    edits: dict[str, int] = {}
+    current = score(totals)
+    if current <= target:
+        return edits, totals
+    ranked = []
+    for edit, limit in limits.items():
+        if limit > 0:
+            gain = current - score(_planned_totals(totals, edit, limit, sizes))
+            if gain > 0:
+                ranked.append((gain / limit, edit, limit))
+    ranked.sort(key=lambda entry: -entry[0])
+    for _, edit, limit in ranked:
+        full = _planned_totals(totals, edit, limit, sizes)
+        if score(full) > target:
+            edits[edit] = limit
+            totals = full
+            continue
+        low, high = 1, limit
+        while low < high:
+            middle = (low + high) // 2
+            if score(_planned_totals(totals, edit, middle, sizes)) <= target:
+                high = middle
+            else:
+                low = middle + 1
+        edits[edit] = low
+        return edits, _planned_totals(totals, edit, low, sizes)
+    return edits, totals
+
+
+def compute_edit_plan(
+    text: "str | AnalyzedDocument",
+    discipline: str = "default",
+    target: float = 30,
+    pattern_score: float = 0,
+    structural_penalty: float = 0,
+    non_native: bool = False,
+    scoring_version: str = "v3",
+    short_length: int = _PLAN_SHORT_LENGTH,
+    long_length: int = _PLAN_LONG_LENGTH,
+) -> dict:
+    """Count the edits that would bring the text past the readiness thresholds.
+
+    Works on the document totals (``AnalyzedDocument.sentence_statistics``)
+    without generating or analysing any text:
+
+    * ``burstiness``: how many *short_length*- or *long_length*-word
+      sentences to add, solved from the CV quadratic, or which sentences to
+      split, to reach the discipline's burstiness threshold.
+    * ``discourse_penalty`` / ``psycholinguistic_penalty``: how many
+      questions, first-person pronouns and varied connectives, or
+      contractions, once-only words and replaced abstract nouns, bring each
+      penalty to 20 (the ``humanizer_status`` target).
+    * ``composite_score``: further edits, if those still leave the
+      composite above *target*.
+    * ``marginal_gains``: composite points gained per edit of each kind,
+      and how many edits keep gaining.
+
+    ``plan`` adds these up and evaluates the result exactly.  Edits are
+    modelled as changing only their own counts (an added sentence carries
+    no hedges, a new word no surprisal); MTLD and surprisal variance are
+    held fixed.  Sentences shorter than three words are not counted, so
+    neither length may be below that.
+    """
+    if min(short_length, long_length) < _MIN_SENTENCE_WORDS:
+        raise ValueError(
+            f"short_length and long_length must be at least {_MIN_SENTENCE_WORDS} words, "
+            f"got {short_length} and {long_length}",
+        )
+    doc = _as_document(text)
+    stats = doc.sentence_statistics
+    options = _metric_options(pattern_score, structural_penalty, non_native, scoring_version)
+    profile = get_discipline_profile(discipline)
+    sizes = {"add_short_sentence": short_length, "add_long_sentence": long_length}
+    penalty_threshold = 0.35 if non_native else 0.45
+
+    def evaluate(totals: tuple) -> dict:
+        return _rewrite_values(totals, stats.mtld, options)
+
+    def cv_of(totals: tuple) -> float:
+        return round(_length_moments(*totals[:3])[0], 4)
+
+    baseline = evaluate(stats.totals)
+    lengths = doc.sentence_lengths
+
+    # Burstiness: each way of getting there on its own.
+    threshold = profile["burstiness_threshold"]
+    n, length_sum, length_sq_sum = stats.totals[:3]
+    burstiness_options: dict[str, dict] = {}
+    reached: dict[str, tuple] = {}
+    for edit in _PLAN_SENTENCE_EDITS:
+        count = _sentences_to_reach(n, length_sum, length_sq_sum, sizes[edit], threshold)
+        after = _planned_totals(stats.totals, edit, count or 0, sizes)
+        burstiness_options[edit] = {
+            "count": count,
+            "sentence_length": sizes[edit],
+            "burstiness_cv": cv_of(after),
+        }
+        if count is not None:
+            reached[edit] = after
+    indices, after = _split_plan(stats.totals, lengths, threshold, short_length)
+    passed = _length_moments(*after[:3])[0] >= threshold
+    burstiness_options["split_sentence"] = {
+        "count": len(indices) if passed else None,
+        "sentence_indices": indices,
+        "piece_length": short_length,
+        "burstiness_cv": cv_of(after),
+    }
+    if passed:
+        reached["split_sentence"] = after
+    recommended = None
+    if _length_moments(n, length_sum, length_sq_sum)[0] < threshold:
+        recommended = min(reached, key=lambda edit: burstiness_options[edit]["count"], default=None)
+
+    plan_edits: dict[str, int] = {}
+    totals = stats.totals
+    if recommended is not None:
+        totals = reached[recommended]
+        plan_edits[recommended] = burstiness_options[recommended]["count"]
+
+    result = {
+        "discipline": discipline,
+        "baseline": {
+            name: round(baseline[name], 4)
+            for name in ("burstiness_cv", "mtld", "discourse_penalty", "psycholinguistic_penalty", "composite_score")
+        },
+        "burstiness": {
+            "current": cv_of(stats.totals),
+            "threshold": threshold,
+            "passed": cv_of(stats.totals) >= threshold,
+            "options": burstiness_options,
+            "recommended": recommended,
+        },
+    }
+
+    # Penalties, in turn, from the totals the previous steps leave.
+    sections = (*_PLAN_SECTIONS.items(), ("composite_score", _PLAN_COMPOSITE_EDITS))
+    for name, section_edits in sections:
+        goal = target if name == "composite_score" else _PLAN_PENALTY_TARGET
+        limits = _plan_limits(totals, penalty_threshold, sizes)
+        edits, totals = _plan_edits(
+            totals,
+            {edit: limits[edit] for edit in section_edits},
+            lambda t: evaluate(t)[name],
+            goal,
+            sizes,
+        )
+        for edit, count in edits.items():
+            plan_edits[edit] = plan_edits.get(edit, 0) + count
+        after = evaluate(totals)[name]
+        result[name] = {
+            "current": round(baseline[name], 4),
+            "target": goal,
+            "passed": baseline[name] <= goal,
+            "edits": edits,
+            "after": round(after, 4),
+            "reachable": after <= goal,
+        }
+
+    result["mtld"] = {
+        "current": baseline["mtld"],
+        "threshold": profile["mtld_threshold"],
+        "passed": baseline["mtld"] >= profile["mtld_threshold"],
+    }
+
+    # Composite points per edit, averaged over the edits that keep helping.
+    composite = baseline["composite_score"]
+    gains: dict[str, dict] = {}
+    for edit, limit in _plan_limits(stats.totals, penalty_threshold, sizes).items():
+        after = _planned_totals(stats.totals, edit, limit, sizes)
+        gains[edit] = {
+            "composite_per_edit": round((composite - evaluate(after)["composite_score"]) / limit, 4) if limit else 0.0,
+            "useful_edits": limit,
+        }
+    indices, after = _split_plan(stats.totals, lengths, penalty_threshold, short_length)
+    gains["split_sentence"] = {
+        "composite_per_edit": round(
+            (composite - evaluate(after)["composite_score"]) / len(indices), 4,
+        ) if indices else 0.0,
+        "useful_edits": len(indices),
+    }
+    result["marginal_gains"] = gains
+
+    final = evaluate(totals)
+    result["plan"] = {
+        "edits": plan_edits,
+        "total_edits": sum(plan_edits.values()),
+        "metrics": {
+            name: round(final[name], 4)
+            for name in ("burstiness_cv", "discourse_penalty", "psycholinguistic_penalty", "composite_score")
+        },
+        "passes": (
+            final["burstiness_cv"] >= threshold
+            and final["discourse_penalty"] <= _PLAN_PENALTY_TARGET
+            and final["psycholinguistic_penalty"] <= _PLAN_PENALTY_TARGET
+            and final["composite_score"] <= target
+        ),
+    }
+    return result
+
+
 # ---------------------------------------------------------------------------
 # Composite score
 # ---------------------------------------------------------------------------
@@ -1076,73 +2516,252 @@ def _compute_psycholinguistic_penalty(
     return round((hr_pen + cd_pen + ar_pen + sv_pen) / 4, 2)
 
 
+# ---------------------------------------------------------------------------
+# Metric registry and evaluator
+# ---------------------------------------------------------------------------
+
+class MetricSpec:
+    """A registered metric: how to compute it and what it reads.
+
+    *compute* is called as ``compute(doc, results, options)`` with the
+    ``AnalyzedDocument``, the results of the metrics named in *depends*
+    and the scoring options (``pattern_score``, ``structural_penalty``,
+    ``non_native``, ``scoring_version``).  *inputs* names the document
+    tokenisations it uses.
+    """
+
+    __slots__ = ("name", "compute", "inputs", "depends")
+
+    def __init__(self, name: str, compute, inputs: tuple = (), depends: tuple = ()) -> None:
+        self.name = name
+        self.compute = compute
+        self.inputs = tuple(inputs)
+        self.depends = tuple(depends)
+
+
+# Registration order is the key order of ``compute_all_metrics`` results.
+# Dependencies must be registered first, so it is also a topological order.
+METRIC_REGISTRY: dict[str, MetricSpec] = {}
+
+
+def _is_document_input(name: str) -> bool:
+    return name == "text" or isinstance(getattr(AnalyzedDocument, name, None), cached_property)
+
+
+def register_metric(name: str, compute, inputs: tuple = (), depends: tuple = ()) -> MetricSpec:
+    """Add a metric to ``METRIC_REGISTRY`` and return its spec.
+
+    *inputs* must be ``AnalyzedDocument`` attributes and *depends* already
+    registered metrics; a name can only be registered once.
+    """
+    if name in METRIC_REGISTRY:
+        raise ValueError(f"Metric {name!r} is already registered")
+    bad_inputs = [i for i in inputs if not _is_document_input(i)]
+    if bad_inputs:
+        raise ValueError(f"Metric {name!r} has unknown inputs {bad_inputs}")
+    missing = [d for d in depends if d not in METRIC_REGISTRY]
+    if missing:
+        raise ValueError(f"Metric {name!r} depends on unregistered metrics {missing}")
+    spec = MetricSpec(name, compute, inputs, depends)
+    METRIC_REGISTRY[name] = spec
+    return spec
+
+
+def resolve_metrics(names) -> list[str]:
+    """Return *names* plus everything they depend on, in evaluation order."""
+    needed: set[str] = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name in needed:
+            continue
+        if name not in METRIC_REGISTRY:
+            raise ValueError(
+                f"Unknown metric {name!r}; choose from {sorted(METRIC_REGISTRY)}",
+            )
+        needed.add(name)
+        pending.extend(METRIC_REGISTRY[name].depends)
+    return [name for name in METRIC_REGISTRY if name in needed]
+
+
+def metric_inputs(names) -> list[str]:
+    """Return the document tokenisations evaluating *names* will build."""
+    inputs: dict[str, None] = {}
+    for name in resolve_metrics(names):
+        inputs.update(dict.fromkeys(METRIC_REGISTRY[name].inputs))
+    return list(inputs)
+
+
+# --- Original metrics ---
+register_metric(
+    "burstiness",
+    lambda doc, results, options: compute_burstiness(doc, non_native=options["non_native"]),
+    inputs=("sentence_lengths",),
+)
+register_metric("mtld", lambda doc, results, options: compute_mtld(doc), inputs=("mtld_ids",))
+register_metric(
+    "fano_factor",
+    lambda doc, results, options: compute_fano_factor(results["burstiness"]["sentence_lengths"]),
+    depends=("burstiness",),
+)
+register_metric(
+    "sentence_length_range",
+    lambda doc, results, options: compute_sentence_length_range(
+        results["burstiness"]["sentence_lengths"],
+    ),
+    depends=("burstiness",),
+)
+register_metric(
+    "paragraph_opener_diversity",
+    lambda doc, results, options: compute_paragraph_opener_diversity(doc),
+    inputs=("spans",),
+)
+register_metric(
+    "hedge_density",
+    lambda doc, results, options: compute_hedge_density(doc),
+    inputs=("lexicon_counts", "sentence_lengths"),
+)
+# --- v3 metrics: Tier 1 ---
+register_metric(
+    "hapax_rate",
+    lambda doc, results, options: compute_hapax_rate(doc),
+    inputs=("frequency_spectrum",),
+)
+register_metric(
+    "contraction_density",
+    lambda doc, results, options: compute_contraction_density(doc),
+    inputs=("text", "sentence_lengths"),
+)
+register_metric(
+    "paragraph_length_variance",
+    lambda doc, results, options: compute_paragraph_length_variance(doc),
+    inputs=("spans",),
+)
+register_metric(
+    "surprisal_proxy",
+    lambda doc, results, options: compute_surprisal_proxy(doc),
+    inputs=("surprisal_stats",),
+)
+register_metric(
+    "surprisal_autocorrelation",
+    lambda doc, results, options: compute_surprisal_autocorrelation(doc),
+    inputs=("surprisal_stats",),
+)
+# --- v3 metrics: Tier 2 ---
+register_metric(
+    "connective_diversity",
+    lambda doc, results, options: compute_connective_diversity(doc),
+    inputs=("lexicon_counts",),
+)
+register_metric(
+    "pronoun_density",
+    lambda doc, results, options: compute_pronoun_density(doc),
+    inputs=("text", "sentence_lengths"),
+)
+register_metric(
+    "question_ratio",
+    lambda doc, results, options: compute_question_ratio(doc),
+    inputs=("question_count", "sentence_lengths"),
+)
+register_metric(
+    "abstract_noun_ratio",
+    lambda doc, results, options: compute_abstract_noun_ratio(doc),
+    inputs=("abstract_ids", "word_ids"),
+)
+# --- Derived penalties and composite ---
+register_metric(
+    "discourse_penalty",
+    lambda doc, results, options: _compute_discourse_penalty(
+        results["connective_diversity"], results["question_ratio"], results["pronoun_density"],
+    ),
+    depends=("connective_diversity", "question_ratio", "pronoun_density"),
+)
+register_metric(
+    "psycholinguistic_penalty",
+    lambda doc, results, options: _compute_psycholinguistic_penalty(
+        results["hapax_rate"],
+        results["contraction_density"],
+        results["abstract_noun_ratio"],
+        results["surprisal_proxy"],
+    ),
+    depends=("hapax_rate", "contraction_density", "abstract_noun_ratio", "surprisal_proxy"),
+)
+register_metric(
+    "composite",
+    lambda doc, results, options: compute_composite_score(
+        options["pattern_score"],
+        {
+            "burstiness_penalty": results["burstiness"]["penalty"],
+            "vocab_diversity_penalty": results["mtld"]["penalty"],
+            "structural_penalty": options["structural_penalty"],
+            "discourse_penalty": results["discourse_penalty"],
+            "psycholinguistic_penalty": results["psycholinguistic_penalty"],
+        },
+        scoring_version=options["scoring_version"],
+    ),
+    depends=("burstiness", "mtld", "discourse_penalty", "psycholinguistic_penalty"),
+)
+
+
+def _metric_options(
+    pattern_score: float,
+    structural_penalty: float,
+    non_native: bool,
+    scoring_version: str,
+) -> dict:
+    return {
+        "pattern_score": pattern_score,
+        "structural_penalty": structural_penalty,
+        "non_native": non_native,
+        "scoring_version": scoring_version,
+    }
+
+
 def compute_all_metrics(
-    text: str,
+    text: "str | AnalyzedDocument",
     pattern_score: float = 0,
     structural_penalty: float = 0,
     non_native: bool = False,
     scoring_version: str = "v3",
+    metrics: "list[str] | None" = None,
 ) -> dict:
-    """Compute every metric and return a comprehensive results dict."""
-    # --- Original metrics ---
-    burstiness = compute_burstiness(text, non_native=non_native)
-    mtld = compute_mtld(text)
-    sentence_lengths = burstiness["sentence_lengths"]
-    fano = compute_fano_factor(sentence_lengths)
-    slr = compute_sentence_length_range(sentence_lengths)
-    opener_div = compute_paragraph_opener_diversity(text)
-    hedge = compute_hedge_density(text)
-
-    # --- v3 metrics: Tier 1 ---
-    hapax = compute_hapax_rate(text)
-    contraction = compute_contraction_density(text)
-    para_var = compute_paragraph_length_variance(text)
-    surprisal = compute_surprisal_proxy(text)
-    surprisal_ac = compute_surprisal_autocorrelation(text)
-
-    # --- v3 metrics: Tier 2 ---
-    connective_div = compute_connective_diversity(text)
-    pronoun = compute_pronoun_density(text)
-    question = compute_question_ratio(text)
-    abstract_noun = compute_abstract_noun_ratio(text)
-
-    # --- Derived penalties for v3 composite ---
-    discourse_penalty = _compute_discourse_penalty(
-        connective_div, question, pronoun,
-    )
-    psycholinguistic_penalty = _compute_psycholinguistic_penalty(
-        hapax, contraction, abstract_noun, surprisal,
-    )
+    """Compute every metric and return a comprehensive results dict.
 
-    composite = compute_composite_score(
-        pattern_score,
-        {
-            "burstiness_penalty": burstiness["penalty"],
-            "vocab_diversity_penalty": mtld["penalty"],
-            "structural_penalty": structural_penalty,
-            "discourse_penalty": discourse_penalty,
-            "psycholinguistic_penalty": psycholinguistic_penalty,
-        },
-        scoring_version=scoring_version,
-    )
+    The text is tokenised once and the resulting ``AnalyzedDocument`` is
+    shared by all metrics.  With *metrics*, only the named entries are
+    returned, and only they, their dependencies and the tokenisations
+    those read are computed.  Unknown names raise ValueError.
+    """
+    doc = _as_document(text)
+    order = resolve_metrics(METRIC_REGISTRY if metrics is None else metrics)
+    options = _metric_options(pattern_score, structural_penalty, non_native, scoring_version)
+    results: dict = {}
+    for name in order:
+        results[name] = METRIC_REGISTRY[name].compute(doc, results, options)
+    if metrics is None:
+        return results
+    requested = set(metrics)
+    return {name: value for name, value in results.items() if name in requested}
+
+
+def _assemble_all_metrics(
+    parts: dict,
+    pattern_score: float = 0,
+    structural_penalty: float = 0,
+    scoring_version: str = "v3",
+) -> dict:
+    """Derive the length, penalty and composite entries from per-metric *parts*.
 
-    return {
-        "burstiness": burstiness,
-        "mtld": mtld,
-        "fano_factor": fano,
-        "sentence_length_range": slr,
-        "paragraph_opener_diversity": opener_div,
-        "hedge_density": hedge,
-        "hapax_rate": hapax,
-        "contraction_density": contraction,
-        "paragraph_length_variance": para_var,
-        "surprisal_proxy": surprisal,
-        "surprisal_autocorrelation": surprisal_ac,
-        "connective_diversity": connective_div,
-        "pronoun_density": pronoun,
-        "question_ratio": question,
-        "abstract_noun_ratio": abstract_noun,
-        "discourse_penalty": discourse_penalty,
-        "psycholinguistic_penalty": psycholinguistic_penalty,
-        "composite": composite,
-    }
+    *parts* maps each text-level metric key of ``compute_all_metrics`` to its
+    result dict; registered metrics without document inputs are evaluated
+    on top of them and the full results dict is returned in the usual key
+    order.  Metrics needing a document that *parts* lacks are left out.
+    """
+    options = _metric_options(pattern_score, structural_penalty, False, scoring_version)
+    results: dict = {}
+    for name, spec in METRIC_REGISTRY.items():
+        if name in parts:
+            results[name] = parts[name]
+        elif not spec.inputs and all(d in results for d in spec.depends):
+            results[name] = spec.compute(None, results, options)
+    return results
@@ -0,0 +1,138 @@
+"""Map-reduce analysis of one large document across worker processes.
+
+``compute_all_metrics_parallel`` cuts the text at safe sentence boundaries
+(the same cuts the streaming analyser makes, so paragraphs, sentences,
+tokens and lexicon hits never straddle a cut unseen), summarises each chunk
+in a worker process as a :class:`~humanizer_mcp.streaming.PieceSummary`
+and merges the summaries in order.  Workers also run both MTLD passes over
+their chunk speculatively, from a fresh state, so the merge only replays
+each chunk until its factor boundaries line up with the speculation.  The
+result equals ``compute_all_metrics`` on the whole text.
+
+Full analyses of texts of at least ``HUMANIZER_PARALLEL_MIN_CHARS``
+characters (default 1 MiB; 0 disables) take this path automatically in
+``compute_all_metrics_cached``.
+
+Chunks run on one long-lived pool: the server's worker processes when it
+has registered them with :func:`use_executor`, otherwise a pool of one
+worker per CPU started on first use.  At most
+``HUMANIZER_PARALLEL_ANALYSES`` (default 1) split analyses run at once;
+further ones wait for a slot rather than crowd the same workers.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from humanizer_mcp.batch import _init_worker
+from humanizer_mcp.metrics import compute_all_metrics, resolve_metrics
+from humanizer_mcp.streaming import PieceSummary, StreamingAnalyzer, _safe_cut
+
+
+_PARALLEL_MIN_CHARS_ENV = "HUMANIZER_PARALLEL_MIN_CHARS"
+PARALLEL_MIN_CHARS = int(os.environ.get(_PARALLEL_MIN_CHARS_ENV, 1 << 20))
+
+_PARALLEL_ANALYSES_ENV = "HUMANIZER_PARALLEL_ANALYSES"
+MAX_PARALLEL_ANALYSES = max(int(os.environ.get(_PARALLEL_ANALYSES_ENV, 1)), 1)
+
+# Below this a chunk costs more to ship and merge than to analyse.
+_MIN_CHUNK_CHARS = 1 << 16
+
+# Worker processes come from a fork server (or are spawned where there is
+# none), never forked from the caller: a thread of the caller may hold a
+# lock, such as a cached_property lock, that the child would inherit held.
+WORKER_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn",
+)
+
+_executor: Executor | None = None
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(MAX_PARALLEL_ANALYSES)
+
+
+def use_executor(executor: Executor | None) -> None:
+    """Run chunks on *executor* (the server's worker pool), or on this module's pool if None."""
+    global _executor
+    _executor = executor
+
+
+def _chunk_executor() -> Executor:
+    global _pool
+    if _executor is not None:
+        return _executor
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1, mp_context=WORKER_CONTEXT, initializer=_init_worker,
+            )
+        return _pool
+
+
+def wants_parallel(chars: int) -> bool:
+    """Return True if a full analysis of *chars* characters should be split.
+
+    Never true inside a worker process, so pools are not nested.
+    """
+    return (
+        0 < PARALLEL_MIN_CHARS <= chars
+        and (os.cpu_count() or 1) > 1
+        and multiprocessing.parent_process() is None
+    )
+
+
+def split_text(text: str, parts: int) -> list[str]:
+    """Cut *text* into at most *parts* chunks at safe sentence boundaries.
+
+    Each cut is the last safe one before an even share of the text; a
+    stretch without any (one long unclosed parenthesis, say) joins the
+    next chunk.  The chunks concatenate back to *text*.
+    """
+    chunks: list[str] = []
+    start = 0
+    for k in range(1, parts):
+        target = len(text) * k // parts
+        if target <= start:
+            continue
+        # Nothing is open at a safe cut, so the prefix before *start* never
+        # changes the decision.
+        cut = _safe_cut(text[start:target])
+        if cut:
+            chunks.append(text[start:start + cut])
+            start += cut
+    chunks.append(text[start:])
+    return chunks
+
+
+def compute_all_metrics_parallel(
+    text: str,
+    max_workers: int | None = None,
+    min_chunk_chars: int = _MIN_CHUNK_CHARS,
+    metrics: list[str] | None = None,
+    **kwargs,
+) -> dict:
+    """Compute ``compute_all_metrics(text, **kwargs)`` on several processes.
+
+    The text is split into one chunk per worker (each at least
+    *min_chunk_chars*); workers of the shared pool summarise the chunks
+    and the summaries are merged in order.  A *metrics* selection is
+    applied to the full result.  Short texts, or a single worker, run
+    in-process.
+    """
+    if metrics is not None:
+        resolve_metrics(metrics)  # reject unknown names before any work
+    workers = max_workers or os.cpu_count() or 1
+    chunks = split_text(text, min(workers, len(text) // max(min_chunk_chars, 1)))
+    if len(chunks) < 2:
+        return compute_all_metrics(text, metrics=metrics, **kwargs)
+
+    analyzer = StreamingAnalyzer(**kwargs)
+    with _slots:
+        for summary in _chunk_executor().map(PieceSummary.standalone, chunks):
+            analyzer.merge(summary)
+    result = analyzer.result()
+    if metrics is not None:
+        selected = set(metrics)
+        result = {name: value for name, value in result.items() if name in selected}
+    return result
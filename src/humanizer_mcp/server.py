@@ -1,90 +1,231 @@
 """FastMCP server exposing stylometric humanization tools."""
 
+import argparse
+import asyncio
+import copy
+import functools
 import json
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 
 from mcp.server.fastmcp import FastMCP
 
+from humanizer_mcp.alignment import TextAlignment, compute_all_metrics_pair_cached, sentence_changes
+from humanizer_mcp.batch import _init_worker, compute_metrics_many
+from humanizer_mcp import alignment, cache, parallel
+from humanizer_mcp.cache import compute_all_metrics_cached
+from humanizer_mcp.documents import DOCUMENT_STORE
+from humanizer_mcp.sessions import SESSION_STORE
 from humanizer_mcp.metrics import (
-    DISCIPLINE_PROFILES,
-    _compute_discourse_penalty,
-    _compute_psycholinguistic_penalty,
-    compute_abstract_noun_ratio,
+    METRIC_REGISTRY,
+    AnalyzedDocument,
     compute_all_metrics,
-    compute_burstiness,
     compute_composite_score,
-    compute_connective_diversity,
-    compute_contraction_density,
-    compute_fano_factor,
-    compute_hapax_rate,
-    compute_hedge_density,
-    compute_mtld,
-    compute_paragraph_length_variance,
-    compute_paragraph_opener_diversity,
-    compute_pronoun_density,
-    compute_question_ratio,
-    compute_sentence_length_range,
-    compute_surprisal_autocorrelation,
-    compute_surprisal_proxy,
+    compute_edit_plan,
+    compute_sentence_attribution,
+    compute_window_profile,
+    evaluate_sentence_candidates,
     get_discipline_profile,
 )
 
 mcp = FastMCP("humanizer")
 
 
+# ---------------------------------------------------------------------------
+# Executor offloading
+# ---------------------------------------------------------------------------
+
+# Tool bodies are CPU-bound; running them on the event loop would stall
+# every other request (pings and cancellations included).  Each tool is
+# therefore registered as an async wrapper that dispatches the plain
+# function below to an executor, while the plain functions stay importable
+# and directly callable.
+_EXECUTOR_ENV = "HUMANIZER_EXECUTOR"
+_CONCURRENCY_ENV = "HUMANIZER_MAX_CONCURRENCY"
+_EXECUTOR_KINDS = ("thread", "process")
+
+_executor: Executor | None = None
+_semaphore: asyncio.Semaphore | None = None
+
+
+def _warm_worker(_: int) -> int:
+    _init_worker()
+    return os.getpid()
+
+
+def configure_executor(
+    kind: str | None = None,
+    max_concurrency: int | None = None,
+    prewarm: bool = False,
+) -> None:
+    """Choose where tool bodies run and how many may run at once.
+
+    *kind* is ``"thread"`` (default; shares the in-process result cache) or
+    ``"process"`` (true parallelism for CPU-bound analysis).  Both default to
+    the ``HUMANIZER_EXECUTOR`` / ``HUMANIZER_MAX_CONCURRENCY`` environment
+    variables, then to threads and the CPU count.  Requests beyond the
+    limit wait on the event loop, where they can still be cancelled.
+
+    Worker processes load the word frequency table when they start; with
+    *prewarm* they are all started before this returns, so the first
+    requests do not pay for process start-up.
+    """
+    global _executor, _semaphore
+    kind = kind or os.environ.get(_EXECUTOR_ENV, "thread")
+    if kind not in _EXECUTOR_KINDS:
+        raise ValueError(f"executor kind must be one of {_EXECUTOR_KINDS}, got {kind!r}")
+    workers = max_concurrency or int(os.environ.get(_CONCURRENCY_ENV, 0)) or os.cpu_count() or 1
+
+    previous = _executor
+    if kind == "thread":
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="humanizer")
+    else:
+        _executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=parallel.WORKER_CONTEXT, initializer=_init_worker,
+        )
+    # Large analyses on server threads split their chunks over the same workers.
+    parallel.use_executor(_executor if kind == "process" else None)
+    _semaphore = asyncio.Semaphore(workers)
+    if prewarm and kind == "process":
+        # One concurrent job per worker forces every process to start.
+        list(_executor.map(_warm_worker, range(workers)))
+    if previous is not None:
+        previous.shutdown(wait=False)
+
+
+def _by_handle(kwargs: dict) -> bool:
+    """Return True if a tool call names any document by ``*doc_id`` / ``*doc_ids``."""
+    return any(
+        value is not None
+        for name, value in kwargs.items()
+        if name.endswith(("doc_id", "doc_ids"))
+    )
+
+
+async def _offload(fn, kwargs: dict):
+    if _executor is None:
+        configure_executor()
+    async with _semaphore:
+        if isinstance(_executor, ProcessPoolExecutor) and _by_handle(kwargs):
+            # Worker processes cannot see the document store, so a call by
+            # handle runs here, on the stored document and what it caches.
+            return await asyncio.to_thread(fn, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, functools.partial(fn, **kwargs))
+
+
+def _offloaded_tool(fn):
+    """Register *fn* as an MCP tool whose body runs on the executor.
+
+    With worker processes, calls passing a ``doc_id`` run on a thread of
+    this process instead, so the stored document's tokenisation and totals
+    are reused.  The tool schema is taken from *fn*'s signature and
+    docstring; *fn* itself is returned unchanged.
+    """
+    @functools.wraps(fn)
+    async def run(**kwargs):
+        return await _offload(fn, kwargs)
+
+    mcp.add_tool(run, name=fn.__name__, description=fn.__doc__)
+    return fn
+
+
+def _threaded_tool(fn):
+    """Register *fn* as an MCP tool whose body runs on a thread of this process.
+
+    For tools that read or change state kept in the server process
+    (document sessions), which worker processes cannot see, or that hand
+    their own jobs to the worker pool.
+    """
+    @functools.wraps(fn)
+    async def run(**kwargs):
+        if _executor is None:
+            configure_executor()
+        async with _semaphore:
+            return await asyncio.to_thread(fn, **kwargs)
+
+    mcp.add_tool(run, name=fn.__name__, description=fn.__doc__)
+    return fn
+
+
+def _document(text: str | None, doc_id: str | None, prefix: str = "") -> AnalyzedDocument:
+    """Return the document a tool was given, either inline or by handle."""
+    if (text is None) == (doc_id is None):
+        raise ValueError(f"Pass exactly one of {prefix}text or {prefix}doc_id")
+    if doc_id is not None:
+        return DOCUMENT_STORE.get(doc_id)
+    return AnalyzedDocument(text)
+
+
 # ---------------------------------------------------------------------------
 # Tool 1: full metrics
 # ---------------------------------------------------------------------------
 
-@mcp.tool()
+@_offloaded_tool
 def humanizer_metrics(
-    text: str,
+    text: str | None = None,
     pattern_score: float = 0,
     structural_penalty: float = 0,
     non_native: bool = False,
     discipline: str = "default",
+    doc_id: str | None = None,
+    metrics: list[str] | None = None,
 ) -> dict:
     """Compute all quantitative stylometric metrics for input text.
 
     Returns burstiness CV, MTLD, Fano Factor, sentence length range,
     paragraph opener diversity, hedge density, discourse and psycholinguistic
     penalties, and composite AI probability score (v3 formula).
+    Pass *text*, or the *doc_id* of a document from humanizer_load_document.
+    With *metrics* (e.g. ``["composite", "burstiness"]``) only those entries
+    and what they depend on are computed.
     """
     profile = get_discipline_profile(discipline)
-    result = compute_all_metrics(
-        text,
+    evaluated = metrics
+    if metrics is not None and discipline != "default" and "composite" in metrics:
+        # The recalibrated composite reads its inputs from the result.
+        evaluated = list(dict.fromkeys([*metrics, *METRIC_REGISTRY["composite"].depends]))
+    result = compute_all_metrics_cached(
+        _document(text, doc_id),
         pattern_score=pattern_score,
         structural_penalty=structural_penalty,
         non_native=non_native,
+        metrics=evaluated,
     )
 
     # Recalculate penalties with discipline-specific thresholds if not default
     if discipline != "default":
-        bust = result["burstiness"]
-        cv = bust["cv"]
-        b_thresh = profile["burstiness_threshold"]
-        bust["penalty"] = round(
-            0.0 if cv >= b_thresh else (b_thresh - cv) / b_thresh * 100, 2
-        )
+        if "burstiness" in result:
+            bust = result["burstiness"]
+            cv = bust["cv"]
+            b_thresh = profile["burstiness_threshold"]
+            bust["penalty"] = round(
+                0.0 if cv >= b_thresh else (b_thresh - cv) / b_thresh * 100, 2
+            )
 
-        mtld_data = result["mtld"]
-        mtld_val = mtld_data["mtld"]
-        m_thresh = profile["mtld_threshold"]
-        mtld_data["penalty"] = round(
-            0.0 if mtld_val >= m_thresh else (m_thresh - mtld_val) / m_thresh * 100, 2
-        )
+        if "mtld" in result:
+            mtld_data = result["mtld"]
+            mtld_val = mtld_data["mtld"]
+            m_thresh = profile["mtld_threshold"]
+            mtld_data["penalty"] = round(
+                0.0 if mtld_val >= m_thresh else (m_thresh - mtld_val) / m_thresh * 100, 2
+            )
 
-        # Recompute composite with updated penalties (v3 includes discourse + psycholinguistic)
-        result["composite"] = compute_composite_score(
-            pattern_score,
-            {
-                "burstiness_penalty": bust["penalty"],
-                "vocab_diversity_penalty": mtld_data["penalty"],
-                "structural_penalty": structural_penalty,
-                "discourse_penalty": result["discourse_penalty"],
-                "psycholinguistic_penalty": result["psycholinguistic_penalty"],
-            },
-        )
+        if "composite" in result:
+            # Recompute composite with updated penalties (v3 includes discourse + psycholinguistic)
+            result["composite"] = compute_composite_score(
+                pattern_score,
+                {
+                    "burstiness_penalty": result["burstiness"]["penalty"],
+                    "vocab_diversity_penalty": result["mtld"]["penalty"],
+                    "structural_penalty": structural_penalty,
+                    "discourse_penalty": result["discourse_penalty"],
+                    "psycholinguistic_penalty": result["psycholinguistic_penalty"],
+                },
+            )
 
+    if metrics is not None:
+        result = {name: value for name, value in result.items() if name in metrics}
     result["discipline"] = discipline
     result["discipline_profile"] = profile
     return result
@@ -94,19 +235,28 @@ def humanizer_metrics(
 # Tool 2: before / after verification
 # ---------------------------------------------------------------------------
 
-@mcp.tool()
+@_offloaded_tool
 def humanizer_verify(
-    original_text: str,
-    humanized_text: str,
+    original_text: str | None = None,
+    humanized_text: str | None = None,
     pattern_score_before: float = 0,
     pattern_score_after: float = 0,
+    original_doc_id: str | None = None,
+    humanized_doc_id: str | None = None,
 ) -> dict:
     """Compare before/after metrics, flag regressions, determine if another pass is needed.
 
     Returns metrics comparison, regression flags, and needs_another_pass recommendation.
+    Either side may be given by handle (*original_doc_id*, *humanized_doc_id*).
+    Sentences the humanized text keeps from the original (or from any
+    recently analysed text) are not tokenised again.
     """
-    before = compute_all_metrics(original_text, pattern_score=pattern_score_before)
-    after = compute_all_metrics(humanized_text, pattern_score=pattern_score_after)
+    before, after = compute_all_metrics_pair_cached(
+        _document(original_text, original_doc_id, "original_"),
+        _document(humanized_text, humanized_doc_id, "humanized_"),
+        pattern_score_before=pattern_score_before,
+        pattern_score_after=pattern_score_after,
+    )
 
     regressions: list[dict] = []
 
@@ -227,17 +377,26 @@ def humanizer_verify(
 # Tool 3: per-metric delta report
 # ---------------------------------------------------------------------------
 
-@mcp.tool()
+@_offloaded_tool
 def humanizer_diff(
-    original_text: str,
-    humanized_text: str,
+    original_text: str | None = None,
+    humanized_text: str | None = None,
+    original_doc_id: str | None = None,
+    humanized_doc_id: str | None = None,
 ) -> dict:
     """Generate per-metric delta report between original and humanized text.
 
     Returns deltas, improvement percentages, and sentence length distribution comparison.
+    ``sentences`` aligns the two texts sentence by sentence and lists the
+    changed, inserted and deleted sentences with per-sentence metric
+    deltas (length, question, hedges, connectives, pronouns, contractions,
+    abstract nouns, mean surprisal).
+    Either side may be given by handle (*original_doc_id*, *humanized_doc_id*).
     """
-    before = compute_all_metrics(original_text)
-    after = compute_all_metrics(humanized_text)
+    original = _document(original_text, original_doc_id, "original_")
+    humanized = _document(humanized_text, humanized_doc_id, "humanized_")
+    aligned = TextAlignment(original.text, humanized.text)
+    before, after = compute_all_metrics_pair_cached(original, humanized, alignment=aligned)
 
     def _delta(after_val: float, before_val: float) -> dict:
         d = round(after_val - before_val, 4)
@@ -341,6 +500,7 @@ def humanizer_diff(
             "before": before["burstiness"]["sentence_lengths"],
             "after": after["burstiness"]["sentence_lengths"],
         },
+        "sentences": sentence_changes(aligned),
     }
 
 
@@ -348,18 +508,20 @@ def humanizer_diff(
 # Tool 4: status / readiness check
 # ---------------------------------------------------------------------------
 
-@mcp.tool()
+@_offloaded_tool
 def humanizer_status(
-    text: str,
+    text: str | None = None,
     discipline: str = "default",
     target: float = 30,
+    doc_id: str | None = None,
 ) -> dict:
     """Return current metrics vs target thresholds with discipline-specific calibration.
 
     Shows distance-to-target for each metric and overall readiness assessment.
+    Pass *text*, or the *doc_id* of a document from humanizer_load_document.
     """
     profile = get_discipline_profile(discipline)
-    result = compute_all_metrics(text)
+    result = compute_all_metrics_cached(_document(text, doc_id))
 
     b_thresh = profile["burstiness_threshold"]
     m_thresh = profile["mtld_threshold"]
@@ -454,8 +616,27 @@ def humanizer_status(
 # Tool 5: discourse-level analysis
 # ---------------------------------------------------------------------------
 
-@mcp.tool()
-def humanizer_discourse(text: str, discipline: str = "default") -> str:
+_DISCOURSE_METRICS = [
+    "hapax_rate",
+    "contraction_density",
+    "paragraph_length_variance",
+    "surprisal_proxy",
+    "surprisal_autocorrelation",
+    "connective_diversity",
+    "pronoun_density",
+    "question_ratio",
+    "abstract_noun_ratio",
+    "discourse_penalty",
+    "psycholinguistic_penalty",
+]
+
+
+@_offloaded_tool
+def humanizer_discourse(
+    text: str | None = None,
+    discipline: str = "default",
+    doc_id: str | None = None,
+) -> str:
     """Compute discourse-level metrics for AI detection assessment.
 
     Analyzes text for discourse patterns that are difficult for AI text
@@ -466,30 +647,26 @@ def humanizer_discourse(text: str, discipline: str = "default") -> str:
         text: The text to analyze
         discipline: Academic discipline for calibration
                    (default, psychology, management, education, stem, humanities, social_sciences)
+        doc_id: Handle from humanizer_load_document, instead of text
 
     Returns:
         JSON with discourse metrics, penalties, and discipline-calibrated targets
     """
     profile = get_discipline_profile(discipline)
-
-    # Compute all 9 new metrics
-    hapax = compute_hapax_rate(text)
-    contraction = compute_contraction_density(text)
-    para_var = compute_paragraph_length_variance(text)
-    surprisal = compute_surprisal_proxy(text)
-    surprisal_ac = compute_surprisal_autocorrelation(text)
-    connective_div = compute_connective_diversity(text)
-    pronoun = compute_pronoun_density(text)
-    question = compute_question_ratio(text)
-    abstract_noun = compute_abstract_noun_ratio(text)
-
-    # Compute derived penalties
-    discourse_penalty = _compute_discourse_penalty(
-        connective_div, question, pronoun,
-    )
-    psycholinguistic_penalty = _compute_psycholinguistic_penalty(
-        hapax, contraction, abstract_noun, surprisal,
-    )
+    # Only the 9 discourse metrics and the two penalties derived from them,
+    # on one shared tokenisation
+    parts = compute_all_metrics(_document(text, doc_id), metrics=_DISCOURSE_METRICS)
+    hapax = parts["hapax_rate"]
+    contraction = parts["contraction_density"]
+    para_var = parts["paragraph_length_variance"]
+    surprisal = parts["surprisal_proxy"]
+    surprisal_ac = parts["surprisal_autocorrelation"]
+    connective_div = parts["connective_diversity"]
+    pronoun = parts["pronoun_density"]
+    question = parts["question_ratio"]
+    abstract_noun = parts["abstract_noun_ratio"]
+    discourse_penalty = parts["discourse_penalty"]
+    psycholinguistic_penalty = parts["psycholinguistic_penalty"]
 
     # Discipline-calibrated targets
     targets = {
@@ -545,12 +722,361 @@ def humanizer_discourse(text: str, discipline: str = "default") -> str:
     })
 
 
+# ---------------------------------------------------------------------------
+# Tool 6: sliding-window profile
+# ---------------------------------------------------------------------------
+
+@_offloaded_tool
+def humanizer_profile(
+    text: str | None = None,
+    window: int = 10,
+    step: int = 1,
+    unit: str = "sentences",
+    discipline: str = "default",
+    doc_id: str | None = None,
+) -> dict:
+    """Locate AI-like stretches with a sliding-window metric profile.
+
+    Computes burstiness CV, MTLD, hapax rate and surprisal variance over a
+    window of *window* sentences (or tokens, with ``unit="tokens"``) moved
+    along the text by *step*.  Each window lists the metrics in the
+    AI-typical range; windows with two or more are reported as flagged.
+    Pass *text*, or the *doc_id* of a document from humanizer_load_document.
+    """
+    profile = get_discipline_profile(discipline)
+    result = compute_window_profile(_document(text, doc_id), window=window, step=step, unit=unit)
+
+    flagged_windows: list[int] = []
+    for index, win in enumerate(result["windows"]):
+        flags: list[str] = []
+        if win["burstiness_cv"] < profile["burstiness_threshold"]:
+            flags.append("burstiness_cv")
+        if win["mtld"] < profile["mtld_threshold"]:
+            flags.append("mtld")
+        if win["hapax_rate"] < 0.35:
+            flags.append("hapax_rate")
+        if win["surprisal_variance"] < 8.0:
+            flags.append("surprisal_variance")
+        win["flags"] = flags
+        if len(flags) >= 2:
+            flagged_windows.append(index)
+
+    result["flagged_windows"] = flagged_windows
+    result["discipline"] = discipline
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Tool 7: corpus batch metrics
+# ---------------------------------------------------------------------------
+
+@_threaded_tool
+def humanizer_metrics_batch(
+    texts: list[str] | None = None,
+    paths: list[str] | None = None,
+    non_native: bool = False,
+    max_workers: int | None = None,
+    doc_ids: list[str] | None = None,
+    metrics: list[str] | None = None,
+) -> dict:
+    """Compute full metrics for many documents in parallel worker processes.
+
+    Pass exactly one of *texts*, *paths* (UTF-8 files read by the workers)
+    or *doc_ids* (handles from humanizer_load_document).  Results are
+    returned in input order; unreadable files produce an ``error`` entry
+    rather than failing the batch.  *metrics* selects result entries as in
+    humanizer_metrics.
+    """
+    # Registered on a thread: under a process executor the documents go
+    # to the server's worker pool, which a tool body running inside one of
+    # those workers could not do without nesting a second pool.
+    if sum(arg is not None for arg in (texts, paths, doc_ids)) != 1:
+        raise ValueError("Pass exactly one of texts, paths or doc_ids")
+    if doc_ids is not None:
+        texts = [DOCUMENT_STORE.get(d).text for d in doc_ids]
+
+    results = compute_metrics_many(
+        texts if texts is not None else paths,
+        from_files=paths is not None,
+        max_workers=max_workers,
+        non_native=non_native,
+        metrics=metrics,
+        executor=_executor if isinstance(_executor, ProcessPoolExecutor) else None,
+    )
+    return {
+        "count": len(results),
+        "error_count": sum(1 for r in results if "error" in r),
+        "results": results,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Tool 8: result cache statistics
+# ---------------------------------------------------------------------------
+
+@mcp.tool()
+def humanizer_cache_stats(clear: bool = False) -> dict:
+    """Report result-cache size and hit/miss counters, optionally clearing it.
+
+    Full-metric results are cached by text content and scoring arguments,
+    so repeated verify / status / diff calls on the same text are served
+    without re-analysis.  ``disk`` is null unless the shared SQLite cache
+    is enabled with ``HUMANIZER_DISK_CACHE``.  With the process executor
+    each worker keeps its own memory tier, so only the disk tier is shared.
+    ``documents`` describes the store behind humanizer_load_document,
+    ``sessions`` the one behind humanizer_open_session and ``units`` the
+    per-sentence tokenisations verify and diff reuse.
+    """
+    stats = {
+        "memory": cache.RESULT_CACHE.stats(),
+        "disk": cache.DISK_CACHE.stats() if cache.DISK_CACHE is not None else None,
+        "documents": DOCUMENT_STORE.stats(),
+        "sessions": SESSION_STORE.stats(),
+        "units": alignment.UNIT_CACHE.stats(),
+    }
+    if clear:
+        cache.RESULT_CACHE.clear()
+        alignment.UNIT_CACHE.clear()
+        if cache.DISK_CACHE is not None:
+            cache.DISK_CACHE.clear()
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# Tool 9: document handles
+# ---------------------------------------------------------------------------
+
+@mcp.tool()
+def humanizer_load_document(text: str) -> dict:
+    """Upload a text once and get a ``doc_id`` to pass to the other tools.
+
+    The handle is a hash of the content, so loading the same text again
+    returns the same id.  Documents are kept in a bounded LRU store
+    (``HUMANIZER_DOCUMENT_STORE_BYTES``, default 32 MiB of text) together
+    with their tokenisation; a tool given an evicted id raises an error
+    and the text must be loaded again.
+    """
+    doc_id = DOCUMENT_STORE.add(text)
+    return {"doc_id": doc_id, "chars": len(text)}
+
+
+# ---------------------------------------------------------------------------
+# Tool 10: per-sentence attribution
+# ---------------------------------------------------------------------------
+
+@_offloaded_tool
+def humanizer_attribution(
+    text: str | None = None,
+    pattern_score: float = 0,
+    structural_penalty: float = 0,
+    non_native: bool = False,
+    top: int = 5,
+    doc_id: str | None = None,
+) -> dict:
+    """Show which sentences drive burstiness, Fano, hedging, connectives and composite.
+
+    For each sentence reports how burstiness CV, Fano factor, hedge density,
+    connective diversity and the composite score would change if it were
+    removed, and how CV and Fano would change if it were one word longer.
+    ``top_removals`` lists, per metric, up to *top* sentences whose removal
+    helps most.  Effects are computed from document totals kept with the
+    document, without re-analysing it per sentence.
+    Pass *text*, or the *doc_id* of a document from humanizer_load_document.
+    """
+    return compute_sentence_attribution(
+        _document(text, doc_id),
+        pattern_score=pattern_score,
+        structural_penalty=structural_penalty,
+        non_native=non_native,
+        top=top,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Tool 11: candidate rewrite evaluation
+# ---------------------------------------------------------------------------
+
+@_offloaded_tool
+def humanizer_evaluate_candidates(
+    sentence_index: int,
+    candidates: list[str],
+    text: str | None = None,
+    pattern_score: float = 0,
+    structural_penalty: float = 0,
+    non_native: bool = False,
+    doc_id: str | None = None,
+) -> dict:
+    """Score candidate rewrites of one sentence against the rest of the document.
+
+    Each candidate replaces sentence *sentence_index* (numbered as in
+    humanizer_attribution; an empty string deletes it) and is applied as
+    a delta to the document's sentence-length sums, frequency spectrum,
+    lexicon counts and surprisal sums, with MTLD updated exactly.  Returns
+    burstiness CV, Fano factor, MTLD, the discourse and psycholinguistic
+    sub-metrics, both penalties and the composite for every candidate,
+    their change from the current text, and ``best_candidate`` (lowest
+    composite).  Pass *text*, or the *doc_id* of a document from
+    humanizer_load_document, which keeps the totals between calls.
+    """
+    return evaluate_sentence_candidates(
+        _document(text, doc_id),
+        sentence_index,
+        candidates,
+        pattern_score=pattern_score,
+        structural_penalty=structural_penalty,
+        non_native=non_native,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Tool 12: edit planner
+# ---------------------------------------------------------------------------
+
+@_offloaded_tool
+def humanizer_plan(
+    text: str | None = None,
+    discipline: str = "default",
+    target: float = 30,
+    pattern_score: float = 0,
+    structural_penalty: float = 0,
+    non_native: bool = False,
+    short_length: int = 4,
+    long_length: int = 40,
+    doc_id: str | None = None,
+) -> dict:
+    """Count the edits needed to pass the discipline thresholds, without a verify pass.
+
+    Solves from the document totals how many *short_length*- or
+    *long_length*-word sentences to add, or which sentences to split, to
+    reach the burstiness threshold; how many questions, first-person
+    pronouns and varied connectives clear the discourse penalty; how many
+    contractions, once-only words and replaced abstract nouns clear the
+    psycholinguistic penalty; and any further edits for a composite at or
+    below *target*.  ``marginal_gains`` gives the composite points each
+    kind of edit is worth, and ``plan`` the combined edits and the metrics
+    they lead to.  MTLD and surprisal variance are held fixed.
+    Pass *text*, or the *doc_id* of a document from humanizer_load_document.
+    """
+    return compute_edit_plan(
+        _document(text, doc_id),
+        discipline=discipline,
+        target=target,
+        pattern_score=pattern_score,
+        structural_penalty=structural_penalty,
+        non_native=non_native,
+        short_length=short_length,
+        long_length=long_length,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Tools 13-15: incremental document sessions
+# ---------------------------------------------------------------------------
+
+def _session_state(session_id: str, session) -> dict:
+    return {
+        "session_id": session_id,
+        "version": session.version,
+        "chars": len(session),
+        "metrics": copy.deepcopy(session.result()),
+    }
+
+
+@_threaded_tool
+def humanizer_open_session(
+    text: str | None = None,
+    pattern_score: float = 0,
+    structural_penalty: float = 0,
+    non_native: bool = False,
+    doc_id: str | None = None,
+) -> dict:
+    """Open an editing session on a text and return its ``session_id`` and full metrics.
+
+    Send later changes with humanizer_edit_session instead of re-sending
+    the text: only the sentences and paragraphs an edit touches are
+    re-analysed.  Sessions are kept in this server process, in an LRU
+    bounded by ``HUMANIZER_SESSION_STORE_BYTES`` (default 32 MiB of text).
+    Pass *text*, or the *doc_id* of a document from humanizer_load_document.
+    """
+    if (text is None) == (doc_id is None):
+        raise ValueError("Pass exactly one of text or doc_id")
+    if doc_id is not None:
+        text = DOCUMENT_STORE.get(doc_id).text
+    session_id, session = SESSION_STORE.open(
+        text,
+        pattern_score=pattern_score,
+        structural_penalty=structural_penalty,
+        non_native=non_native,
+    )
+    lock = SESSION_STORE.get(session_id)[1]
+    with lock:
+        return _session_state(session_id, session)
+
+
+@_threaded_tool
+def humanizer_edit_session(session_id: str, edits: list[dict]) -> dict:
+    """Apply text edits to a session and return the updated full metrics.
+
+    Each edit is ``{"offset": int, "delete_length": int, "insert_text": str}``
+    (as in an LSP didChange, with character offsets): *delete_length*
+    characters at *offset* are replaced by *insert_text*.  Edits apply in
+    order, each to the text the previous ones left; an edit outside the
+    text raises an error, leaving the edits before it applied.  Returns
+    the session's ``version`` (one more per edit), its length and
+    ``metrics``, equal to humanizer_metrics on the current text.
+    """
+    session, lock = SESSION_STORE.get(session_id)
+    with lock:
+        session.apply(
+            (edit["offset"], edit.get("delete_length", 0), edit.get("insert_text", ""))
+            for edit in edits
+        )
+        return _session_state(session_id, session)
+
+
+@_threaded_tool
+def humanizer_close_session(session_id: str) -> dict:
+    """Close an editing session and free its state."""
+    return {"session_id": session_id, "closed": SESSION_STORE.close(session_id)}
+
+
 # ---------------------------------------------------------------------------
 # Entry point
 # ---------------------------------------------------------------------------
 
-def main():
-    mcp.run(transport="stdio")
+_TRANSPORTS = {"stdio": "stdio", "http": "streamable-http", "sse": "sse"}
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="humanizer-mcp",
+        description="MCP server for stylometric metrics in academic text humanization.",
+    )
+    parser.add_argument(
+        "--transport", choices=sorted(_TRANSPORTS), default="stdio",
+        help="stdio (one client per process, default) or a local HTTP service "
+             "(streamable HTTP, or legacy SSE) shared by many clients",
+    )
+    parser.add_argument(
+        "--port", type=int, default=8000,
+        help="port for the http / sse transports (bound to 127.0.0.1)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="worker processes for the http / sse transports (default: CPU count)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    args = _parse_args(argv)
+    if args.transport != "stdio":
+        # A long-lived shared service: analyses run on a pool of pre-warmed
+        # worker processes, and the listener only ever binds to localhost.
+        mcp.settings.host = "127.0.0.1"
+        mcp.settings.port = args.port
+        configure_executor("process", args.workers, prewarm=True)
+    mcp.run(transport=_TRANSPORTS[args.transport])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,386 @@
+"""Incremental analysis of a document that changes by small edits.
+
+A :class:`DocumentSession` keeps its text cut into blocks at safe sentence
+boundaries (the cuts of the streaming analyser, so no sentence, paragraph
+break, token or lexicon hit straddles one unseen), a
+:class:`~humanizer_mcp.streaming.PieceSummary` of every block, and running
+totals over them: frequency spectrum and hapax count, lexicon hits, and
+question, word, abstract-noun and MTLD token counts.  An edit
+``(offset, delete_length, insert_text)``, as in an LSP ``didChange``,
+re-tokenises only the blocks it touches and swaps their summaries in the
+totals.  Both MTLD passes keep their state at every block boundary; after
+an edit they are re-run only until they fall back into step with their
+previous run, and the rest is shifted by the change in factor count.
+:meth:`DocumentSession.result` equals ``compute_all_metrics`` on the
+current text.
+
+Sessions live in this process, in an LRU bounded by total text size, from
+``HUMANIZER_SESSION_STORE_BYTES`` (default 32 MiB).
+"""
+
+import os
+import threading
+import uuid
+from bisect import bisect_right
+from collections import Counter, OrderedDict, defaultdict
+from collections.abc import Iterable
+from itertools import accumulate, chain, islice
+
+from humanizer_mcp.metrics import (
+    _ABSTRACTS_LISTED,
+    _SurprisalStats,
+    _abstract_result,
+    _assemble_all_metrics,
+    _burstiness_result,
+    _connective_result,
+    _contraction_result,
+    _hapax_result,
+    _hedge_result,
+    _mtld_factors,
+    _mtld_result,
+    _mtld_stitch,
+    _opener_diversity_result,
+    _paragraph_variance_result,
+    _pronoun_result,
+    _question_result,
+)
+from humanizer_mcp.streaming import PieceSummary, _ParagraphStitcher, _safe_cut
+from humanizer_mcp.vocabulary import current_vocabulary
+
+
+_STORE_BYTES_ENV = "HUMANIZER_SESSION_STORE_BYTES"
+_DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# Small enough that re-tokenising the blocks an edit touches is cheap,
+# large enough that per-block bookkeeping stays a small part of a result.
+_BLOCK_CHARS = 1 << 12
+
+_FRESH = (0.0, frozenset(), 0)
+
+
+def _cut_blocks(text: str, block_chars: int = _BLOCK_CHARS) -> list[str]:
+    """Cut *text* into pieces of about *block_chars* at safe sentence boundaries.
+
+    A stretch without a safe cut (one long unclosed parenthesis, say) is
+    kept whole.  The pieces concatenate back to *text*; an empty text has
+    none.
+    """
+    blocks: list[str] = []
+    start = 0
+    while len(text) - start > block_chars:
+        end = start + block_chars
+        # Nothing is open at a safe cut, so the text before *start* never
+        # changes the decision.
+        cut = _safe_cut(text[start:end])
+        while not cut and end < len(text):
+            end = min(start + 2 * (end - start), len(text))
+            cut = _safe_cut(text[start:end])
+        if not cut:
+            break
+        blocks.append(text[start:start + cut])
+        start += cut
+    if start < len(text):
+        blocks.append(text[start:])
+    return blocks
+
+
+def _block_paragraphs(summary: PieceSummary) -> tuple:
+    """Split a block's paragraph segments into head, whole paragraphs and tail.
+
+    Returns ``(head, whole, tail)``: the segment continuing the previous
+    block's paragraph, a stitcher holding the paragraphs that begin and end
+    inside the block (None if the block has no paragraph break), and the
+    segment left open.
+    """
+    segments = summary.paragraph_segments
+    if len(segments) == 1:
+        return segments[0], None, None
+    whole = _ParagraphStitcher()
+    for segment in segments[1:-1]:
+        whole.add([segment])
+        whole.close()
+    return segments[0], whole, segments[-1]
+
+
+def _in_step(state: tuple, previous: tuple) -> bool:
+    """True if two MTLD states differ at most in their completed factors."""
+    return state[2] == previous[2] and state[1] == previous[1]
+
+
+class DocumentSession:
+    """A document kept analysed across edits.
+
+    Apply edits with :meth:`edit` (or :meth:`apply` for a batch) and read
+    ``compute_all_metrics`` of the current text with :meth:`result`.  The
+    cost of an edit grows with the blocks it touches, not the document;
+    :meth:`result` is linear in the number of blocks, sentences and
+    matches it lists.  Not thread-safe; the session store locks each
+    session.
+    """
+
+    def __init__(
+        self,
+        text: str,
+        pattern_score: float = 0,
+        structural_penalty: float = 0,
+        non_native: bool = False,
+        scoring_version: str = "v3",
+        block_chars: int = _BLOCK_CHARS,
+    ) -> None:
+        self.pattern_score = pattern_score
+        self.structural_penalty = structural_penalty
+        self.non_native = non_native
+        self.scoring_version = scoring_version
+        self.version = 0
+        self._block_chars = block_chars
+        self._vocabulary = current_vocabulary()
+        self._result: dict | None = None
+
+        self._texts: list[str] = []
+        self._summaries: list[PieceSummary] = []
+        self._paragraphs: list[tuple] = []  # _block_paragraphs of every block
+        self._starts: list[int] = [0]  # offset of every block, then the length
+
+        self._spectrum: Counter = Counter()
+        self._hapax = 0
+        self._lexicon: dict[str, Counter] = defaultdict(Counter)
+        self._question_count = 0
+        self._word_count = 0
+        self._abstract_count = 0
+        self._mtld_count = 0
+        # MTLD state entering every block boundary: forward[i] before block
+        # i, backward[i] after the backward pass has read blocks i onwards.
+        self._forward: list[tuple] = [_FRESH]
+        self._backward: list[tuple] = [_FRESH]
+
+        self._replace(0, 0, text)
+
+    def __len__(self) -> int:
+        return self._starts[-1]
+
+    @property
+    def text(self) -> str:
+        return "".join(self._texts)
+
+    def edit(self, offset: int, delete_length: int, insert_text: str) -> None:
+        """Replace *delete_length* characters at *offset* with *insert_text*."""
+        if not 0 <= offset <= offset + delete_length <= len(self):
+            raise ValueError(
+                f"edit ({offset}, {delete_length}) is outside the text of {len(self)} characters",
+            )
+        if not delete_length and not insert_text:
+            return
+        starts = self._starts
+        # Blocks touching the edit or the character before it: a cut depends
+        # on the mark before it and the whitespace after it.
+        first = max(bisect_right(starts, offset - 1) - 1, 0)
+        last = min(bisect_right(starts, offset + delete_length), len(self._texts))
+        region = "".join(self._texts[first:last])
+        local = offset - starts[first]
+        region = region[:local] + insert_text + region[local + delete_length:]
+        # The region must still end at a safe cut, or it takes the next block in.
+        while last < len(self._texts):
+            following = self._texts[last]
+            if region and _safe_cut(region + following[:1]) == len(region):
+                break
+            region += following
+            last += 1
+        self._replace(first, last, region)
+        self.version += 1
+
+    def apply(self, edits: Iterable[tuple[int, int, str]]) -> None:
+        """Apply ``(offset, delete_length, insert_text)`` edits in order.
+
+        Each edit's offset refers to the text left by the edits before it.
+        """
+        for offset, delete_length, insert_text in edits:
+            self.edit(offset, delete_length, insert_text)
+
+    def _replace(self, first: int, last: int, region: str) -> None:
+        """Replace blocks *first* to *last* by the blocks of *region*."""
+        texts = _cut_blocks(region, self._block_chars)
+        summaries = [PieceSummary(piece, self._vocabulary).speculate() for piece in texts]
+        for summary in self._summaries[first:last]:
+            self._count(summary, -1)
+        for summary in summaries:
+            self._count(summary, 1)
+        self._restitch(first, last, summaries)
+
+        self._texts[first:last] = texts
+        self._summaries[first:last] = summaries
+        self._paragraphs[first:last] = map(_block_paragraphs, summaries)
+        self._starts[first + 1:] = list(
+            accumulate(map(len, self._texts[first:]), initial=self._starts[first]),
+        )[1:]
+        self._result = None
+
+    def _count(self, summary: PieceSummary, sign: int) -> None:
+        """Add (*sign* 1) or remove (-1) *summary* from the running totals."""
+        self._question_count += sign * summary.question_count
+        self._word_count += sign * summary.word_count
+        self._abstract_count += sign * summary.abstract_count
+        self._mtld_count += sign * len(summary.mtld_ids)
+        for category, counts in summary.lexicon.items():
+            if sign > 0:
+                self._lexicon[category].update(counts)
+            else:
+                self._lexicon[category].subtract(counts)
+        spectrum = self._spectrum
+        for token, count in summary.spectrum.items():
+            old = spectrum[token]
+            new = old + sign * count
+            self._hapax += (new == 1) - (old == 1)
+            if new:
+                spectrum[token] = new
+            else:
+                del spectrum[token]
+
+    def _restitch(self, first: int, last: int, summaries: list[PieceSummary]) -> None:
+        """Update both MTLD passes for blocks *first* to *last* becoming *summaries*."""
+        old = self._summaries
+        blocks = len(old)
+
+        # Forward: through the new blocks, then on until back in step.
+        forward = self._forward
+        state = forward[first]
+        states = [state]
+        for summary in summaries:
+            state = _mtld_stitch(summary.mtld_ids, summary.mtld_speculation[0], state)
+            states.append(state)
+        j = last
+        while j < blocks and not _in_step(state, forward[j]):
+            state = _mtld_stitch(old[j].mtld_ids, old[j].mtld_speculation[0], state)
+            states.append(state)
+            j += 1
+        shift = state[0] - forward[j][0]
+        forward[first:] = states + [(f + shift, t, c) for f, t, c in forward[j + 1:]]
+
+        # Backward: the same from the end of the text towards its start.
+        backward = self._backward
+        state = backward[last]
+        states = [state]
+        for summary in reversed(summaries):
+            state = _mtld_stitch(summary.mtld_ids[::-1], summary.mtld_speculation[1], state)
+            states.append(state)
+        j = first - 1
+        while j >= 0 and not _in_step(state, backward[j + 1]):
+            state = _mtld_stitch(old[j].mtld_ids[::-1], old[j].mtld_speculation[1], state)
+            states.append(state)
+            j -= 1
+        shift = state[0] - backward[j + 1][0]
+        backward[:last + 1] = (
+            [(f + shift, t, c) for f, t, c in backward[:j + 1]] + states[::-1]
+        )
+
+    def result(self) -> dict:
+        """Return ``compute_all_metrics`` of the current text."""
+        if self._result is None:
+            self._result = self._assemble()
+        return self._result
+
+    def _assemble(self) -> dict:
+        summaries = self._summaries
+        sentence_lengths = list(chain.from_iterable(s.sentence_lengths for s in summaries))
+        sentence_count = len(sentence_lengths)
+        paragraphs = _ParagraphStitcher()
+        for head, whole, tail in self._paragraphs:
+            paragraphs.add([head])
+            if whole is not None:
+                paragraphs.close()
+                paragraphs.lengths.extend(whole.lengths)
+                paragraphs.openers.extend(whole.openers)
+                paragraphs.add([tail])
+        paragraphs.close()
+        surprisal = _SurprisalStats()
+        for summary in summaries:
+            surprisal.merge(summary.surprisal)
+        abstracts = list(islice(chain.from_iterable(s.abstracts for s in summaries), _ABSTRACTS_LISTED))
+
+        return _assemble_all_metrics(
+            {
+                "burstiness": _burstiness_result(sentence_lengths, self.non_native),
+                "mtld": _mtld_result(
+                    self._mtld_count, _mtld_factors(self._forward[-1]), _mtld_factors(self._backward[0]),
+                ),
+                "paragraph_opener_diversity": _opener_diversity_result(paragraphs.openers),
+                "hedge_density": _hedge_result(self._lexicon["hedge"], sentence_count),
+                "hapax_rate": _hapax_result(self._hapax, self._word_count),
+                "contraction_density": _contraction_result(
+                    list(chain.from_iterable(s.contractions for s in summaries)), sentence_count,
+                ),
+                "paragraph_length_variance": _paragraph_variance_result(paragraphs.lengths.tolist()),
+                "surprisal_proxy": surprisal.proxy_result(),
+                "surprisal_autocorrelation": surprisal.autocorrelation_result(),
+                "connective_diversity": _connective_result(self._lexicon["connective"]),
+                "pronoun_density": _pronoun_result(
+                    list(chain.from_iterable(s.pronouns for s in summaries)), sentence_count,
+                ),
+                "question_ratio": _question_result(self._question_count, sentence_count),
+                "abstract_noun_ratio": _abstract_result(abstracts, self._abstract_count, self._word_count),
+            },
+            pattern_score=self.pattern_score,
+            structural_penalty=self.structural_penalty,
+            scoring_version=self.scoring_version,
+        )
+
+
+# ---------------------------------------------------------------------------
+# Session store
+# ---------------------------------------------------------------------------
+
+class SessionStore:
+    """Thread-safe LRU of :class:`DocumentSession` objects keyed by ``session_id``.
+
+    The budget counts characters of session text.  Each session has its
+    own lock, held while it is edited or read.
+    """
+
+    def __init__(self, max_bytes: int = _DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._sessions: OrderedDict[str, tuple[DocumentSession, threading.Lock]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def open(self, text: str, **options) -> tuple[str, DocumentSession]:
+        """Start a session on *text* and return its id and the session."""
+        session = DocumentSession(text, **options)
+        session_id = uuid.uuid4().hex
+        with self._lock:
+            self._sessions[session_id] = (session, threading.Lock())
+            self._evict()
+        return session_id, session
+
+    def get(self, session_id: str) -> tuple[DocumentSession, threading.Lock]:
+        """Return the session and its lock, raising ValueError for unknown ids."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                raise ValueError(
+                    f"Unknown session_id {session_id!r}: it was closed or has been "
+                    "evicted; open a new session with the current text",
+                )
+            self._sessions.move_to_end(session_id)
+            return entry
+
+    def close(self, session_id: str) -> bool:
+        """Drop a session; return False if it was not open."""
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _evict(self) -> None:
+        # Always keep the newest session, even if it alone exceeds the budget.
+        while self._bytes() > self.max_bytes and len(self._sessions) > 1:
+            self._sessions.popitem(last=False)
+
+    def _bytes(self) -> int:
+        return sum(len(session) for session, _ in self._sessions.values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "bytes": self._bytes(),
+                "max_bytes": self.max_bytes,
+            }
+
+
+SESSION_STORE = SessionStore(int(os.environ.get(_STORE_BYTES_ENV, _DEFAULT_MAX_BYTES)))
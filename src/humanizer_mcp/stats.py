@@ -0,0 +1,220 @@
+"""Numeric kernels behind the variance-based metrics.
+
+Pure Python by default.  When NumPy is installed (``pip install
+humanizer-mcp[fast]``) long sequences are reduced on arrays instead; both
+backends agree to the rounding the metric functions report.
+
+The backend is chosen by the ``HUMANIZER_STATS_BACKEND`` environment
+variable: ``auto`` (default — NumPy if importable), ``numpy`` or ``python``.
+"""
+
+import math
+import os
+from array import array
+from collections import deque
+from itertools import accumulate
+from operator import mul
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when NumPy is absent
+    np = None
+
+
+# ---------------------------------------------------------------------------
+# Backend selection
+# ---------------------------------------------------------------------------
+
+_BACKEND_ENV = "HUMANIZER_STATS_BACKEND"
+_BACKENDS = ("auto", "numpy", "python")
+
+# Below this length the cost of building an array outweighs the vectorised
+# reduction, so short inputs always take the pure-Python path.
+_NUMPY_MIN_SIZE = 64
+
+
+def _resolve_backend(requested: str) -> str:
+    requested = requested.strip().lower() or "auto"
+    if requested not in _BACKENDS:
+        raise ValueError(
+            f"{_BACKEND_ENV} must be one of {_BACKENDS}, got {requested!r}",
+        )
+    if requested == "numpy" and np is None:
+        raise ImportError(
+            f"{_BACKEND_ENV}=numpy requires NumPy: pip install humanizer-mcp[fast]",
+        )
+    if requested == "auto":
+        return "numpy" if np is not None else "python"
+    return requested
+
+
+BACKEND = _resolve_backend(os.environ.get(_BACKEND_ENV, "auto"))
+
+
+def set_backend(name: str) -> str:
+    """Switch the stats backend at runtime and return the resolved name."""
+    global BACKEND
+    BACKEND = _resolve_backend(name)
+    return BACKEND
+
+
+def _use_numpy(values) -> bool:
+    return BACKEND == "numpy" and len(values) >= _NUMPY_MIN_SIZE
+
+
+# ---------------------------------------------------------------------------
+# Mergeable accumulator
+# ---------------------------------------------------------------------------
+
+class RunningStats:
+    """One-pass, mergeable count / sum / M2 / min / max of a sequence.
+
+    M2 is updated with Welford's method and two accumulators over
+    consecutive runs of one sequence combine with Chan's formula, so a long
+    sequence can be reduced chunk by chunk or in parallel.  With ``lag > 0``
+    it also keeps the lagged product sum ``sum(x[i] * x[i + lag])`` and the
+    first and last *lag* values, which is all :meth:`autocovariance` and a
+    merge need.  Updating in pieces adds values in the same order as one
+    update, so it gives bit-identical state.  The sum is also kept as a
+    plain running total, so integer data (word counts) merge exactly and
+    the mean is ``sum(values) / count``.
+    """
+
+    __slots__ = (
+        "lag", "count", "total", "_mean", "m2", "min", "max", "lag_sum", "head", "tail",
+    )
+
+    def __init__(self, lag: int = 0) -> None:
+        self.lag = lag
+        self.count = 0
+        self.total = 0
+        self._mean = 0.0  # Welford running mean, for the M2 update
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.lag_sum = 0.0
+        self.head: list = []  # first `lag` values
+        self.tail: list = []  # last `lag` values
+
+    @classmethod
+    def from_values(cls, values, lag: int = 0) -> "RunningStats":
+        """Reduce a complete sequence, on NumPy arrays when that backend is active.
+
+        M2 is summed in a second pass about the final mean, so the variance
+        rounds exactly like the two-pass formula.  Both backends agree to
+        the rounding the metric functions report.
+        """
+        acc = cls(lag)
+        if not _use_numpy(values):
+            if not isinstance(values, (list, tuple, array)):
+                values = list(values)
+            acc.update(values)
+            if acc.count:
+                acc._mean = mean = acc.total / acc.count
+                acc.m2 = float(sum((x - mean) ** 2 for x in values))
+            return acc
+
+        raw = np.asarray(values)
+        arr = raw.astype(np.float64)
+        mean = arr.mean()
+        centred = arr - mean
+        acc.count = len(arr)
+        acc.total = raw.sum().item()
+        acc._mean = float(mean)
+        acc.m2 = float(np.dot(centred, centred))
+        acc.min = raw.min().item()  # keeps integer extremes integral
+        acc.max = raw.max().item()
+        if lag:
+            acc.lag_sum = float(np.dot(arr[:-lag], arr[lag:]))
+            acc.head = arr[:lag].tolist()
+            acc.tail = arr[-lag:].tolist()
+        return acc
+
+    def update(self, values) -> "RunningStats":
+        """Add *values* in order and return ``self``."""
+        if not isinstance(values, (list, tuple, array)):
+            values = list(values)
+        if not len(values):
+            return self
+
+        count, total = self.count, self.total
+        mean, m2 = self._mean, self.m2
+        for x in values:
+            count += 1
+            total += x
+            delta = x - mean
+            mean += delta / count
+            m2 += delta * (x - mean)
+        self.count, self.total = count, total
+        self._mean, self.m2 = mean, m2
+        self.min = min(self.min, min(values))
+        self.max = max(self.max, max(values))
+
+        lag = self.lag
+        if lag:
+            seq = self.tail + list(values)
+            # Products x[j - lag] * x[j] for every new j, summed in order.
+            start = max(len(self.tail), lag)
+            products = map(mul, seq[start - lag:len(seq) - lag], seq[start:])
+            self.lag_sum = deque(accumulate(products, initial=self.lag_sum), maxlen=1)[0]
+            if len(self.head) < lag:
+                self.head = (self.head + seq[len(self.tail):])[:lag]
+            self.tail = seq[-lag:]
+        return self
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """Append the sequence summarised by *other* and return ``self``."""
+        if other.lag != self.lag:
+            raise ValueError("cannot merge accumulators with different lags")
+        if not other.count:
+            return self
+        if not self.count:
+            for name in self.__slots__:
+                setattr(self, name, getattr(other, name))
+            self.head, self.tail = list(other.head), list(other.tail)
+            return self
+
+        lag = self.lag
+        if lag:
+            # Only products straddling the boundary are new; they lie
+            # within the last `lag` values here and the first `lag` there.
+            window = self.tail + other.head
+            k = len(self.tail)
+            cross = sum(
+                window[i] * window[i + lag]
+                for i in range(max(0, k - lag), min(k, len(window) - lag))
+            )
+            self.lag_sum += other.lag_sum + cross
+            self.head = (self.head + other.head)[:lag]
+            self.tail = (self.tail + other.tail)[-lag:]
+
+        count = self.count + other.count
+        delta = other._mean - self._mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self._mean += delta * other.count / count
+        self.total += other.total
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def mean(self) -> float:
+        """Arithmetic mean (0 for an empty accumulator)."""
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def variance(self) -> float:
+        """Population variance (0 for an empty accumulator)."""
+        return self.m2 / self.count if self.count else 0.0
+
+    def autocovariance(self) -> float:
+        """Lag-``lag`` autocovariance about the overall mean.
+
+        ``sum((x[i] - m) * (x[i + lag] - m)) / (n - lag)``, expanded into
+        the running sums; requires ``count > lag``.
+        """
+        n, lag, m, total = self.count, self.lag, self.mean, self.total
+        first_sum = total - sum(self.tail)  # x[0] .. x[n - lag - 1]
+        second_sum = total - sum(self.head)  # x[lag] .. x[n - 1]
+        return (self.lag_sum - m * (first_sum + second_sum) + (n - lag) * m * m) / (n - lag)
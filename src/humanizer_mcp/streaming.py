@@ -0,0 +1,477 @@
+"""Bounded-memory streaming analysis for book-length inputs.
+
+``StreamingAnalyzer`` consumes text as an iterator of chunks (file reads,
+generator output, ...) and produces exactly the results dict that
+``compute_all_metrics`` returns for the concatenated text, without ever
+holding the whole text in memory.
+"""
+
+import re
+import tempfile
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Iterator
+from itertools import chain
+
+from humanizer_mcp.metrics import (
+    _ABBREVIATIONS,
+    _ABSTRACTS_LISTED,
+    _PARAGRAPH_SPLIT_RE,
+    AnalyzedDocument,
+    _SurprisalStats,
+    _abstract_result,
+    _assemble_all_metrics,
+    _burstiness_result,
+    _connective_result,
+    _contraction_result,
+    _hapax_count,
+    _hapax_result,
+    _hedge_result,
+    _mtld_advance,
+    _mtld_factors,
+    _mtld_result,
+    _mtld_speculate,
+    _mtld_stitch,
+    _opener_diversity_result,
+    _paragraph_opener,
+    _paragraph_variance_result,
+    _pronoun_result,
+    _question_result,
+)
+from humanizer_mcp.vocabulary import Vocabulary, current_vocabulary
+
+
+# ---------------------------------------------------------------------------
+# Safe cut points
+# ---------------------------------------------------------------------------
+
+# The sentence tokeniser only ever splits after [.!?] followed by whitespace,
+# so those are the only candidate places to cut the stream.
+_CUT_RE = re.compile(r"[.!?](?=\s)")
+
+# Last word of every protected abbreviation ("et al." -> "al.").  A cut right
+# after one of these is refused; a false positive merely delays the cut.
+_ABBREV_TAIL_RE = re.compile(
+    r"\b(?:" + "|".join(a.split(r"\s+")[-1] for a in _ABBREVIATIONS) + r")\.\Z",
+    re.IGNORECASE,
+)
+
+# Cut candidates together with the parentheses that can veto them.
+_CUT_OR_PAREN_RE = re.compile(r"[()]|[.!?](?=\s)")
+
+_MIN_PIECE_CHARS = 1 << 16
+
+
+def _safe_cut(text: str) -> int:
+    """Return the offset of the last safe cut in *text*, or 0 if there is none.
+
+    Cutting right after a sentence-ending mark that is followed by whitespace,
+    is not an abbreviation dot and is not inside an open parenthesis gives two
+    pieces whose sentences, paragraphs, tokens and lexicon hits are exactly
+    those of the whole text.
+    """
+    candidates = [m.start() for m in _CUT_RE.finditer(text)]
+    i = len(candidates) - 1
+    while i >= 0:
+        t = candidates[i]
+        open_paren = text.rfind("(", 0, t)
+        if open_paren > text.rfind(")", 0, t):
+            # The citation protection may run from this "(" past any later cut.
+            i = bisect_left(candidates, open_paren) - 1
+            continue
+        if not _ABBREV_TAIL_RE.search(text, max(0, t - 8), t + 1):
+            return t + 1
+        i -= 1
+    return 0
+
+
+def _safe_cuts(text: str) -> Iterator[int]:
+    """Yield the offset of every safe cut in *text*, in order, in one pass.
+
+    The cuts are those :func:`_safe_cut` would accept in a prefix of
+    *text*: cutting at all of them splits the text into sentences.
+    """
+    open_paren = close_paren = -1
+    for match in _CUT_OR_PAREN_RE.finditer(text):
+        t = match.start()
+        mark = text[t]
+        if mark == "(":
+            open_paren = t
+        elif mark == ")":
+            close_paren = t
+        elif open_paren <= close_paren:
+            if not _ABBREV_TAIL_RE.search(text, max(0, t - 8), t + 1):
+                yield t + 1
+
+
+# ---------------------------------------------------------------------------
+# Token spill file (for the backward MTLD pass)
+# ---------------------------------------------------------------------------
+
+class _TokenSpill:
+    """Append-only stream of integer token IDs backed by a temporary file.
+
+    Only the backward MTLD pass needs the whole token sequence.  Keeping it
+    on disk in fixed-size blocks keeps resident memory independent of the
+    input length.
+    """
+
+    _BLOCK = 1 << 16
+
+    def __init__(self) -> None:
+        self._buffer = array("I")
+        self._file = None
+        self._spilled = 0
+
+    def extend(self, ids: Iterable[int]) -> None:
+        self._buffer.extend(ids)
+        if len(self._buffer) >= self._BLOCK:
+            if self._file is None:
+                self._file = tempfile.TemporaryFile()
+            self._file.seek(0, 2)
+            self._buffer.tofile(self._file)
+            self._spilled += len(self._buffer)
+            self._buffer = array("I")
+
+    def __len__(self) -> int:
+        return self._spilled + len(self._buffer)
+
+    def reversed_blocks(self, start: int = 0, end: int | None = None) -> Iterator[Iterable[int]]:
+        """Yield IDs *start* to *end* back to front, one reversed block at a time."""
+        if end is None:
+            end = len(self)
+        if end > self._spilled:
+            yield reversed(self._buffer[max(start - self._spilled, 0):end - self._spilled])
+            end = self._spilled
+        itemsize = self._buffer.itemsize
+        while end > start:
+            lo = max(start, end - self._BLOCK)
+            block = array("I")
+            self._file.seek(lo * itemsize)
+            block.fromfile(self._file, end - lo)
+            yield reversed(block)
+            end = lo
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# ---------------------------------------------------------------------------
+# Piece summaries
+# ---------------------------------------------------------------------------
+
+class PieceSummary:
+    """Mergeable partial state of one piece of text, cut at a safe point.
+
+    Holds what the streaming state needs from the piece: sentence lengths,
+    lexicon and pattern hits, token IDs for MTLD, the frequency spectrum,
+    abstract-noun counts, surprisal statistics, and the word count, ending
+    count and opener words of each paragraph segment, so a paragraph that
+    runs across the cut is stitched back together.  Summaries are
+    picklable; one built in another process carries that process's
+    vocabulary in ``types`` so its IDs can be remapped, and speculative
+    forward and backward MTLD runs over its tokens in ``mtld_speculation``
+    so the merging process only stitches them.
+    """
+
+    def __init__(self, piece: str, vocabulary: Vocabulary) -> None:
+        doc = AnalyzedDocument(piece, vocabulary)
+        self.types: list[str] | None = None
+        self.mtld_speculation = None
+        self.sentence_lengths = doc.sentence_lengths
+        self.question_count = doc.question_count
+        self.lexicon = doc.lexicon_counts
+        self.contractions = doc.contractions
+        self.pronouns = doc.pronouns
+        self.mtld_ids = doc.mtld_ids
+        self.spectrum = doc.frequency_spectrum
+        self.word_count = len(doc.word_ids)
+        abstracts = doc.abstract_ids
+        self.abstract_count = len(abstracts)
+        self.abstracts = vocabulary.lookup(abstracts[:_ABSTRACTS_LISTED])
+        self.surprisal = doc.surprisal_stats
+        self.paragraph_segments: list[tuple[int, int, list[str]]] = []
+        for segment in _PARAGRAPH_SPLIT_RE.split(piece):
+            words = segment.split()
+            endings = segment.count(".") + segment.count("!") + segment.count("?")
+            self.paragraph_segments.append((len(words), endings, words[:3]))
+
+    @classmethod
+    def standalone(cls, piece: str) -> "PieceSummary":
+        """Summarise *piece* with a private vocabulary, for another process."""
+        vocabulary = Vocabulary()
+        summary = cls(piece, vocabulary).speculate()
+        summary.types = vocabulary.tokens
+        return summary
+
+    def speculate(self) -> "PieceSummary":
+        """Run both MTLD passes over the piece from a fresh state, and return ``self``."""
+        ids = self.mtld_ids
+        self.mtld_speculation = (_mtld_speculate(ids), _mtld_speculate(ids[::-1]))
+        return self
+
+
+class _ParagraphStitcher:
+    """Paragraph word counts and openers of consecutive pieces.
+
+    Each piece's ``paragraph_segments`` are split at its paragraph breaks;
+    the first one continues the paragraph left open by the piece before.
+    """
+
+    def __init__(self) -> None:
+        self.lengths = array("I")
+        self.openers: list[str] = []
+        self._words = 0
+        self._endings = 0
+        self._opener_words: list[str] = []
+
+    def add(self, segments: list[tuple[int, int, list[str]]]) -> None:
+        """Append the paragraph segments of the next piece."""
+        for i, (words, endings, opener_words) in enumerate(segments):
+            if i:
+                self.close()
+            if not words:
+                continue
+            self._words += words
+            need = 3 - len(self._opener_words)
+            if need > 0:
+                self._opener_words.extend(opener_words[:need])
+            self._endings += endings
+
+    def close(self) -> None:
+        """End the open paragraph."""
+        if self._words:
+            self.lengths.append(self._words)
+            if self._endings >= 2:
+                self.openers.append(_paragraph_opener(self._opener_words))
+        self._words = 0
+        self._endings = 0
+        self._opener_words = []
+
+
+# ---------------------------------------------------------------------------
+# Streaming analyser
+# ---------------------------------------------------------------------------
+
+class StreamingAnalyzer:
+    """Incrementally compute ``compute_all_metrics`` over chunks of text.
+
+    Call :meth:`feed` with each chunk and :meth:`result` once at the end.
+    Text is buffered only up to the last safe sentence boundary; each
+    complete piece is summarised (:class:`PieceSummary`) and merged into
+    running state (open paragraph, MTLD factor state, frequency spectrum,
+    lexicon counts, surprisal moments).  :meth:`merge` accepts summaries
+    built elsewhere, which is how a document is analysed in parallel.  Sentence and paragraph lengths are kept as compact
+    arrays because they are part of the output, and the backward MTLD pass
+    reads integer token IDs back from a temporary file.
+
+    The buffer can only grow past one piece when a "(" stays unclosed, since
+    the citation protection of the sentence tokeniser may then span any cut.
+    """
+
+    def __init__(
+        self,
+        pattern_score: float = 0,
+        structural_penalty: float = 0,
+        non_native: bool = False,
+        scoring_version: str = "v3",
+        min_piece_chars: int = _MIN_PIECE_CHARS,
+    ) -> None:
+        self.pattern_score = pattern_score
+        self.structural_penalty = structural_penalty
+        self.non_native = non_native
+        self.scoring_version = scoring_version
+        self._min_piece_chars = min_piece_chars
+        self._result: dict | None = None
+
+        # Unconsumed text (the open sentence plus anything fed since)
+        self._pending: list[str] = []
+        self._pending_chars = 0
+        self._next_attempt = min_piece_chars
+
+        # Sentences
+        self._sentence_lengths = array("I")
+        self._question_count = 0
+
+        # Paragraphs; the last one may continue into the next piece
+        self._paragraphs = _ParagraphStitcher()
+
+        # Lexicon and pattern matches
+        self._lexicon: dict[str, Counter] = defaultdict(Counter)
+        self._contractions: list[str] = []
+        self._pronouns: list[str] = []
+
+        # Token streams
+        self._mtld_count = 0
+        self._mtld_state: tuple[float, set, int] = (0.0, frozenset(), 0)
+        # Every piece is interned into the same vocabulary, so token IDs
+        # stay comparable across pieces even if the process-wide one is
+        # replaced mid-stream.
+        self._vocabulary = current_vocabulary()
+        self._spill = _TokenSpill()
+        # (start offset in the spill, speculative backward run or None) per
+        # stretch of tokens; the backward pass stitches speculated stretches.
+        self._mtld_segments: list[tuple[int, tuple | None]] = []
+        self._spectrum: Counter = Counter()
+        self._word_count = 0
+        self._abstract_count = 0
+        self._abstracts: list[str] = []
+        self._surprisal = _SurprisalStats()
+
+    def feed(self, chunk: str) -> None:
+        """Add the next *chunk* of text."""
+        if self._result is not None:
+            raise RuntimeError("feed() called after result()")
+        self._pending.append(chunk)
+        self._pending_chars += len(chunk)
+        if self._pending_chars < self._next_attempt:
+            return
+
+        buffer = "".join(self._pending)
+        cut = _safe_cut(buffer)
+        if cut:
+            self._consume(buffer[:cut])
+            buffer = buffer[cut:]
+            self._next_attempt = len(buffer) + self._min_piece_chars
+        else:
+            # Rescan only once the buffer has doubled, keeping feeding linear.
+            self._next_attempt = 2 * len(buffer)
+        self._pending = [buffer]
+        self._pending_chars = len(buffer)
+
+    def result(self) -> dict:
+        """Finish the stream and return the ``compute_all_metrics`` dict."""
+        if self._result is None:
+            self._consume("".join(self._pending))
+            self._pending = []
+            self._paragraphs.close()
+            try:
+                self._result = self._finish()
+            finally:
+                self._spill.close()
+        return self._result
+
+    # -- piece analysis -----------------------------------------------------
+
+    def _consume(self, piece: str) -> None:
+        self.merge(PieceSummary(piece, self._vocabulary))
+
+    def merge(self, summary: PieceSummary) -> None:
+        """Fold in the summary of the text that follows everything so far."""
+        if self._result is not None:
+            raise RuntimeError("merge() called after result()")
+        ids = summary.mtld_ids
+        spectrum = summary.spectrum
+        speculation = summary.mtld_speculation
+        if summary.types is not None:
+            remap = self._vocabulary.intern(summary.types)
+            ids = array("I", map(remap.__getitem__, ids))
+            spectrum = {remap[i]: count for i, count in spectrum.items()}
+            if speculation is not None:
+                speculation = tuple(
+                    (resets, (factors, {remap[i] for i in type_set}, count))
+                    for resets, (factors, type_set, count) in speculation
+                )
+
+        self._sentence_lengths.extend(summary.sentence_lengths)
+        self._question_count += summary.question_count
+
+        for category, counts in summary.lexicon.items():
+            self._lexicon[category].update(counts)
+        self._contractions.extend(summary.contractions)
+        self._pronouns.extend(summary.pronouns)
+
+        if speculation is None:
+            self._mtld_state = _mtld_advance(ids, self._mtld_state)
+            if not self._mtld_segments or self._mtld_segments[-1][1] is not None:
+                self._mtld_segments.append((self._mtld_count, None))
+        else:
+            forward, backward = speculation
+            self._mtld_state = _mtld_stitch(ids, forward, self._mtld_state)
+            self._mtld_segments.append((self._mtld_count, backward))
+        self._mtld_count += len(ids)
+        self._spill.extend(ids)
+
+        self._word_count += summary.word_count
+        self._spectrum.update(spectrum)
+        self._abstract_count += summary.abstract_count
+        room = _ABSTRACTS_LISTED - len(self._abstracts)
+        if room > 0:
+            self._abstracts.extend(summary.abstracts[:room])
+        self._surprisal.merge(summary.surprisal)
+        self._paragraphs.add(summary.paragraph_segments)
+
+    def _finish(self) -> dict:
+        sentence_count = len(self._sentence_lengths)
+
+        factors_fwd = _mtld_factors(self._mtld_state)
+        backward: tuple[float, set, int] = (0.0, frozenset(), 0)
+        if self._mtld_count >= 10:
+            end = self._mtld_count
+            for start, speculation in reversed(self._mtld_segments):
+                blocks = self._spill.reversed_blocks(start, end)
+                if speculation is None:
+                    for block in blocks:
+                        backward = _mtld_advance(block, backward)
+                else:
+                    backward = _mtld_stitch(chain.from_iterable(blocks), speculation, backward)
+                end = start
+        factors_bwd = _mtld_factors(backward)
+
+        return _assemble_all_metrics(
+            {
+                "burstiness": _burstiness_result(self._sentence_lengths.tolist(), self.non_native),
+                "mtld": _mtld_result(self._mtld_count, factors_fwd, factors_bwd),
+                "paragraph_opener_diversity": _opener_diversity_result(self._paragraphs.openers),
+                "hedge_density": _hedge_result(self._lexicon["hedge"], sentence_count),
+                "hapax_rate": _hapax_result(_hapax_count(self._spectrum), self._word_count),
+                "contraction_density": _contraction_result(self._contractions, sentence_count),
+                "paragraph_length_variance": _paragraph_variance_result(
+                    self._paragraphs.lengths.tolist(),
+                ),
+                "surprisal_proxy": self._surprisal.proxy_result(),
+                "surprisal_autocorrelation": self._surprisal.autocorrelation_result(),
+                "connective_diversity": _connective_result(self._lexicon["connective"]),
+                "pronoun_density": _pronoun_result(self._pronouns, sentence_count),
+                "question_ratio": _question_result(self._question_count, sentence_count),
+                "abstract_noun_ratio": _abstract_result(
+                    self._abstracts, self._abstract_count, self._word_count,
+                ),
+            },
+            pattern_score=self.pattern_score,
+            structural_penalty=self.structural_penalty,
+            scoring_version=self.scoring_version,
+        )
+
+
+# ---------------------------------------------------------------------------
+# Convenience wrappers
+# ---------------------------------------------------------------------------
+
+def iter_file_chunks(
+    path: str,
+    chunk_size: int = _MIN_PIECE_CHARS,
+    encoding: str = "utf-8",
+) -> Iterator[str]:
+    """Yield the text of *path* in chunks of at most *chunk_size* characters."""
+    with open(path, "r", encoding=encoding) as fh:
+        while True:
+            chunk = fh.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def compute_all_metrics_stream(chunks: Iterable[str], **kwargs) -> dict:
+    """Run ``compute_all_metrics`` over an iterable of text chunks.
+
+    Keyword arguments are those of ``compute_all_metrics`` (``pattern_score``,
+    ``structural_penalty``, ``non_native``, ``scoring_version``).
+    """
+    analyzer = StreamingAnalyzer(**kwargs)
+    for chunk in chunks:
+        analyzer.feed(chunk)
+    return analyzer.result()
@@ -0,0 +1,93 @@
+"""Per-process token interner.
+
+Token streams are stored as ``array('I')`` of vocabulary IDs rather than
+lists of strings.  Type sets and frequency spectra then hash small ints,
+and per-type records (such as lexical features and word frequency) are
+computed once per vocabulary entry and read back by ID.
+
+A process shares one ``Vocabulary`` between all documents it analyses.
+When it reaches ``MAX_TYPES`` entries :func:`current_vocabulary` starts a
+fresh one; documents keep a reference to the vocabulary their IDs came
+from, so IDs are only ever compared within a single vocabulary.
+"""
+
+import threading
+from array import array
+from collections.abc import Callable, Iterable
+
+
+MAX_TYPES = 1 << 20
+
+
+class Vocabulary:
+    """Append-only, thread-safe mapping between tokens and integer IDs."""
+
+    def __init__(self) -> None:
+        self._ids: dict[str, int] = {}
+        self.tokens: list[str] = []
+        self._columns: dict[str, tuple[array, ...]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def __contains__(self, token: object) -> bool:
+        return token in self._ids
+
+    def intern(self, tokens: Iterable[str]) -> array:
+        """Return the IDs of *tokens* as an ``array('I')``, adding new types."""
+        if not isinstance(tokens, (list, tuple)):
+            tokens = list(tokens)
+        ids = self._ids
+        new = set(tokens).difference(ids)
+        if new:
+            with self._lock:
+                for token in new:
+                    if token not in ids:
+                        ids[token] = len(self.tokens)
+                        self.tokens.append(token)
+        return array("I", map(ids.__getitem__, tokens))
+
+    def lookup(self, ids: Iterable[int]) -> list[str]:
+        """Return the tokens for *ids*."""
+        return list(map(self.tokens.__getitem__, ids))
+
+    def columns(
+        self,
+        name: str,
+        compute: Callable[[str], tuple],
+        typecodes: str,
+    ) -> tuple[array, ...]:
+        """Return per-ID arrays holding the fields of ``compute(token)``.
+
+        *compute* returns one value per character of *typecodes*.  It runs
+        once per vocabulary entry and the record is cached under *name*;
+        the returned arrays cover every ID interned so far.
+        """
+        # Readers skip the lock once the last column covers every ID.  A
+        # fill extends the columns in order, so the last one is published
+        # only after all the others hold the new records.
+        arrays = self._columns.get(name)
+        if arrays is not None and len(arrays[-1]) == len(self.tokens):
+            return arrays
+        with self._lock:
+            arrays = self._columns.setdefault(name, tuple(array(code) for code in typecodes))
+            records = [compute(token) for token in self.tokens[len(arrays[-1]):]]
+            if records:
+                for column, values in zip(arrays, zip(*records)):
+                    column.extend(values)
+            return arrays
+
+
+_CURRENT = Vocabulary()
+_CURRENT_LOCK = threading.Lock()
+
+
+def current_vocabulary() -> Vocabulary:
+    """Return the process-wide vocabulary, replacing it once it is full."""
+    global _CURRENT
+    if len(_CURRENT) >= MAX_TYPES:
+        with _CURRENT_LOCK:
+            if len(_CURRENT) >= MAX_TYPES:
+                _CURRENT = Vocabulary()
+    return _CURRENT
@@ -0,0 +1,275 @@
+"""
+Unit tests for humanizer_mcp.alignment — sentence alignment of a rewrite.
+
+Run with:
+    pytest tests/test_alignment.py -v
+"""
+
+import random
+
+import pytest
+
+from humanizer_mcp import alignment, cache
+from humanizer_mcp.alignment import (
+    TextAlignment,
+    UnitCache,
+    align_sentences,
+    compute_all_metrics_pair,
+    compute_all_metrics_pair_cached,
+    sentence_changes,
+    sentence_units,
+)
+from humanizer_mcp.cache import ResultCache
+from humanizer_mcp.metrics import AnalyzedDocument, compute_all_metrics
+from humanizer_mcp.vocabulary import Vocabulary
+
+from tests.test_streaming import HUMANIZED_TEXT, SAMPLE_TEXT, TEXTS, TRICKY_TEXT
+
+
+def _long_text(seed: int, paragraphs: int = 60) -> str:
+    rng = random.Random(seed)
+    words = sorted(set(" ".join(TEXTS).lower().replace(".", "").replace(",", "").split()))
+    return "\n\n".join(
+        " ".join(
+            " ".join(rng.choices(words, k=rng.randint(4, 25))).capitalize() + rng.choice(".?")
+            for _ in range(rng.randint(2, 6))
+        )
+        for _ in range(paragraphs)
+    )
+
+
+def _rewrite(text: str, seed: int, share: float) -> str:
+    """Replace about *share* of the sentences of *text* by sentences of another text."""
+    rng = random.Random(seed)
+    replacements = sentence_units(_long_text(seed + 100))[1:]
+    return "".join(
+        rng.choice(replacements) if i and rng.random() < share else unit
+        for i, unit in enumerate(sentence_units(text))
+    )
+
+
+@pytest.fixture
+def fresh_units(monkeypatch):
+    unit_cache = UnitCache()
+    monkeypatch.setattr(alignment, "UNIT_CACHE", unit_cache)
+    return unit_cache
+
+
+@pytest.fixture
+def fresh_cache(monkeypatch):
+    result_cache = ResultCache(max_bytes=1 << 24)
+    monkeypatch.setattr(cache, "RESULT_CACHE", result_cache)
+    return result_cache
+
+
+# ============================================================================
+# 1. Sentence units
+# ============================================================================
+
+
+class TestSentenceUnits:
+    def test_units_concatenate_back(self):
+        for text in TEXTS:
+            assert "".join(sentence_units(text)) == text
+        assert sentence_units("") == []
+
+    def test_one_unit_per_sentence(self):
+        assert sentence_units("One two three. Four five? Six\n\nSeven.") == [
+            "One two three.", " Four five?", " Six\n\nSeven.",
+        ]
+
+    def test_protected_dots_do_not_cut(self):
+        units = sentence_units(TRICKY_TEXT)
+        assert units[0] == "Smith et al. (2020) found p = .001 and 0.45 effects."
+        assert units[-1] == " (Unclosed paren. And more text here. Final words."
+
+
+# ============================================================================
+# 2. Alignment
+# ============================================================================
+
+
+class TestAlignSentences:
+    def test_identical_lists(self):
+        units = sentence_units(SAMPLE_TEXT)
+        assert align_sentences(units, units) == [("equal", 0, len(units), 0, len(units))]
+        assert align_sentences([], []) == []
+
+    def test_replace_insert_delete(self):
+        a = ["A.", " B.", " C.", " D.", " E."]
+        b = ["A.", " X.", " C.", " D.", " Y.", " E."]
+        assert align_sentences(a, b) == [
+            ("equal", 0, 1, 0, 1),
+            ("replace", 1, 2, 1, 2),
+            ("equal", 2, 4, 2, 4),
+            ("insert", 4, 4, 4, 5),
+            ("equal", 4, 5, 5, 6),
+        ]
+        assert align_sentences(a, a[:2] + a[3:]) == [
+            ("equal", 0, 2, 0, 2), ("delete", 2, 3, 2, 2), ("equal", 3, 5, 2, 4),
+        ]
+
+    def test_repeated_sentences_align_in_the_gaps(self):
+        a = [" Yes.", " Unique one.", " Yes.", " Yes.", " Unique two."]
+        b = [" Yes.", " Unique one.", " Yes.", " No.", " Unique two."]
+        assert align_sentences(a, b) == [
+            ("equal", 0, 3, 0, 3), ("replace", 3, 4, 3, 4), ("equal", 4, 5, 4, 5),
+        ]
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_opcodes_cover_both_texts(self, seed):
+        original = _long_text(seed, paragraphs=20)
+        aligned = TextAlignment(original, _rewrite(original, seed, 0.3))
+        i = j = 0
+        for tag, i1, i2, j1, j2 in aligned.opcodes:
+            assert (i1, j1) == (i, j)
+            if tag == "equal":
+                assert aligned.original[i1:i2] == aligned.humanized[j1:j2]
+            i, j = i2, j2
+        assert (i, j) == (len(aligned.original), len(aligned.humanized))
+
+
+# ============================================================================
+# 3. Metrics of both texts
+# ============================================================================
+
+
+class TestMetricsPair:
+    @pytest.mark.parametrize("seed", range(3))
+    @pytest.mark.parametrize("share", [0.03, 0.3, 1.0])
+    def test_pair_matches_full_analyses(self, fresh_units, seed, share):
+        original = _long_text(seed)
+        humanized = _rewrite(original, seed, share)
+        before, after = compute_all_metrics_pair(
+            TextAlignment(original, humanized), {"pattern_score": 20}, {"pattern_score": 10},
+        )
+        assert before == compute_all_metrics(original, pattern_score=20)
+        assert after == compute_all_metrics(humanized, pattern_score=10)
+
+    def test_small_and_unrelated_texts(self, fresh_units):
+        for original, humanized in [(SAMPLE_TEXT, HUMANIZED_TEXT), (TRICKY_TEXT, SAMPLE_TEXT), ("", "")]:
+            assert compute_all_metrics_pair(TextAlignment(original, humanized)) == (
+                compute_all_metrics(original), compute_all_metrics(humanized),
+            )
+
+    def test_only_changed_units_are_tokenised(self, fresh_cache, fresh_units, monkeypatch):
+        original = _long_text(4)
+        humanized = _rewrite(original, 4, 0.3)
+        aligned = TextAlignment(original, humanized)
+        changed = [
+            unit for tag, _, _, j1, j2 in aligned.opcodes if tag != "equal"
+            for unit in aligned.humanized[j1:j2] if unit not in aligned.original
+        ]
+        assert 0.2 < len(changed) / len(aligned.humanized) < 0.4
+        tokenised = []
+        unit_records = alignment._unit_records
+
+        def spy(doc, units):
+            tokenised.append(doc.text)
+            return unit_records(doc, units)
+
+        monkeypatch.setattr(alignment, "_unit_records", spy)
+        before, after = compute_all_metrics_pair_cached(original, humanized, alignment=aligned)
+        assert tokenised == [original, "".join(dict.fromkeys(changed))]
+        assert after == compute_all_metrics(humanized)
+
+        # A second rewrite of the same original reuses every record it shares.
+        tokenised.clear()
+        again = _rewrite(original, 5, 0.3)
+        seen = set(aligned.original + aligned.humanized)
+        new = [unit for unit in dict.fromkeys(sentence_units(again)) if unit not in seen]
+        assert compute_all_metrics_pair_cached(original, again)[1] == compute_all_metrics(again)
+        assert tokenised == ["".join(new)]
+
+    def test_tokenised_document_supplies_records(self, fresh_cache, fresh_units):
+        original = AnalyzedDocument(_long_text(2))
+        original.token_ids
+        humanized = _rewrite(original.text, 2, 0.3)
+        compute_all_metrics_pair_cached(original, humanized)
+        assert fresh_units.stats()["entries"] >= len(set(sentence_units(original.text)))
+        assert original.__dict__.keys() >= {"spans", "token_ids"}
+
+    def test_cached_pair_stores_both_results(self, fresh_cache, fresh_units):
+        original = _long_text(0)
+        humanized = _rewrite(original, 0, 0.01)
+        before, after = compute_all_metrics_pair_cached(original, humanized, pattern_score_after=30)
+        assert after == compute_all_metrics(humanized, pattern_score=30)
+        assert cache.cached_metrics(original) == before
+        assert cache.cached_metrics(humanized, pattern_score=30) == after
+
+    def test_cached_side_is_not_recomputed(self, fresh_cache, fresh_units, monkeypatch):
+        original = _long_text(1)
+        humanized = _rewrite(original, 1, 0.01)
+        cache.compute_all_metrics_cached(original)
+        analysed = []
+        analyse = cache._analyse
+        monkeypatch.setattr(cache, "_analyse", lambda text, kwargs: analysed.append(text) or analyse(text, kwargs))
+        assert compute_all_metrics_pair_cached(original, humanized) == (
+            compute_all_metrics(original), compute_all_metrics(humanized),
+        )
+        assert [doc.text for doc in analysed] == [humanized]
+
+
+class TestUnitCache:
+    def test_lru_within_budget(self):
+        units = UnitCache(max_bytes=10)
+        vocabulary = Vocabulary()
+        units.put_many(vocabulary, {"abcd": 1, "efgh": 2})
+        assert units.get_many(vocabulary, ["abcd", "zz"]) == {"abcd": 1}
+        units.put_many(vocabulary, {"ijkl": 3})
+        assert units.get_many(vocabulary, ["abcd", "efgh", "ijkl"]) == {"abcd": 1, "ijkl": 3}
+        stats = units.stats()
+        assert (stats["entries"], stats["bytes"], stats["evictions"]) == (2, 8, 1)
+        assert (stats["hits"], stats["misses"]) == (3, 2)
+
+    def test_new_vocabulary_empties_cache(self):
+        units = UnitCache()
+        units.put_many(Vocabulary(), {"abcd": 1})
+        assert units.get_many(Vocabulary(), ["abcd"]) == {}
+        assert units.stats()["entries"] == 0
+
+    def test_zero_budget_disables(self):
+        units = UnitCache(max_bytes=0)
+        units.put_many(Vocabulary(), {"abcd": 1})
+        assert units.stats()["entries"] == 0
+
+
+# ============================================================================
+# 4. Sentence changes
+# ============================================================================
+
+
+class TestSentenceChanges:
+    def test_changed_inserted_and_deleted(self):
+        original = (
+            "Education mattered a great deal. Moreover, the results were clear. "
+            "The data came from a survey. It ended in spring."
+        )
+        humanized = (
+            "Education mattered a great deal. Did we expect the results we don't like? "
+            "The data came from a survey. It ended in spring. We think it worked well."
+        )
+        report = sentence_changes(TextAlignment(
+            original.replace(" It ended", " Then nothing. It ended"), humanized,
+        ))
+        assert (report["original_sentences"], report["humanized_sentences"]) == (5, 5)
+        assert report["unchanged"] == 3
+        [changed] = report["changed"]
+        assert changed["original"] == "Moreover, the results were clear."
+        assert changed["humanized"] == "Did we expect the results we don't like?"
+        delta = changed["delta"]
+        assert (delta["length"], delta["question"], delta["connectives"]) == (3, 1, -1)
+        assert (delta["pronouns"], delta["contractions"]) == (2, 1)
+        [deleted] = report["deleted"]
+        assert (deleted["original_index"], deleted["text"]) == (3, "Then nothing.")
+        # Two words: too short to count as a sentence, but its words still count.
+        assert deleted["delta"]["length"] == 0 and deleted["delta"]["mean_surprisal"] < 0
+        [inserted] = report["inserted"]
+        assert inserted["humanized_index"] == 4
+        assert inserted["delta"]["length"] == 5 and inserted["delta"]["pronouns"] == 1
+        assert inserted["delta"]["mean_surprisal"] > 0
+
+    def test_identical_texts(self):
+        report = sentence_changes(TextAlignment(SAMPLE_TEXT, SAMPLE_TEXT))
+        assert report["unchanged"] == report["original_sentences"] > 0
+        assert report["changed"] == report["inserted"] == report["deleted"] == []
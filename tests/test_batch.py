@@ -0,0 +1,79 @@
+"""
+Unit tests for humanizer_mcp.batch — process-pool corpus scoring.
+
+Run with:
+    pytest tests/test_batch.py -v
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+from humanizer_mcp import batch
+from humanizer_mcp.batch import _default_chunksize, _init_worker, compute_metrics_many
+from humanizer_mcp.metrics import compute_all_metrics
+
+
+# ---------------------------------------------------------------------------
+# Shared sample texts
+# ---------------------------------------------------------------------------
+
+TEXTS = [
+    "Education mattered in ways we did not expect. But not in the straightforward "
+    "way conventional wisdom suggests. People with degrees knew what models do.",
+    "Why do Democrats and Republicans worry about AI at nearly identical rates? "
+    "That puzzle drove much of our analysis. Same thermometer reading, different fevers.",
+    "",
+    "Age told a more complicated story. Older respondents who had heard of ChatGPT "
+    "showed heightened concern.\n\nStrip away that awareness, though, and age barely registered.",
+]
+
+
+# ============================================================================
+# 1. compute_metrics_many
+# ============================================================================
+
+
+class TestComputeMetricsMany:
+    def test_parallel_results_in_input_order(self):
+        results = compute_metrics_many(TEXTS * 3, max_workers=2, chunksize=2)
+        assert results == [compute_all_metrics(t) for t in TEXTS * 3]
+
+    def test_keyword_arguments_are_forwarded(self):
+        results = compute_metrics_many(TEXTS, max_workers=1, non_native=True, pattern_score=50)
+        assert results == [compute_all_metrics(t, non_native=True, pattern_score=50) for t in TEXTS]
+
+    def test_file_paths(self, tmp_path):
+        paths = []
+        for i, text in enumerate(TEXTS):
+            path = tmp_path / f"doc{i}.txt"
+            path.write_text(text, encoding="utf-8")
+            paths.append(str(path))
+        results = compute_metrics_many(paths, from_files=True, max_workers=2)
+        assert results == [compute_all_metrics(t) for t in TEXTS]
+
+    def test_metric_selection_for_texts_and_files(self, tmp_path):
+        path = tmp_path / "doc.txt"
+        path.write_text(TEXTS[1], encoding="utf-8")
+        expected = [compute_all_metrics(TEXTS[1], metrics=["composite", "mtld"])]
+        assert compute_metrics_many([TEXTS[1]], metrics=["composite", "mtld"]) == expected
+        assert compute_metrics_many(
+            [str(path)], from_files=True, metrics=["composite", "mtld"],
+        ) == expected
+
+    def test_unreadable_file_yields_error_entry(self, tmp_path):
+        missing = str(tmp_path / "missing.txt")
+        results = compute_metrics_many([missing], from_files=True)
+        assert results[0]["path"] == missing
+        assert results[0]["error"].startswith("FileNotFoundError")
+
+    def test_empty_batch(self):
+        assert compute_metrics_many([]) == []
+
+    def test_jobs_go_to_given_executor(self, monkeypatch):
+        with ProcessPoolExecutor(max_workers=2, initializer=_init_worker) as pool:
+            monkeypatch.setattr(batch, "ProcessPoolExecutor", None)  # no pool of its own
+            results = compute_metrics_many(TEXTS, max_workers=1, executor=pool, pattern_score=10)
+        assert results == [compute_all_metrics(t, pattern_score=10) for t in TEXTS]
+
+    def test_default_chunksize(self):
+        assert _default_chunksize(1, 4) == 1
+        assert _default_chunksize(20000, 8) == 625
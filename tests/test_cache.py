@@ -0,0 +1,179 @@
+"""
+Unit tests for humanizer_mcp.cache — content-hash LRU result cache.
+
+Run with:
+    pytest tests/test_cache.py -v
+"""
+
+import pytest
+
+from humanizer_mcp import cache
+from humanizer_mcp.cache import (
+    DiskCache,
+    ResultCache,
+    cached_metrics,
+    compute_all_metrics_cached,
+    result_key,
+    store_metrics,
+)
+from humanizer_mcp.metrics import AnalyzedDocument, compute_all_metrics
+
+
+TEXT = (
+    "Education mattered in ways we did not expect. But not in the straightforward "
+    "way conventional wisdom suggests. Why? Nobody could say for sure."
+)
+
+
+@pytest.fixture
+def fresh_cache(monkeypatch):
+    result_cache = ResultCache(max_bytes=1 << 20)
+    monkeypatch.setattr(cache, "RESULT_CACHE", result_cache)
+    return result_cache
+
+
+# ============================================================================
+# 1. ResultCache
+# ============================================================================
+
+
+class TestResultCache:
+    def test_hit_returns_fresh_copy(self):
+        result_cache = ResultCache()
+        result_cache.put(b"k", {"a": [1, 2], "b": 0.5})
+        first = result_cache.get(b"k")
+        first["a"].append(3)
+        assert result_cache.get(b"k") == {"a": [1, 2], "b": 0.5}
+        assert result_cache.get(b"missing") is None
+        assert (result_cache.hits, result_cache.misses) == (2, 1)
+
+    def test_evicts_least_recently_used_within_byte_budget(self):
+        result_cache = ResultCache(max_bytes=60)
+        for key in (b"a", b"b", b"c"):
+            result_cache.put(key, {"value": "x" * 10})  # 23 bytes of JSON each
+        assert result_cache.get(b"a") is None
+        assert result_cache.get(b"c") is not None
+        stats = result_cache.stats()
+        assert stats["entries"] == 2
+        assert stats["bytes"] <= 60
+        assert stats["evictions"] == 1
+
+    def test_skips_entries_larger_than_budget(self):
+        result_cache = ResultCache(max_bytes=10)
+        result_cache.put(b"big", {"value": "x" * 100})
+        assert result_cache.stats()["entries"] == 0
+
+    def test_key_depends_on_text_and_arguments(self):
+        assert result_key(TEXT, non_native=False) == result_key(TEXT, non_native=False)
+        assert result_key(TEXT, non_native=False) != result_key(TEXT, non_native=True)
+        assert result_key(TEXT) != result_key(TEXT + " ")
+
+
+# ============================================================================
+# 2. Cached compute_all_metrics
+# ============================================================================
+
+
+class TestCachedMetrics:
+    def test_cached_result_matches_fresh_computation(self, fresh_cache):
+        first = compute_all_metrics_cached(TEXT, pattern_score=20)
+        second = compute_all_metrics_cached(TEXT, pattern_score=20.0)
+        assert first == second == compute_all_metrics(TEXT, pattern_score=20)
+        assert (fresh_cache.hits, fresh_cache.misses) == (1, 1)
+
+    def test_different_arguments_miss(self, fresh_cache):
+        compute_all_metrics_cached(TEXT)
+        compute_all_metrics_cached(TEXT, non_native=True)
+        assert fresh_cache.misses == 2
+
+    def test_analyzed_document_shares_key_with_text(self, fresh_cache):
+        expected = compute_all_metrics_cached(TEXT)
+        assert compute_all_metrics_cached(AnalyzedDocument(TEXT)) == expected
+        assert (fresh_cache.hits, fresh_cache.misses) == (1, 1)
+
+    def test_metric_selection_is_cached_separately(self, fresh_cache):
+        full = compute_all_metrics_cached(TEXT)
+        selected = compute_all_metrics_cached(TEXT, metrics=["mtld", "burstiness"])
+        assert selected == {"burstiness": full["burstiness"], "mtld": full["mtld"]}
+        assert compute_all_metrics_cached(TEXT, metrics=["burstiness", "mtld"]) == selected
+        assert (fresh_cache.hits, fresh_cache.misses) == (1, 2)
+
+    def test_lookup_and_store(self, fresh_cache):
+        assert cached_metrics(TEXT, pattern_score=10) is None
+        store_metrics({"stored": True}, TEXT, pattern_score=10)
+        assert cached_metrics(AnalyzedDocument(TEXT), pattern_score=10.0) == {"stored": True}
+        assert compute_all_metrics_cached(TEXT, pattern_score=10) == {"stored": True}
+        assert cached_metrics(TEXT) is None
+
+    def test_zero_budget_disables_cache(self, monkeypatch):
+        disabled = ResultCache(max_bytes=0)
+        monkeypatch.setattr(cache, "RESULT_CACHE", disabled)
+        assert compute_all_metrics_cached(TEXT) == compute_all_metrics(TEXT)
+        assert disabled.stats()["misses"] == 0
+
+
+# ============================================================================
+# 3. DiskCache
+# ============================================================================
+
+
+class TestDiskCache:
+    def test_round_trip_survives_reopen(self, tmp_path):
+        path = str(tmp_path / "cache" / "metrics.sqlite3")
+        DiskCache(path).put(b"k", {"a": [1, 2], "b": 0.5})
+        reopened = DiskCache(path)
+        assert reopened.get(b"k") == {"a": [1, 2], "b": 0.5}
+        assert reopened.get(b"missing") is None
+        assert reopened.stats()["entries"] == 1
+        assert (reopened.hits, reopened.misses) == (1, 1)
+
+    def test_evicts_least_recently_read_over_cap(self, tmp_path):
+        disk = DiskCache(str(tmp_path / "metrics.sqlite3"), max_bytes=200)
+        for i in range(10):
+            disk.put(bytes([i]), {"value": "".join(chr(65 + (i * 7 + j) % 26) for j in range(60))})
+            disk.get(b"\x00")  # keep the first entry warm
+        stats = disk.stats()
+        assert stats["bytes"] <= 200
+        assert disk.get(b"\x00") is not None
+        assert disk.get(b"\x01") is None
+
+    def test_running_total_tracks_table_size(self, tmp_path, monkeypatch):
+        disk = DiskCache(str(tmp_path / "metrics.sqlite3"))
+        total, totals = DiskCache._total, []
+
+        def counted(conn):
+            totals.append(conn)
+            return total(conn)
+
+        monkeypatch.setattr(DiskCache, "_total", staticmethod(counted))
+        for i in range(DiskCache._SYNC_INTERVAL - 1):
+            disk.put(bytes([i]), {"value": i})
+        assert totals == []
+        assert disk._bytes == disk.stats()["bytes"]
+        disk.put(b"k", {"value": "last"})
+        assert len(totals) == 1
+
+    def test_unusable_path_disables_disk_tier(self, tmp_path, monkeypatch, caplog):
+        blocker = tmp_path / "file"
+        blocker.write_text("not a directory")
+        monkeypatch.setenv("HUMANIZER_DISK_CACHE", str(blocker / "metrics.sqlite3"))
+        assert cache._open_disk_cache() is None
+        assert "unavailable" in caplog.text
+        monkeypatch.delenv("HUMANIZER_DISK_CACHE")
+        assert cache._open_disk_cache() is None
+
+    def test_rows_from_other_engine_versions_are_purged(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "metrics.sqlite3")
+        monkeypatch.setattr(cache, "ENGINE_VERSION", "0.0.0")
+        DiskCache(path).put(b"k", {"a": 1})
+        monkeypatch.undo()
+        assert DiskCache(path).stats()["entries"] == 0
+
+    def test_second_tier_of_cached_metrics(self, tmp_path, monkeypatch):
+        disk = DiskCache(str(tmp_path / "metrics.sqlite3"))
+        monkeypatch.setattr(cache, "DISK_CACHE", disk)
+        monkeypatch.setattr(cache, "RESULT_CACHE", ResultCache(max_bytes=0))
+        first = compute_all_metrics_cached(TEXT)
+        second = compute_all_metrics_cached(TEXT)
+        assert first == second == compute_all_metrics(TEXT)
+        assert (disk.hits, disk.misses) == (1, 1)
@@ -0,0 +1,75 @@
+"""
+Unit tests for humanizer_mcp.documents — bounded LRU document store.
+
+Run with:
+    pytest tests/test_documents.py -v
+"""
+
+import pytest
+
+from humanizer_mcp.documents import DocumentStore, document_id
+from humanizer_mcp.metrics import AnalyzedDocument
+
+
+TEXT = (
+    "Education mattered in ways we did not expect. But not in the straightforward "
+    "way conventional wisdom suggests. Why? Nobody could say for sure."
+)
+
+
+# ============================================================================
+# 1. Handles
+# ============================================================================
+
+
+class TestDocumentId:
+    def test_content_addressed(self):
+        assert document_id(TEXT) == document_id(str(TEXT))
+        assert document_id(TEXT) != document_id(TEXT + " ")
+        assert len(document_id(TEXT)) == 32
+
+
+# ============================================================================
+# 2. DocumentStore
+# ============================================================================
+
+
+class TestDocumentStore:
+    def test_add_and_get(self):
+        store = DocumentStore()
+        doc_id = store.add(TEXT)
+        doc = store.get(doc_id)
+        assert isinstance(doc, AnalyzedDocument)
+        assert doc.text == TEXT
+        assert doc_id in store
+
+    def test_reloading_keeps_the_same_document(self):
+        store = DocumentStore()
+        doc_id = store.add(TEXT)
+        doc = store.get(doc_id)
+        doc.word_tokens  # tokenisation is cached on the stored document
+        assert store.add(TEXT) == doc_id
+        assert store.get(doc_id) is doc
+        assert store.stats()["documents"] == 1
+        assert store.stats()["bytes"] == len(TEXT)
+
+    def test_evicts_least_recently_used(self):
+        store = DocumentStore(max_bytes=25)
+        a = store.add("a" * 10)
+        b = store.add("b" * 10)
+        store.get(a)
+        c = store.add("c" * 10)
+        assert a in store and c in store
+        assert b not in store
+        assert store.stats()["bytes"] == 20
+
+    def test_oversized_document_is_still_kept(self):
+        store = DocumentStore(max_bytes=5)
+        store.add("short")
+        doc_id = store.add(TEXT)
+        assert doc_id in store
+        assert store.stats()["documents"] == 1
+
+    def test_unknown_id_raises_value_error(self):
+        with pytest.raises(ValueError, match="humanizer_load_document"):
+            DocumentStore().get("missing")
@@ -0,0 +1,117 @@
+"""
+Unit tests for humanizer_mcp.lexicon — lexicon matching structures.
+
+Run with:
+    pytest tests/test_lexicon.py -v
+"""
+
+import json
+import os
+
+import pytest
+
+from humanizer_mcp.lexicon import FrequencyTable, LexiconMatcher, build_frequency_table
+from humanizer_mcp.metrics import compute_connective_diversity, compute_hedge_density
+
+
+# ============================================================================
+# 1. LexiconMatcher
+# ============================================================================
+
+
+class TestLexiconMatcher:
+    def test_counts_every_category_in_one_scan(self):
+        matcher = LexiconMatcher({
+            "hedge": ["may", "it is possible"],
+            "connective": ["however", "in fact"],
+        })
+        counts = matcher.count("however, it is possible. in fact it may. however we may.")
+        assert counts["hedge"] == {"may": 2, "it is possible": 1}
+        assert counts["connective"] == {"however": 2, "in fact": 1}
+
+    def test_single_words_respect_word_boundaries(self):
+        matcher = LexiconMatcher({"hedge": ["may"]})
+        counts = matcher.count("dismay mayor may. may's may_be")
+        assert counts["hedge"]["may"] == 2
+
+    def test_phrases_need_whole_words_and_whitespace_gaps(self):
+        matcher = LexiconMatcher({"connective": ["in fact", "in contrast"]})
+        counts = matcher.count("within fact. in, fact. in\ncontrast.")
+        assert counts["connective"]["in fact"] == 0
+        assert counts["connective"]["in contrast"] == 1
+
+    def test_overlapping_entries_are_counted_independently(self):
+        matcher = LexiconMatcher({"connective": ["in particular", "particularly"]})
+        counts = matcher.count("in particular, particularly")
+        assert counts["connective"] == {"in particular": 1, "particularly": 1}
+
+    def test_find_reports_offsets_in_order(self):
+        matcher = LexiconMatcher({"hedge": ["may"], "connective": ["in fact"]})
+        text = "in fact, it may. we may"
+        assert matcher.find(text) == [(0, "connective", "in fact"), (12, "hedge", "may"), (20, "hedge", "may")]
+        assert matcher.find("") == []
+
+    def test_rejects_non_word_entries(self):
+        with pytest.raises(ValueError):
+            LexiconMatcher({"hedge": ["so-called"]})
+
+
+# ============================================================================
+# 2. Metric integration
+# ============================================================================
+
+
+class TestLexiconMetrics:
+    def test_hedges_found_keep_lexicon_order(self):
+        result = compute_hedge_density(
+            "It might rain. It is possible that we may stay. Perhaps we may go."
+        )
+        assert result["hedges_found"] == ["it is possible", "may", "may", "might", "perhaps"]
+        assert result["hedge_count"] == 5
+
+    def test_connectives_found_keep_lexicon_order(self):
+        result = compute_connective_diversity(
+            "However, the data held. In contrast, the model failed. However, we continued."
+        )
+        assert result["connectives_found"] == ["in contrast", "however", "however"]
+
+
+# ============================================================================
+# 3. Memory-mapped frequency table
+# ============================================================================
+
+
+DATA_DIR = os.path.join(
+    os.path.dirname(__file__), os.pardir, "src", "humanizer_mcp", "data",
+)
+
+
+class TestFrequencyTable:
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "freq.bin")
+        source = {"the": 5.07, "of": 4.73, "quixotic": 1.0, "naïve": 2.31}
+        build_frequency_table(source, path)
+        table = FrequencyTable.open(path)
+        assert len(table) == 4
+        assert dict(table) == source
+        assert table.get("missing") is None
+        assert "of" in table and "missing" not in table
+        with pytest.raises(KeyError):
+            table["missing"]
+
+    def test_rejects_values_lost_by_quantisation(self, tmp_path):
+        with pytest.raises(ValueError):
+            build_frequency_table({"the": 5.071}, str(tmp_path / "freq.bin"))
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "freq.bin"
+        path.write_bytes(b"not a table at all")
+        with pytest.raises(ValueError):
+            FrequencyTable.open(str(path))
+
+    def test_bundled_table_matches_json_source(self):
+        """The shipped .bin must be regenerated whenever the JSON changes."""
+        with open(os.path.join(DATA_DIR, "word_frequencies.json"), encoding="utf-8") as fh:
+            source = json.load(fh)
+        table = FrequencyTable.open(os.path.join(DATA_DIR, "word_frequencies.bin"))
+        assert dict(table) == source
@@ -5,14 +5,30 @@ Run with:
     pytest tests/test_metrics.py -v
 """
 
+import random
+
+import pytest
+
+from humanizer_mcp import metrics
 from humanizer_mcp.metrics import (
+    METRIC_REGISTRY,
+    TOKEN_ABSTRACT,
+    TOKEN_ALNUM,
+    TOKEN_ALPHA,
+    AnalyzedDocument,
     _compute_discourse_penalty,
     _compute_psycholinguistic_penalty,
+    _MTLDRuns,
+    _mtld_advance,
+    _mtld_factors,
+    _mtld_speculate,
+    _mtld_stitch,
     compute_abstract_noun_ratio,
     compute_burstiness,
     compute_composite_score,
     compute_connective_diversity,
     compute_contraction_density,
+    compute_edit_plan,
     compute_fano_factor,
     compute_hapax_rate,
     compute_hedge_density,
@@ -22,11 +38,21 @@ from humanizer_mcp.metrics import (
     compute_paragraph_opener_diversity,
     compute_pronoun_density,
     compute_question_ratio,
+    compute_sentence_attribution,
     compute_sentence_length_range,
     compute_surprisal_autocorrelation,
     compute_surprisal_proxy,
+    compute_window_profile,
+    evaluate_sentence_candidates,
+    _scan_text,
+    _token_record,
+    _tokenize_sentences,
     get_discipline_profile,
+    metric_inputs,
+    register_metric,
+    resolve_metrics,
 )
+from humanizer_mcp.vocabulary import Vocabulary
 
 
 # ============================================================================
@@ -134,6 +160,45 @@ class TestMTLD:
         result = compute_mtld("Hello world.")
         assert result["mtld"] == 0  # Too few tokens
 
+    @pytest.mark.parametrize("seed", range(5))
+    def test_stitched_chunks_match_sequential_pass(self, seed):
+        """Speculative chunk runs stitched in order give the exact state."""
+        rng = random.Random(seed)
+        tokens = [rng.randrange(40) for _ in range(600)]
+        cuts = sorted([0, len(tokens)] + [rng.randrange(len(tokens)) for _ in range(6)])
+        state = (0.0, frozenset(), 0)
+        for start, end in zip(cuts, cuts[1:]):
+            chunk = tokens[start:end]
+            state = _mtld_stitch(chunk, _mtld_speculate(chunk), state)
+        assert state == _mtld_advance(tokens)
+
+    def test_reentering_runs_match_sequential_pass(self):
+        """A run re-entering the stream in any state is counted from memoised tails."""
+        rng = random.Random(7)
+        tokens = [rng.randrange(30) for _ in range(500)]
+        runs = _MTLDRuns(tokens, offsets=[0, 120, 499])
+        assert runs.snapshots[120] == _mtld_advance(tokens[:120])
+        for _ in range(20):
+            start = rng.randrange(len(tokens))
+            state = _mtld_advance([rng.randrange(60) for _ in range(rng.randrange(40))])
+            expected = _mtld_factors(_mtld_advance(tokens[start:], state))
+            assert runs.factors_from(state, start) == expected
+
+    def test_stitch_stops_reading_once_synchronised(self):
+        rng = random.Random(0)
+        tokens = [rng.randrange(40) for _ in range(600)]
+        speculation = _mtld_speculate(tokens)
+        consumed = []
+
+        def counted():
+            for token in tokens:
+                consumed.append(token)
+                yield token
+
+        state = _mtld_advance([7, 8, 9])
+        assert _mtld_stitch(counted(), speculation, state) == _mtld_advance(tokens, state)
+        assert len(consumed) < len(tokens)
+
 
 # ============================================================================
 # 3. Fano Factor
@@ -889,3 +954,478 @@ class TestExpandedDisciplineProfiles:
             assert "contraction_target" in profile, f"{name} missing contraction_target"
             assert "pronoun_target" in profile, f"{name} missing pronoun_target"
             assert "hapax_target" in profile, f"{name} missing hapax_target"
+
+
+# ============================================================================
+# 23. Analysed document (shared tokenisation)
+# ============================================================================
+
+
+class TestAnalyzedDocument:
+    TEXT = (
+        "Education mattered. But not in the way we expected, did it? "
+        "People with degrees were more likely to know what models do.\n\n"
+        "However, we can't ignore partisan identity. It shaped concern in ways "
+        "that may surprise readers. Perhaps the effect is smaller than it seems."
+    )
+
+    def test_all_metrics_accepts_document(self):
+        """Passing a document must give the same result as passing the string."""
+        doc = AnalyzedDocument(self.TEXT)
+        assert compute_all_metrics(doc) == compute_all_metrics(self.TEXT)
+
+    def test_tokenisation_is_built_once(self):
+        doc = AnalyzedDocument(self.TEXT)
+        sentences = doc.sentences
+        compute_burstiness(doc)
+        compute_question_ratio(doc)
+        assert doc.sentences is sentences
+        assert doc.word_tokens is doc.word_tokens
+
+    def test_individual_metrics_accept_document(self):
+        doc = AnalyzedDocument(self.TEXT)
+        assert compute_hedge_density(doc) == compute_hedge_density(self.TEXT)
+        assert compute_mtld(doc) == compute_mtld(self.TEXT)
+        assert compute_surprisal_proxy(doc) == compute_surprisal_proxy(self.TEXT)
+        assert compute_paragraph_length_variance(doc) == compute_paragraph_length_variance(self.TEXT)
+
+    def test_surprisals_computed_once_per_document(self):
+        doc = AnalyzedDocument(self.TEXT)
+        surprisals = doc.surprisals
+        assert surprisals.typecode == "d"
+        assert len(surprisals) == len(doc.word_tokens)
+        compute_surprisal_proxy(doc)
+        compute_surprisal_autocorrelation(doc)
+        assert doc.surprisals is surprisals
+
+    def test_token_streams_are_interned(self):
+        doc = AnalyzedDocument(self.TEXT)
+        assert doc.mtld_ids.typecode == "I"
+        assert doc.vocabulary.lookup(doc.mtld_ids) == doc.mtld_tokens
+        assert doc.vocabulary.lookup(doc.word_ids) == doc.word_tokens
+        assert len(doc.token_ids) == len(self.TEXT.split())
+        assert doc.frequency_spectrum[doc.vocabulary.intern(["we"])[0]] == 2
+
+    def test_token_feature_record(self):
+        features, zipf, surprisal = _token_record("education")
+        assert features == TOKEN_ALNUM | TOKEN_ALPHA | TOKEN_ABSTRACT
+        assert zipf > 0 and surprisal < 20.0
+        assert _token_record("2020")[0] == TOKEN_ALNUM
+        assert _token_record("") == (0, 0.0, 20.0)
+        assert _token_record("qzxvwk")[1:] == (0.0, 20.0)
+
+    def test_class_streams_follow_feature_bits(self):
+        doc = AnalyzedDocument("In 2020 the education and motivation of 3 nations... -- mattered.")
+        assert doc.mtld_tokens == ["in", "2020", "the", "education", "and", "motivation", "of", "3", "nations", "mattered"]
+        assert "2020" not in doc.word_tokens
+        assert doc.vocabulary.lookup(doc.abstract_ids) == ["education", "motivation"]
+
+    def test_explicit_vocabulary(self):
+        vocabulary = Vocabulary()
+        doc = AnalyzedDocument(self.TEXT, vocabulary)
+        assert compute_all_metrics(doc) == compute_all_metrics(self.TEXT)
+        assert "education" in vocabulary
+
+
+# ============================================================================
+# 24. Sliding-window profile
+# ============================================================================
+
+
+class TestWindowProfile:
+    TEXT = (
+        "Education mattered in ways we did not expect. But not in the straightforward way "
+        "conventional wisdom suggests. People with degrees knew what large language models do. "
+        "Partisan identity shaped the concern landscape profoundly. Democrats and Republicans "
+        "expressed worry at nearly identical rates, yet the mechanisms driving their concern "
+        "diverged sharply. Why? Nobody could say for sure, not even us. Age told a more "
+        "complicated story. Older respondents who had heard of ChatGPT showed heightened concern."
+    )
+
+    def test_sentence_windows_match_whole_window_metrics(self):
+        """Incrementally updated values must equal a fresh computation per window."""
+        doc = AnalyzedDocument(self.TEXT)
+        profile = compute_window_profile(doc, window=3, step=1)
+        assert profile["window_count"] == len(doc.sentences) - 2
+        for win in profile["windows"]:
+            chunk = " ".join(doc.sentences[win["start"]:win["end"]])
+            assert win["hapax_rate"] == compute_hapax_rate(chunk)["rate"]
+            assert win["mtld"] == compute_mtld(chunk)["mtld"]
+            assert win["surprisal_variance"] == compute_surprisal_proxy(chunk)["variance"]
+            assert win["burstiness_cv"] == compute_burstiness(chunk)["cv"]
+
+    def test_token_windows(self):
+        profile = compute_window_profile(self.TEXT, window=20, step=5, unit="tokens")
+        assert profile["unit"] == "tokens"
+        assert all(win["end"] - win["start"] == 20 for win in profile["windows"])
+        assert [win["start"] for win in profile["windows"]][:3] == [0, 5, 10]
+        assert all(win["preview"] for win in profile["windows"])
+
+    def test_short_text_gives_single_window(self):
+        profile = compute_window_profile("One short sentence here.", window=10)
+        assert profile["window_count"] == 1
+        assert profile["windows"][0]["burstiness_cv"] == 0.0
+        assert compute_window_profile("", window=10)["windows"] == []
+
+    def test_rejects_bad_arguments(self):
+        with pytest.raises(ValueError):
+            compute_window_profile(self.TEXT, unit="paragraphs")
+        with pytest.raises(ValueError):
+            compute_window_profile(self.TEXT, window=0)
+
+
+# ============================================================================
+# 25. Metric registry and selective evaluation
+# ============================================================================
+
+
+@pytest.fixture
+def scratch_registry(monkeypatch):
+    monkeypatch.setattr(metrics, "METRIC_REGISTRY", dict(METRIC_REGISTRY))
+    return metrics.METRIC_REGISTRY
+
+
+class TestMetricRegistry:
+    TEXT = (
+        "Education mattered in ways we did not expect. But not in the straightforward way "
+        "conventional wisdom suggests. Why did it matter so much? Nobody could say.\n\n"
+        "I think the data were noisy. However, the effect held across samples, "
+        "and we couldn't explain it away."
+    )
+
+    def test_registry_order_is_result_order(self):
+        assert list(compute_all_metrics(self.TEXT)) == list(METRIC_REGISTRY)
+
+    def test_dependencies_are_resolved_in_order(self):
+        order = resolve_metrics(["composite"])
+        assert order.index("burstiness") < order.index("composite")
+        assert order.index("connective_diversity") < order.index("discourse_penalty")
+        assert "paragraph_opener_diversity" not in order
+        assert resolve_metrics(["fano_factor"]) == ["burstiness", "fano_factor"]
+
+    def test_selection_matches_full_computation(self):
+        full = compute_all_metrics(self.TEXT, pattern_score=30, non_native=True)
+        selected = compute_all_metrics(
+            self.TEXT, pattern_score=30, non_native=True, metrics=["composite", "burstiness"],
+        )
+        assert selected == {"burstiness": full["burstiness"], "composite": full["composite"]}
+
+    def test_selection_builds_only_needed_tokenisations(self):
+        doc = AnalyzedDocument(self.TEXT)
+        compute_all_metrics(doc, metrics=["burstiness", "mtld"])
+        assert "sentence_lengths" in doc.__dict__ and "mtld_ids" in doc.__dict__
+        assert "mtld_tokens" not in doc.__dict__
+        assert "surprisals" not in doc.__dict__
+        assert "sentences" not in doc.__dict__
+        assert "surprisal_stats" in metric_inputs(["composite"])
+        assert metric_inputs(["question_ratio"]) == ["question_count", "sentence_lengths"]
+
+    def test_unknown_metric_rejected(self):
+        with pytest.raises(ValueError, match="Unknown metric"):
+            compute_all_metrics(self.TEXT, metrics=["sparkle"])
+
+    def test_plugin_metric(self, scratch_registry):
+        register_metric(
+            "question_count",
+            lambda doc, results, options: round(
+                results["question_ratio"]["ratio"] * len(doc.sentence_lengths),
+            ),
+            inputs=("sentence_lengths",),
+            depends=("question_ratio",),
+        )
+        assert compute_all_metrics(self.TEXT, metrics=["question_count"]) == {"question_count": 1}
+        assert list(compute_all_metrics(self.TEXT))[-1] == "question_count"
+
+    def test_registration_is_validated(self, scratch_registry):
+        compute = lambda doc, results, options: 0  # noqa: E731
+        with pytest.raises(ValueError):
+            register_metric("burstiness", compute)
+        with pytest.raises(ValueError):
+            register_metric("x", compute, inputs=("syllables",))
+        with pytest.raises(ValueError):
+            register_metric("y", compute, depends=("not_yet_registered",))
+
+
+# ============================================================================
+# 26. Offset scanner
+# ============================================================================
+
+
+class TestScanText:
+    def test_word_spans_match_split(self):
+        text = "  Leading space, tabs\there\n\nand a new paragraph.  "
+        spans = _scan_text(text)
+        words = [text[s:e] for s, e in zip(spans.word_starts, spans.word_ends)]
+        assert words == text.split()
+        assert list(_scan_text("").word_starts) == []
+        assert list(_scan_text("   ").word_starts) == []
+
+    def test_sentence_spans_are_stripped_slices(self):
+        text = "We ran the study twice. Did it work? Yes, it did!  Then we stopped."
+        spans = _scan_text(text)
+        sentences = [text[s:e] for s, e in zip(spans.sentence_starts, spans.sentence_ends)]
+        assert sentences == [
+            "We ran the study twice.", "Did it work?", "Yes, it did!", "Then we stopped.",
+        ]
+        assert list(spans.sentence_lengths) == [5, 3, 3, 3]
+        assert list(spans.sentence_first_words) == [0, 5, 8, 11]
+
+    def test_protections(self):
+        text = (
+            "Smith et al. found an effect of 0.45 here. See Fig. 2 for the plot. "
+            "The result held (see Jones, 2020. Lee, 2021.) across all samples. "
+            "It was small (p = .001) but real."
+        )
+        assert _tokenize_sentences(text) == [
+            "Smith et al. found an effect of 0.45 here.",
+            "See Fig. 2 for the plot.",
+            "The result held (see Jones, 2020. Lee, 2021.) across all samples.",
+            "It was small (p = .001) but real.",
+        ]
+
+    def test_citation_closed_by_abbreviation_is_not_protected(self):
+        text = "The claim was made before (see page two. Smith et al.) and then repeated."
+        assert _tokenize_sentences(text) == [
+            "The claim was made before (see page two.",
+            "Smith et al.) and then repeated.",
+        ]
+
+    def test_paragraph_spans(self):
+        text = "First para has words.\n\n  \n\nSecond one here.\n \nThird."
+        spans = _scan_text(text)
+        paragraphs = [text[s:e] for s, e in zip(spans.paragraph_starts, spans.paragraph_ends)]
+        assert paragraphs == ["First para has words.", "Second one here.", "Third."]
+        assert list(spans.paragraph_lengths) == [4, 3, 1]
+        assert list(spans.paragraph_first_words) == [0, 4, 7]
+
+
+# ============================================================================
+# 27. Per-sentence attribution
+# ============================================================================
+
+
+class TestSentenceAttribution:
+    TEXT = (
+        "Education mattered in ways we did not expect. However, it may not matter in the "
+        "straightforward way conventional wisdom suggests. People with degrees knew what "
+        "large language models do.\n\n"
+        "Moreover, partisan identity perhaps shaped the concern landscape profoundly. "
+        "Democrats and Republicans expressed worry at nearly identical rates; however, the "
+        "mechanisms driving their concern diverged sharply. Why didn't anyone see it coming? "
+        "In fact, nobody could say for sure, not even us.\n\n"
+        "Age told a more complicated story. Moreover, older respondents who had heard of "
+        "ChatGPT showed heightened concern, which might reflect the novelty of the tools."
+    )
+
+    def _without(self, sentence: dict) -> dict:
+        text = self.TEXT[:sentence["start"]] + self.TEXT[sentence["end"]:]
+        return compute_all_metrics(text, pattern_score=25)
+
+    def test_baseline_matches_full_metrics(self):
+        result = compute_sentence_attribution(self.TEXT, pattern_score=25)
+        full = compute_all_metrics(self.TEXT, pattern_score=25)
+        assert result["sentence_count"] == len(full["burstiness"]["sentence_lengths"])
+        assert result["baseline"] == {
+            "burstiness_cv": full["burstiness"]["cv"],
+            "fano_factor": full["fano_factor"],
+            "hedge_density": full["hedge_density"]["density"],
+            "connective_diversity": full["connective_diversity"]["diversity"],
+            "composite_score": full["composite"]["composite_score"],
+        }
+
+    def test_removal_matches_recomputation(self):
+        """Closed-form deltas equal re-running the metrics without the sentence."""
+        result = compute_sentence_attribution(self.TEXT, pattern_score=25)
+        base = result["baseline"]
+        for sentence in result["sentences"]:
+            removed = self._without(sentence)
+            expected = {
+                "burstiness_cv": removed["burstiness"]["cv"],
+                "fano_factor": removed["fano_factor"],
+                "hedge_density": removed["hedge_density"]["density"],
+                "connective_diversity": removed["connective_diversity"]["diversity"],
+                "composite_score": removed["composite"]["composite_score"],
+            }
+            for name, value in expected.items():
+                assert base[name] + sentence["removal"][name] == pytest.approx(value, abs=2e-4)
+
+    def test_one_more_word(self):
+        result = compute_sentence_attribution(self.TEXT)
+        lengths = list(AnalyzedDocument(self.TEXT).sentence_lengths)
+        sentence = result["sentences"][2]
+        lengths[2] += 1
+        cv = compute_burstiness(" ".join(
+            " ".join(["word"] * n) + "." for n in lengths
+        ))["cv"]
+        assert result["baseline"]["burstiness_cv"] + sentence["one_more_word"]["burstiness_cv"] == (
+            pytest.approx(cv, abs=2e-4)
+        )
+
+    def test_top_removals_improve_each_metric(self):
+        result = compute_sentence_attribution(self.TEXT, top=2)
+        sentences = result["sentences"]
+        assert len(result["top_removals"]["hedge_density"]) <= 2
+        for index in result["top_removals"]["hedge_density"]:
+            assert sentences[index]["removal"]["hedge_density"] < 0
+        for index in result["top_removals"]["burstiness_cv"]:
+            assert sentences[index]["removal"]["burstiness_cv"] > 0
+        # Only the sentences holding a repeated connective raise diversity when removed
+        for index in result["top_removals"]["connective_diversity"]:
+            sentence = self.TEXT[sentences[index]["start"]:sentences[index]["end"]].lower()
+            assert "moreover" in sentence or "however" in sentence
+
+    def test_empty_text(self):
+        result = compute_sentence_attribution("")
+        assert result["sentence_count"] == 0
+        assert result["sentences"] == []
+
+
+# ============================================================================
+# 28. Candidate sentence rewrites
+# ============================================================================
+
+
+class TestSentenceCandidates:
+    TEXT = TestSentenceAttribution.TEXT
+    CANDIDATES = [
+        "Education mattered, though not how we expected.",
+        "",
+        "Did education matter? We'd assumed so, and it might have, in ways nobody could predict.",
+        "It mattered.",
+    ]
+
+    def _spliced(self, index: int, candidate: str) -> dict:
+        doc = AnalyzedDocument(self.TEXT)
+        start, end = doc.spans.sentence_starts[index], doc.spans.sentence_ends[index]
+        return compute_all_metrics(self.TEXT[:start] + candidate + self.TEXT[end:], pattern_score=25)
+
+    @pytest.mark.parametrize("index", [0, 4, 8])
+    def test_candidates_match_reanalysis(self, index):
+        result = evaluate_sentence_candidates(self.TEXT, index, self.CANDIDATES, pattern_score=25)
+        assert len(result["candidates"]) == len(self.CANDIDATES)
+        for candidate, scored in zip(self.CANDIDATES, result["candidates"]):
+            full = self._spliced(index, candidate)
+            metrics = scored["metrics"]
+            assert metrics["composite_score"] == full["composite"]["composite_score"]
+            assert metrics["mtld"] == full["mtld"]["mtld"]
+            assert metrics["burstiness_cv"] == full["burstiness"]["cv"]
+            assert metrics["hapax_rate"] == full["hapax_rate"]["rate"]
+            assert metrics["connective_diversity"] == full["connective_diversity"]["diversity"]
+            assert metrics["surprisal_variance"] == pytest.approx(full["surprisal_proxy"]["variance"], abs=1e-4)
+            assert metrics["psycholinguistic_penalty"] == full["psycholinguistic_penalty"]
+
+    def test_baseline_and_best_candidate(self):
+        result = evaluate_sentence_candidates(self.TEXT, 2, self.CANDIDATES)
+        full = compute_all_metrics(self.TEXT)
+        assert result["baseline"]["composite_score"] == full["composite"]["composite_score"]
+        assert result["original"] == AnalyzedDocument(self.TEXT).sentences[2]
+        scores = [c["metrics"]["composite_score"] for c in result["candidates"]]
+        assert scores[result["best_candidate"]] == min(scores)
+        unchanged = evaluate_sentence_candidates(self.TEXT, 2, [result["original"]])
+        assert all(value == 0 for value in unchanged["candidates"][0]["delta"].values())
+
+    def test_statistics_are_kept_with_the_document(self):
+        doc = AnalyzedDocument(self.TEXT)
+        evaluate_sentence_candidates(doc, 1, ["A new sentence here."])
+        stats = doc.sentence_statistics
+        evaluate_sentence_candidates(doc, 3, ["Another one there."])
+        assert doc.sentence_statistics is stats
+
+    def test_sentence_index_out_of_range(self):
+        with pytest.raises(ValueError, match="sentence_index"):
+            evaluate_sentence_candidates(self.TEXT, 99, ["x y z."])
+        assert evaluate_sentence_candidates(self.TEXT, 0, [])["best_candidate"] is None
+
+
+# ============================================================================
+# 29. Edit planner
+# ============================================================================
+
+class TestEditPlan:
+    # Thirty-six nine-word sentences: no burstiness, questions, pronouns,
+    # connectives or contractions.
+    TEXT = " ".join(
+        f"The committee reviewed the {topic} with considerable care again."
+        for topic in ["budget", "policy", "curriculum", "survey", "framework", "outcome",
+                      "method", "sample", "model", "theory", "design", "report"] * 3
+    )
+
+    @staticmethod
+    def _sentence(length: int) -> str:
+        return " ".join(["word"] * length) + "."
+
+    @pytest.mark.parametrize("edit", ["add_short_sentence", "add_long_sentence"])
+    def test_sentence_counts_are_the_fewest_that_pass(self, edit):
+        option = compute_edit_plan(self.TEXT, short_length=3)["burstiness"]["options"][edit]
+        count, length = option["count"], option["sentence_length"]
+        assert count
+        enough = compute_burstiness(self.TEXT + (" " + self._sentence(length)) * count)
+        assert enough["cv"] == option["burstiness_cv"] >= 0.45
+        assert compute_burstiness(self.TEXT + (" " + self._sentence(length)) * (count - 1))["cv"] < 0.45
+
+    def test_unreachable_option_has_no_count(self):
+        # Mixing nine- and four-word sentences never gets the CV to 0.45.
+        options = compute_edit_plan(self.TEXT)["burstiness"]["options"]
+        assert options["add_short_sentence"]["count"] is None
+        assert options["split_sentence"]["count"] is None
+
+    def test_split_matches_splitting_the_text(self):
+        text = TestSentenceAttribution.TEXT
+        option = compute_edit_plan(text)["burstiness"]["options"]["split_sentence"]
+        assert option["count"] == len(option["sentence_indices"]) == 1
+        doc = AnalyzedDocument(text)
+        start = doc.spans.sentence_starts[option["sentence_indices"][0]]
+        words = text[start:].split(" ")
+        split = text[:start] + " ".join(words[:4]) + ". " + " ".join(words[4:])
+        assert compute_burstiness(split)["cv"] == option["burstiness_cv"] >= 0.45
+
+    def test_planned_edits_match_the_edited_text(self):
+        result = compute_edit_plan(self.TEXT)
+        edits = result["plan"]["edits"]
+        assert result["burstiness"]["recommended"] == "add_long_sentence"
+        assert result["discourse_penalty"]["edits"] == {
+            "vary_connective": 1, "add_question": 2, "add_first_person": 1,
+        }
+
+        sentences = AnalyzedDocument(self.TEXT).sentences
+        sentences[0] = "However, " + sentences[0][0].lower() + sentences[0][1:]
+        for i in range(1, 1 + edits["add_question"]):
+            sentences[i] = sentences[i][:-1] + "?"
+        sentences[5] = sentences[5].replace("The committee", "We")
+        for i in range(6, 6 + edits["add_contraction"]):
+            sentences[i] = sentences[i].replace("reviewed", "didn't review")
+        text = " ".join(sentences) + " " + self._sentence(40)
+        full = compute_all_metrics(text)
+        assert full["burstiness"]["cv"] >= 0.45
+        assert full["discourse_penalty"] == result["plan"]["metrics"]["discourse_penalty"] <= 20
+        assert full["contraction_density"]["density"] >= 0.10
+
+    def test_passing_penalties_need_no_edits(self):
+        text = TestSentenceAttribution.TEXT
+        result = compute_edit_plan(text, pattern_score=25)
+        full = compute_all_metrics(text, pattern_score=25)
+        assert result["baseline"]["composite_score"] == full["composite"]["composite_score"]
+        assert result["discourse_penalty"]["passed"]
+        assert result["discourse_penalty"]["edits"] == {}
+        assert result["psycholinguistic_penalty"]["edits"] == {}
+        assert result["plan"]["passes"]
+
+    def test_marginal_gains(self):
+        result = compute_edit_plan(self.TEXT)
+        gains = result["marginal_gains"]
+        assert gains["add_question"]["useful_edits"] == 2  # ceil(0.03 * 36)
+        assert gains["add_first_person"]["useful_edits"] == 2  # ceil(0.05 * 36)
+        assert gains["add_question"]["composite_per_edit"] > 0
+        assert gains["add_first_person"]["composite_per_edit"] > 0
+        assert gains["replace_abstract_noun"] == {"composite_per_edit": 0.0, "useful_edits": 0}
+
+    def test_discipline_threshold(self):
+        text = TestSentenceAttribution.TEXT
+        stem = compute_edit_plan(text, discipline="stem")["burstiness"]
+        assert stem["passed"] and stem["recommended"] is None
+        humanities = compute_edit_plan(text, discipline="humanities")["burstiness"]
+        assert humanities["threshold"] == 0.48 and not humanities["passed"]
+
+    def test_sentence_lengths_below_the_counted_minimum(self):
+        with pytest.raises(ValueError, match="short_length"):
+            compute_edit_plan(self.TEXT, short_length=2)
@@ -0,0 +1,184 @@
+"""
+Unit tests for humanizer_mcp.parallel — map-reduce analysis of one document.
+
+Run with:
+    pytest tests/test_parallel.py -v
+"""
+
+import threading
+import time
+
+import pytest
+
+from humanizer_mcp import parallel, streaming
+from humanizer_mcp.metrics import compute_all_metrics
+from humanizer_mcp.parallel import compute_all_metrics_parallel, split_text, wants_parallel
+from humanizer_mcp.streaming import PieceSummary, StreamingAnalyzer
+from humanizer_mcp.vocabulary import Vocabulary
+
+
+# ---------------------------------------------------------------------------
+# Shared sample text
+# ---------------------------------------------------------------------------
+
+PARAGRAPHS = [
+    "Education mattered in ways we did not expect. But not in the straightforward "
+    "way conventional wisdom suggests (Smith et al., 2020. p. 4.) People with degrees "
+    "knew what models do.",
+    "Why do Democrats and Republicans worry about AI at nearly identical rates? "
+    "That puzzle drove much of our analysis. It is possible that we can't say",
+    "for sure, and perhaps we never will. However, the mechanisms diverged sharply. "
+    "See Fig. 3 for the details, e.g. the 0.45 effect.",
+    "Age told a more complicated story. Older respondents who had heard of ChatGPT "
+    "showed heightened concern. Strip away that awareness, though, and age barely registered.",
+]
+TEXT = "\n\n".join(PARAGRAPHS * 12)
+
+
+class _InlineExecutor:
+    """Runs ``map`` on the calling thread, recording chunk counts and overlap."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.chunks: list[int] = []
+        self.running = self.most_running = 0
+        self._lock = threading.Lock()
+
+    def map(self, fn, items):
+        items = list(items)
+        with self._lock:
+            self.running += 1
+            self.most_running = max(self.most_running, self.running)
+            self.chunks.append(len(items))
+        time.sleep(self.delay)
+        try:
+            return [fn(item) for item in items]
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+# ============================================================================
+# 1. Splitting
+# ============================================================================
+
+
+class TestSplitText:
+    def test_chunks_concatenate_to_text(self):
+        chunks = split_text(TEXT, 5)
+        assert len(chunks) == 5
+        assert "".join(chunks) == TEXT
+
+    def test_cuts_follow_sentence_ends(self):
+        for chunk in split_text(TEXT, 7)[:-1]:
+            assert chunk[-1] in ".!?"
+
+    def test_no_cut_inside_open_parenthesis(self):
+        text = "Start here. (An aside. It runs on. And on.) Then it ends. Done now."
+        for chunk in split_text(text, 4)[:-1]:
+            assert chunk.count("(") == chunk.count(")")
+
+    def test_single_part(self):
+        assert split_text(TEXT, 1) == [TEXT]
+
+
+# ============================================================================
+# 2. Merging chunk summaries
+# ============================================================================
+
+
+class TestMergeSummaries:
+    @pytest.mark.parametrize("parts", [2, 3, 9])
+    def test_standalone_summaries_merge_to_whole_result(self, parts):
+        analyzer = StreamingAnalyzer(pattern_score=20, non_native=True)
+        for chunk in split_text(TEXT, parts):
+            analyzer.merge(PieceSummary.standalone(chunk))
+        assert analyzer.result() == compute_all_metrics(TEXT, pattern_score=20, non_native=True)
+
+    def test_standalone_summaries_carry_mtld_speculation(self):
+        summary = PieceSummary.standalone(PARAGRAPHS[0])
+        forward, backward = summary.mtld_speculation
+        assert forward[1][0] == len(forward[0])
+        assert PieceSummary(PARAGRAPHS[0], Vocabulary()).mtld_speculation is None
+
+    def test_mixed_speculated_and_plain_summaries(self, monkeypatch):
+        """Stitched and plainly advanced stretches share the backward pass."""
+        monkeypatch.setattr(streaming._TokenSpill, "_BLOCK", 64)
+        analyzer = StreamingAnalyzer()
+        for i, chunk in enumerate(split_text(TEXT, 8)):
+            if i % 3:
+                analyzer.merge(PieceSummary.standalone(chunk))
+            else:
+                analyzer.merge(PieceSummary(chunk, analyzer._vocabulary))
+        assert analyzer.result()["mtld"] == compute_all_metrics(TEXT)["mtld"]
+
+    def test_merge_after_result_is_rejected(self):
+        analyzer = StreamingAnalyzer()
+        analyzer.result()
+        with pytest.raises(RuntimeError):
+            analyzer.merge(PieceSummary.standalone(TEXT))
+
+
+# ============================================================================
+# 3. compute_all_metrics_parallel
+# ============================================================================
+
+
+class TestComputeAllMetricsParallel:
+    def test_matches_sequential_analysis(self):
+        result = compute_all_metrics_parallel(TEXT, max_workers=3, min_chunk_chars=1000)
+        assert result == compute_all_metrics(TEXT)
+
+    def test_metric_selection(self):
+        result = compute_all_metrics_parallel(
+            TEXT, max_workers=2, min_chunk_chars=1000, metrics=["mtld", "composite"],
+        )
+        assert result == compute_all_metrics(TEXT, metrics=["mtld", "composite"])
+
+    def test_short_text_runs_in_process(self, monkeypatch):
+        def no_pool(*args, **kwargs):
+            raise AssertionError("no pool expected")
+
+        monkeypatch.setattr(parallel, "ProcessPoolExecutor", no_pool)
+        assert compute_all_metrics_parallel(PARAGRAPHS[0], max_workers=4) == compute_all_metrics(PARAGRAPHS[0])
+
+    def test_pool_is_shared_and_never_forked(self, monkeypatch):
+        monkeypatch.setattr(parallel, "_executor", None)
+        compute_all_metrics_parallel(TEXT, max_workers=2, min_chunk_chars=1000)
+        pool = parallel._pool
+        assert pool._mp_context.get_start_method() in ("forkserver", "spawn")
+        compute_all_metrics_parallel(TEXT, max_workers=2, min_chunk_chars=1000)
+        assert parallel._pool is pool
+
+    def test_chunks_run_on_registered_executor(self, monkeypatch):
+        executor = _InlineExecutor()
+        monkeypatch.setattr(parallel, "_executor", None)
+        parallel.use_executor(executor)
+        result = compute_all_metrics_parallel(TEXT, max_workers=3, min_chunk_chars=1000)
+        assert result == compute_all_metrics(TEXT)
+        assert executor.chunks == [3]
+
+    def test_concurrent_analyses_are_bounded(self, monkeypatch):
+        executor = _InlineExecutor(delay=0.05)
+        monkeypatch.setattr(parallel, "_executor", executor)
+        monkeypatch.setattr(parallel, "_slots", threading.BoundedSemaphore(1))
+        threads = [
+            threading.Thread(target=compute_all_metrics_parallel, args=(TEXT, 2, 1000))
+            for _ in range(3)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert executor.chunks == [2, 2, 2]
+        assert executor.most_running == 1
+
+    def test_unknown_metric_rejected(self):
+        with pytest.raises(ValueError, match="Unknown metric"):
+            compute_all_metrics_parallel(TEXT, metrics=["nope"])
+
+    def test_threshold(self, monkeypatch):
+        monkeypatch.setattr(parallel, "PARALLEL_MIN_CHARS", 0)
+        assert not wants_parallel(10**9)
+        monkeypatch.setattr(parallel, "PARALLEL_MIN_CHARS", 100)
+        assert not wants_parallel(99)
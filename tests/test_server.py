@@ -8,13 +8,30 @@ Run with:
     pytest tests/test_server.py -v
 """
 
+import asyncio
 import json
+import time
 
+import pytest
+
+from humanizer_mcp import batch, parallel, server
+from humanizer_mcp.documents import DOCUMENT_STORE
+from humanizer_mcp.metrics import compute_all_metrics
 from humanizer_mcp.server import (
+    humanizer_attribution,
+    humanizer_cache_stats,
+    humanizer_close_session,
     humanizer_discourse,
+    humanizer_edit_session,
+    humanizer_evaluate_candidates,
+    humanizer_load_document,
     humanizer_metrics,
+    humanizer_metrics_batch,
+    humanizer_open_session,
+    humanizer_plan,
     humanizer_verify,
     humanizer_diff,
+    humanizer_profile,
     humanizer_status,
 )
 
@@ -155,6 +172,23 @@ class TestHumanizerDiffTool:
             assert "delta" in deltas[key]
             assert "improvement_pct" in deltas[key]
 
+    def test_diff_lists_sentence_changes(self):
+        humanized = SAMPLE_TEXT.replace(
+            "But not in the straightforward way conventional wisdom suggests.",
+            "Did conventional wisdom see that coming? We doubt it.",
+        )
+        result = humanizer_diff(original_text=SAMPLE_TEXT, humanized_text=humanized)
+        sentences = result["sentences"]
+        assert sentences["unchanged"] == sentences["original_sentences"] - 1
+        [changed] = sentences["changed"]
+        assert changed["humanized"] == "Did conventional wisdom see that coming?"
+        assert changed["delta"]["question"] == 1
+        assert [s["text"] for s in sentences["inserted"]] == ["We doubt it."]
+        assert sentences["deleted"] == []
+        assert result["deltas"]["question_ratio"]["after"] == (
+            humanizer_metrics(text=humanized)["question_ratio"]["ratio"]
+        )
+
 
 # ============================================================================
 # 4. humanizer_status tool
@@ -296,3 +330,376 @@ class TestHumanizerDiscourseTool:
         # (not strictly guaranteed, but the HUMANIZED_TEXT is designed to be more human-like)
         assert isinstance(result_humanized["flags"], list)
         assert isinstance(result_sample["flags"], list)
+
+
+# ============================================================================
+# 6. humanizer_profile tool
+# ============================================================================
+
+
+class TestHumanizerProfileTool:
+    def test_profile_returns_windows_with_flags(self):
+        result = humanizer_profile(text=SAMPLE_TEXT, window=3)
+        assert result["window_count"] == len(result["windows"]) > 0
+        for win in result["windows"]:
+            assert {"burstiness_cv", "mtld", "hapax_rate", "surprisal_variance", "flags"} <= set(win)
+        assert all(len(result["windows"][i]["flags"]) >= 2 for i in result["flagged_windows"])
+
+    def test_profile_uses_discipline_thresholds(self):
+        result = humanizer_profile(text=HUMANIZED_TEXT, window=4, discipline="stem")
+        assert result["discipline"] == "stem"
+        for win in result["windows"]:
+            assert ("burstiness_cv" in win["flags"]) == (win["burstiness_cv"] < 0.38)
+
+
+# ============================================================================
+# 7. humanizer_metrics_batch tool
+# ============================================================================
+
+
+class TestHumanizerMetricsBatchTool:
+    def test_batch_matches_single_document_tool(self):
+        result = humanizer_metrics_batch(texts=[SAMPLE_TEXT, HUMANIZED_TEXT], max_workers=1)
+        assert result["count"] == 2
+        assert result["error_count"] == 0
+        assert result["results"][1]["composite"] == humanizer_metrics(text=HUMANIZED_TEXT)["composite"]
+
+    def test_batch_requires_exactly_one_source(self):
+        with pytest.raises(ValueError):
+            humanizer_metrics_batch()
+        with pytest.raises(ValueError):
+            humanizer_metrics_batch(texts=[SAMPLE_TEXT], paths=["x.txt"])
+
+    def test_process_executor_runs_batch_on_server_pool(self, monkeypatch):
+        monkeypatch.setattr(batch, "ProcessPoolExecutor", None)  # no nested pool
+        server.configure_executor("process", 2)
+        try:
+            content = asyncio.run(server.mcp.call_tool(
+                "humanizer_metrics_batch", {"texts": [SAMPLE_TEXT, HUMANIZED_TEXT], "max_workers": 2},
+            ))
+        finally:
+            server.configure_executor("thread")
+        result = json.loads(content[0].text)
+        assert result["count"] == 2 and result["error_count"] == 0
+        assert result["results"][0] == compute_all_metrics(SAMPLE_TEXT)
+
+
+# ============================================================================
+# 8. humanizer_cache_stats tool
+# ============================================================================
+
+
+class TestHumanizerCacheStatsTool:
+    def test_repeated_analysis_is_served_from_cache(self):
+        humanizer_cache_stats(clear=True)
+        humanizer_metrics(text=SAMPLE_TEXT, discipline="stem")
+        humanizer_status(text=SAMPLE_TEXT)
+        stats = humanizer_cache_stats()["memory"]
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+        assert stats["entries"] == 1
+
+    def test_mutating_a_tool_result_does_not_poison_cache(self):
+        humanizer_cache_stats(clear=True)
+        plain = humanizer_metrics(text=HUMANIZED_TEXT)
+        humanizer_metrics(text=HUMANIZED_TEXT, discipline="stem")
+        assert humanizer_metrics(text=HUMANIZED_TEXT) == plain
+
+    def test_verify_reuses_sentence_tokenisations(self):
+        humanizer_cache_stats(clear=True)
+        humanizer_verify(original_text=SAMPLE_TEXT, humanized_text=SAMPLE_TEXT + " We added one more line.")
+        units = humanizer_cache_stats()["units"]
+        assert units["entries"] > 1 and units["hits"] == 0
+        humanizer_verify(original_text=SAMPLE_TEXT + " Another new line here.", humanized_text=SAMPLE_TEXT)
+        assert humanizer_cache_stats(clear=True)["units"]["hits"] >= units["entries"] - 1
+        assert humanizer_cache_stats()["units"]["entries"] == 0
+
+
+# ============================================================================
+# 9. Async dispatch to the executor
+# ============================================================================
+
+
+def _slow(delay):
+    time.sleep(delay)
+    return delay
+
+
+@pytest.fixture
+def thread_executor():
+    server.configure_executor("thread", 2)
+    yield
+    server.configure_executor("thread")
+
+
+class TestAsyncDispatch:
+    def test_tools_are_async_with_original_schema(self):
+        tools = {t.name: t for t in asyncio.run(server.mcp.list_tools())}
+        assert set(tools["humanizer_verify"].inputSchema["properties"]) == {
+            "original_text", "humanized_text",
+            "pattern_score_before", "pattern_score_after",
+            "original_doc_id", "humanized_doc_id",
+        }
+        assert server.mcp._tool_manager.get_tool("humanizer_metrics").is_async
+
+    def test_call_tool_matches_direct_call(self, thread_executor):
+        content = asyncio.run(server.mcp.call_tool("humanizer_diff", {
+            "original_text": SAMPLE_TEXT,
+            "humanized_text": HUMANIZED_TEXT,
+        }))
+        payload = json.loads(content[0].text)
+        assert payload == humanizer_diff(original_text=SAMPLE_TEXT, humanized_text=HUMANIZED_TEXT)
+
+    def test_requests_overlap(self, thread_executor):
+        async def pipeline():
+            return await asyncio.gather(
+                server._offload(_slow, {"delay": 0.2}),
+                server._offload(_slow, {"delay": 0.2}),
+            )
+
+        start = time.perf_counter()
+        assert asyncio.run(pipeline()) == [0.2, 0.2]
+        assert time.perf_counter() - start < 0.35
+
+    def test_process_executor(self):
+        server.configure_executor("process", 1)
+        try:
+            content, _ = asyncio.run(server.mcp.call_tool(
+                "humanizer_discourse", {"text": SAMPLE_TEXT},
+            ))
+        finally:
+            server.configure_executor("thread")
+        assert json.loads(content[0].text) == json.loads(humanizer_discourse(text=SAMPLE_TEXT))
+
+    def test_process_executor_is_shared_with_parallel_analyses(self):
+        server.configure_executor("process", 1)
+        try:
+            assert parallel._executor is server._executor
+            assert server._executor._mp_context is parallel.WORKER_CONTEXT
+        finally:
+            server.configure_executor("thread")
+        assert parallel._executor is None
+
+    def test_rejects_unknown_executor(self):
+        with pytest.raises(ValueError):
+            server.configure_executor("fiber")
+
+
+# ============================================================================
+# 10. Command line / transports
+# ============================================================================
+
+
+class TestMain:
+    def test_defaults_to_stdio(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(server.mcp, "run", lambda transport: calls.append(transport))
+        server.main([])
+        assert calls == ["stdio"]
+
+    def test_http_uses_prewarmed_process_pool_on_localhost(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(server.mcp, "run", lambda transport: calls.append(transport))
+        try:
+            server.main(["--transport", "http", "--workers", "2", "--port", "8765"])
+            assert calls == ["streamable-http"]
+            assert server.mcp.settings.host == "127.0.0.1"
+            assert server.mcp.settings.port == 8765
+            assert isinstance(server._executor, server.ProcessPoolExecutor)
+            assert len(server._executor._processes) == 2
+        finally:
+            server.configure_executor("thread")
+
+    def test_rejects_unknown_transport(self):
+        with pytest.raises(SystemExit):
+            server._parse_args(["--transport", "carrier-pigeon"])
+
+
+# ============================================================================
+# 11. Document handles
+# ============================================================================
+
+
+class TestDocumentHandles:
+    def test_load_document_is_content_addressed(self):
+        first = humanizer_load_document(text=SAMPLE_TEXT)
+        assert humanizer_load_document(text=SAMPLE_TEXT) == first
+        assert first["chars"] == len(SAMPLE_TEXT)
+        assert humanizer_load_document(text=HUMANIZED_TEXT)["doc_id"] != first["doc_id"]
+
+    def test_tools_accept_doc_id(self):
+        doc_id = humanizer_load_document(text=SAMPLE_TEXT)["doc_id"]
+        assert humanizer_metrics(doc_id=doc_id) == humanizer_metrics(text=SAMPLE_TEXT)
+        assert humanizer_status(doc_id=doc_id) == humanizer_status(text=SAMPLE_TEXT)
+        assert humanizer_discourse(doc_id=doc_id) == humanizer_discourse(text=SAMPLE_TEXT)
+        assert humanizer_profile(doc_id=doc_id, window=2) == humanizer_profile(
+            text=SAMPLE_TEXT, window=2,
+        )
+        batch = humanizer_metrics_batch(doc_ids=[doc_id], max_workers=1)
+        assert batch == humanizer_metrics_batch(texts=[SAMPLE_TEXT], max_workers=1)
+
+    def test_before_and_after_by_handle(self):
+        original = humanizer_load_document(text=SAMPLE_TEXT)["doc_id"]
+        humanized = humanizer_load_document(text=HUMANIZED_TEXT)["doc_id"]
+        expected = humanizer_diff(original_text=SAMPLE_TEXT, humanized_text=HUMANIZED_TEXT)
+        assert humanizer_diff(original_doc_id=original, humanized_doc_id=humanized) == expected
+        mixed = humanizer_verify(original_doc_id=original, humanized_text=HUMANIZED_TEXT)
+        assert mixed == humanizer_verify(original_text=SAMPLE_TEXT, humanized_text=HUMANIZED_TEXT)
+
+    def test_requires_exactly_one_of_text_or_doc_id(self):
+        doc_id = humanizer_load_document(text=SAMPLE_TEXT)["doc_id"]
+        with pytest.raises(ValueError):
+            humanizer_metrics()
+        with pytest.raises(ValueError):
+            humanizer_metrics(text=SAMPLE_TEXT, doc_id=doc_id)
+        with pytest.raises(ValueError):
+            humanizer_diff(original_text=SAMPLE_TEXT)
+
+    def test_unknown_doc_id(self):
+        with pytest.raises(ValueError, match="humanizer_load_document"):
+            humanizer_status(doc_id="0" * 32)
+
+    def test_process_executor_resolves_handles_in_server(self):
+        doc_id = humanizer_load_document(text=SAMPLE_TEXT)["doc_id"]
+        server.configure_executor("process", 1)
+        try:
+            content, _ = asyncio.run(server.mcp.call_tool(
+                "humanizer_discourse", {"doc_id": doc_id},
+            ))
+        finally:
+            server.configure_executor("thread")
+        assert json.loads(content[0].text) == json.loads(humanizer_discourse(text=SAMPLE_TEXT))
+    def test_process_executor_reuses_stored_totals(self):
+        doc_id = humanizer_load_document(text=SAMPLE_TEXT)["doc_id"]
+        stored = DOCUMENT_STORE.get(doc_id)
+        server.configure_executor("process", 1)
+        try:
+            content = asyncio.run(server.mcp.call_tool(
+                "humanizer_attribution", {"doc_id": doc_id},
+            ))
+        finally:
+            server.configure_executor("thread")
+        assert "sentence_statistics" in stored.__dict__
+        assert json.loads(content[0].text) == humanizer_attribution(text=SAMPLE_TEXT)
+
+
+# ============================================================================
+# 12. Metric selection
+# ============================================================================
+
+
+class TestMetricSelection:
+    def test_metrics_selector_returns_requested_entries(self):
+        full = humanizer_metrics(text=SAMPLE_TEXT)
+        result = humanizer_metrics(text=SAMPLE_TEXT, metrics=["composite", "burstiness"])
+        assert set(result) == {"burstiness", "composite", "discipline", "discipline_profile"}
+        assert result["composite"] == full["composite"]
+
+    def test_selected_composite_uses_discipline_thresholds(self):
+        full = humanizer_metrics(text=SAMPLE_TEXT, discipline="humanities")
+        result = humanizer_metrics(text=SAMPLE_TEXT, discipline="humanities", metrics=["composite"])
+        assert set(result) == {"composite", "discipline", "discipline_profile"}
+        assert result["composite"] == full["composite"]
+
+    def test_batch_selector(self):
+        result = humanizer_metrics_batch(texts=[SAMPLE_TEXT], metrics=["mtld"], max_workers=1)
+        assert result["results"] == [{"mtld": humanizer_metrics(text=SAMPLE_TEXT)["mtld"]}]
+
+    def test_unknown_metric(self):
+        with pytest.raises(ValueError):
+            humanizer_metrics(text=SAMPLE_TEXT, metrics=["sparkle"])
+        with pytest.raises(ValueError):
+            humanizer_metrics_batch(texts=[SAMPLE_TEXT], metrics=["sparkle"])
+
+
+# ============================================================================
+# 13. humanizer_attribution tool
+# ============================================================================
+
+
+class TestHumanizerAttributionTool:
+    def test_attribution_reports_every_sentence(self):
+        result = humanizer_attribution(text=HUMANIZED_TEXT, pattern_score=20)
+        full = humanizer_metrics(text=HUMANIZED_TEXT, pattern_score=20)
+        assert result["sentence_count"] == full["burstiness"]["sentence_count"]
+        assert result["baseline"]["composite_score"] == full["composite"]["composite_score"]
+        for sentence in result["sentences"]:
+            assert set(sentence["removal"]) == set(result["top_removals"])
+
+    def test_attribution_by_doc_id(self):
+        doc_id = humanizer_load_document(text=SAMPLE_TEXT)["doc_id"]
+        assert humanizer_attribution(doc_id=doc_id) == humanizer_attribution(text=SAMPLE_TEXT)
+
+
+# ============================================================================
+# 14. humanizer_evaluate_candidates tool
+# ============================================================================
+
+
+class TestHumanizerEvaluateCandidatesTool:
+    def test_candidates_scored_against_document(self):
+        candidates = ["Education mattered. Oddly.", "Education, it turns out, mattered in ways we'd never guessed."]
+        result = humanizer_evaluate_candidates(sentence_index=0, candidates=candidates, text=SAMPLE_TEXT)
+        assert [c["index"] for c in result["candidates"]] == [0, 1]
+        assert result["baseline"]["composite_score"] == humanizer_metrics(text=SAMPLE_TEXT)["composite"]["composite_score"]
+
+    def test_candidates_by_doc_id(self):
+        doc_id = humanizer_load_document(text=SAMPLE_TEXT)["doc_id"]
+        kwargs = {"sentence_index": 3, "candidates": ["We never expected it."]}
+        assert humanizer_evaluate_candidates(doc_id=doc_id, **kwargs) == (
+            humanizer_evaluate_candidates(text=SAMPLE_TEXT, **kwargs)
+        )
+
+
+# ============================================================================
+# 15. humanizer_plan tool
+# ============================================================================
+
+class TestHumanizerPlanTool:
+    def test_plan_against_status(self):
+        result = humanizer_plan(text=SAMPLE_TEXT, discipline="humanities")
+        status = humanizer_status(text=SAMPLE_TEXT, discipline="humanities")
+        assert result["burstiness"]["threshold"] == status["metrics"]["burstiness_cv"]["target"]
+        assert result["burstiness"]["passed"] == status["metrics"]["burstiness_cv"]["passed"]
+        assert result["baseline"]["composite_score"] == status["metrics"]["composite_score"]["current"]
+        assert result["plan"]["total_edits"] == sum(result["plan"]["edits"].values())
+
+    def test_plan_by_doc_id(self):
+        doc_id = humanizer_load_document(text=SAMPLE_TEXT)["doc_id"]
+        assert humanizer_plan(doc_id=doc_id, target=10) == humanizer_plan(text=SAMPLE_TEXT, target=10)
+
+
+# ============================================================================
+# 16. Document session tools
+# ============================================================================
+
+
+class TestHumanizerSessionTools:
+    def test_edits_track_full_metrics(self):
+        opened = humanizer_open_session(text=SAMPLE_TEXT, pattern_score=30)
+        assert opened["version"] == 0 and opened["chars"] == len(SAMPLE_TEXT)
+        assert opened["metrics"] == compute_all_metrics(SAMPLE_TEXT, pattern_score=30)
+        edited = humanizer_edit_session(opened["session_id"], [
+            {"offset": 0, "delete_length": 9, "insert_text": "Schooling"},
+            {"offset": len(SAMPLE_TEXT), "insert_text": " Did it matter?"},
+        ])
+        text = "Schooling" + SAMPLE_TEXT[9:] + " Did it matter?"
+        assert edited["version"] == 2 and edited["chars"] == len(text)
+        assert edited["metrics"] == compute_all_metrics(text, pattern_score=30)
+        assert humanizer_cache_stats()["sessions"]["sessions"] >= 1
+        assert humanizer_close_session(opened["session_id"])["closed"]
+        with pytest.raises(ValueError, match="Unknown session_id"):
+            humanizer_edit_session(opened["session_id"], [])
+
+    def test_open_by_doc_id_over_mcp(self):
+        doc_id = humanizer_load_document(text=SAMPLE_TEXT)["doc_id"]
+        content = asyncio.run(server.mcp.call_tool("humanizer_open_session", {"doc_id": doc_id}))
+        opened = json.loads(content[0].text)
+        assert opened["metrics"] == compute_all_metrics(SAMPLE_TEXT)
+        with pytest.raises(ValueError, match="outside the text"):
+            humanizer_edit_session(opened["session_id"], [{"offset": len(SAMPLE_TEXT) + 1}])
+        humanizer_close_session(opened["session_id"])
+
+    def test_needs_text_or_doc_id(self):
+        with pytest.raises(ValueError, match="exactly one"):
+            humanizer_open_session()
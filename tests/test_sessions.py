@@ -0,0 +1,139 @@
+"""
+Unit tests for humanizer_mcp.sessions — incremental analysis under edits.
+
+Run with:
+    pytest tests/test_sessions.py -v
+"""
+
+import random
+
+import pytest
+
+from humanizer_mcp import sessions
+from humanizer_mcp.metrics import compute_all_metrics
+from humanizer_mcp.sessions import DocumentSession, SessionStore, _cut_blocks
+
+from tests.test_streaming import HUMANIZED_TEXT, SAMPLE_TEXT, TRICKY_TEXT
+
+
+TEXT = "\n\n".join([SAMPLE_TEXT, TRICKY_TEXT, HUMANIZED_TEXT] * 3)
+
+# Fragments that open and close parentheses, protect dots, and add or
+# remove sentence and paragraph breaks.
+FRAGMENTS = [" ", ". ", "(", ")", "\n\n", "et al. ", "Moreover, ", "we don't know? ", "word ", "e.g. ", "."]
+
+
+# ============================================================================
+# 1. Blocks
+# ============================================================================
+
+
+class TestCutBlocks:
+    def test_blocks_concatenate_back(self):
+        blocks = _cut_blocks(TEXT, 200)
+        assert "".join(blocks) == TEXT
+        assert len(blocks) > 5
+        assert _cut_blocks("", 200) == []
+
+    def test_unclosed_parenthesis_is_kept_whole(self):
+        text = "One two three. (Four five six. " + "Seven eight nine. " * 20
+        blocks = _cut_blocks(text, 40)
+        assert blocks == [text[:14], text[14:]]
+
+
+# ============================================================================
+# 2. Edits
+# ============================================================================
+
+
+class TestDocumentSession:
+    def test_open_matches_full_analysis(self):
+        for text in (TEXT, "", "Too short."):
+            assert DocumentSession(text, block_chars=200).result() == compute_all_metrics(text)
+
+    @pytest.mark.parametrize("seed", range(4))
+    def test_random_edits_match_full_analysis(self, seed):
+        rng = random.Random(seed)
+        session = DocumentSession(TEXT, block_chars=rng.choice([64, 300]))
+        text = TEXT
+        for step in range(40):
+            offset = rng.randrange(len(text) + 1)
+            delete_length = min(rng.choice([0, 1, 3, 40]), len(text) - offset)
+            insert_text = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randrange(3)))
+            session.edit(offset, delete_length, insert_text)
+            text = text[:offset] + insert_text + text[offset + delete_length:]
+            if step % 8 == 7:
+                assert session.text == text
+                assert session.result() == compute_all_metrics(text)
+
+    def test_scoring_options(self):
+        kwargs = {"pattern_score": 40, "structural_penalty": 20, "non_native": True}
+        session = DocumentSession(TEXT, **kwargs)
+        session.apply([(0, 0, "Why now? "), (10, 5, "")])
+        assert session.result() == compute_all_metrics(session.text, **kwargs)
+
+    def test_delete_everything_and_retype(self):
+        session = DocumentSession(TEXT, block_chars=100)
+        session.edit(0, len(TEXT), "")
+        assert session.text == "" and session.result() == compute_all_metrics("")
+        session.edit(0, 0, SAMPLE_TEXT)
+        assert session.result() == compute_all_metrics(SAMPLE_TEXT)
+
+    def test_version_and_result_cache(self):
+        session = DocumentSession(TEXT)
+        first = session.result()
+        assert session.result() is first
+        session.edit(0, 0, "")
+        assert session.version == 0 and session.result() is first
+        session.apply([(0, 0, "Yes. "), (0, 5, "")])
+        assert session.version == 2
+        assert session.result() is not first and session.result() == first
+
+    def test_edit_outside_the_text(self):
+        session = DocumentSession(SAMPLE_TEXT)
+        with pytest.raises(ValueError, match="outside the text"):
+            session.edit(len(SAMPLE_TEXT), 1, "")
+        with pytest.raises(ValueError):
+            session.edit(-1, 0, "x")
+
+    def test_mtld_is_restitched_only_near_the_edit(self, monkeypatch):
+        rng = random.Random(0)
+        words = sorted(set(TEXT.lower().split()))
+        text = " ".join(" ".join(rng.choices(words, k=rng.randint(5, 25))) + "." for _ in range(600))
+        session = DocumentSession(text, block_chars=500)
+        calls = []
+        stitch = sessions._mtld_stitch
+        monkeypatch.setattr(sessions, "_mtld_stitch", lambda *args: calls.append(1) or stitch(*args))
+        for _ in range(10):
+            session.edit(rng.randrange(len(session)), 0, "word ")
+        # Re-running both passes would stitch every block twice per edit.
+        assert len(calls) < 10 * 2 * len(session._texts) // 4
+        assert session.result() == compute_all_metrics(session.text)
+
+
+# ============================================================================
+# 3. SessionStore
+# ============================================================================
+
+
+class TestSessionStore:
+    def test_open_get_close(self):
+        store = SessionStore()
+        session_id, session = store.open(SAMPLE_TEXT, pattern_score=10)
+        assert store.get(session_id)[0] is session
+        assert session.pattern_score == 10
+        assert store.stats() == {"sessions": 1, "bytes": len(SAMPLE_TEXT), "max_bytes": store.max_bytes}
+        assert store.close(session_id)
+        assert not store.close(session_id)
+        with pytest.raises(ValueError, match="Unknown session_id"):
+            store.get(session_id)
+
+    def test_evicts_least_recently_used(self):
+        store = SessionStore(max_bytes=2 * len(SAMPLE_TEXT))
+        first, _ = store.open(SAMPLE_TEXT)
+        second, _ = store.open(SAMPLE_TEXT)
+        store.get(first)
+        store.open(SAMPLE_TEXT)
+        store.get(first)
+        with pytest.raises(ValueError):
+            store.get(second)
@@ -0,0 +1,188 @@
+"""
+Unit tests for humanizer_mcp.stats — pure-Python and NumPy stats backends.
+
+Run with:
+    pytest tests/test_stats.py -v
+"""
+
+import random
+
+import pytest
+
+from humanizer_mcp import stats
+from humanizer_mcp.stats import RunningStats
+from humanizer_mcp.metrics import (
+    _SurprisalStats,
+    _burstiness_result,
+    compute_all_metrics,
+    compute_fano_factor,
+)
+
+
+@pytest.fixture
+def restore_backend():
+    original = stats.BACKEND
+    yield
+    stats.set_backend(original)
+
+
+def _random_text(seed: int, n_words: int) -> str:
+    rnd = random.Random(seed)
+    vocab = (
+        "the study found that education mattered but not in the way we "
+        "expected however partisan identity shaped concern profoundly and "
+        "respondents who knew chatgpt worried more quixotic serendipity"
+    ).split()
+    endings = ["", "", "", ".", "?", ".\n\n"]
+    return " ".join(rnd.choice(vocab) + rnd.choice(endings) for _ in range(n_words))
+
+
+# ============================================================================
+# 1. Backend selection
+# ============================================================================
+
+
+class TestBackendSelection:
+    def test_python_backend_always_available(self, restore_backend):
+        assert stats.set_backend("python") == "python"
+
+    def test_auto_resolves_to_installed_backend(self, restore_backend):
+        expected = "numpy" if stats.np is not None else "python"
+        assert stats.set_backend("auto") == expected
+
+    def test_rejects_unknown_backend(self, restore_backend):
+        with pytest.raises(ValueError):
+            stats.set_backend("fortran")
+
+    def test_numpy_backend_requires_numpy(self, restore_backend, monkeypatch):
+        monkeypatch.setattr(stats, "np", None)
+        with pytest.raises(ImportError):
+            stats.set_backend("numpy")
+
+
+# ============================================================================
+# 2. Mergeable accumulator
+# ============================================================================
+
+
+class TestRunningStats:
+    VALUES = [2, 4, 4, 4, 5, 5, 7, 9]
+
+    def test_moments(self, restore_backend):
+        stats.set_backend("python")
+        acc = RunningStats.from_values(self.VALUES)
+        assert (acc.count, acc.mean, acc.variance) == (8, 5.0, 4.0)
+        assert (acc.min, acc.max) == (2, 9)
+
+    def test_variance_rounds_like_two_pass_formula(self, restore_backend):
+        stats.set_backend("python")
+        lengths = [9, 5, 5, 4, 7, 7, 9, 4, 4, 10]
+        mean = sum(lengths) / len(lengths)
+        variance = sum((x - mean) ** 2 for x in lengths) / len(lengths)
+        acc = RunningStats.from_values(lengths)
+        assert (acc.mean, acc.variance) == (mean, variance)
+        assert _burstiness_result(lengths)["cv"] == 0.3437
+        assert compute_fano_factor(lengths) == round(variance / mean, 4)
+
+    def test_empty(self):
+        acc = RunningStats()
+        assert acc.count == 0 and acc.variance == 0.0
+        assert acc.merge(RunningStats()).count == 0
+
+    def test_piecewise_update_is_bit_identical(self, restore_backend):
+        stats.set_backend("python")
+        rnd = random.Random(1)
+        values = [rnd.uniform(0.0, 20.0) for _ in range(300)]
+        whole = RunningStats(lag=2).update(values)
+        pieces = RunningStats(lag=2)
+        for start in range(0, 300, 37):
+            pieces.update(values[start:start + 37])
+        for name in RunningStats.__slots__:
+            assert getattr(pieces, name) == getattr(whole, name)
+
+    @pytest.mark.parametrize("lag", [0, 1, 2, 3])
+    def test_merge_matches_sequential(self, restore_backend, lag):
+        stats.set_backend("python")
+        rnd = random.Random(lag)
+        values = [rnd.uniform(-5.0, 5.0) for _ in range(50)]
+        whole = RunningStats(lag).update(values)
+        merged = RunningStats(lag)
+        for chunk in (values[:1], values[1:3], values[3:20], [], values[20:]):
+            merged.merge(RunningStats(lag).update(chunk))
+        assert merged.count == whole.count
+        assert merged.mean == pytest.approx(whole.mean)
+        assert merged.m2 == pytest.approx(whole.m2)
+        assert merged.lag_sum == pytest.approx(whole.lag_sum)
+        assert (merged.min, merged.max) == (whole.min, whole.max)
+        assert (merged.head, merged.tail) == (whole.head, whole.tail)
+
+    def test_autocovariance(self, restore_backend):
+        stats.set_backend("python")
+        values = [1.0, 3.0, 2.0, 5.0, 4.0, 6.0]
+        mean = sum(values) / len(values)
+        expected = sum((values[i] - mean) * (values[i + 2] - mean) for i in range(4)) / 4
+        assert RunningStats.from_values(values, lag=2).autocovariance() == pytest.approx(expected)
+
+    def test_merge_rejects_different_lags(self):
+        with pytest.raises(ValueError):
+            RunningStats(lag=1).merge(RunningStats(lag=2).update([1.0]))
+
+
+# ============================================================================
+# 3. Backend parity
+# ============================================================================
+
+
+class TestBackendParity:
+    @pytest.mark.parametrize("seed", range(5))
+    def test_all_metrics_identical_across_backends(self, restore_backend, seed):
+        pytest.importorskip("numpy")
+        text = _random_text(seed, 2000)
+        stats.set_backend("python")
+        expected = compute_all_metrics(text)
+        stats.set_backend("numpy")
+        assert compute_all_metrics(text) == expected
+
+    def test_vectorised_surprisal_state_matches_sequential(self, restore_backend):
+        pytest.importorskip("numpy")
+        rnd = random.Random(0)
+        values = [rnd.uniform(3.0, 20.0) for _ in range(500)]
+        stats.set_backend("python")
+        sequential = _SurprisalStats.from_values(values)
+        stats.set_backend("numpy")
+        vectorised = _SurprisalStats.from_values(values)
+        assert vectorised.proxy_result() == sequential.proxy_result()
+        assert vectorised.autocorrelation_result() == sequential.autocorrelation_result()
+        assert vectorised.values.count == sequential.values.count
+        assert vectorised.diffs.head == pytest.approx(sequential.diffs.head)
+
+    def test_vectorised_moments_match_sequential(self, restore_backend):
+        pytest.importorskip("numpy")
+        lengths = [random.Random(2).randint(1, 60) for _ in range(200)]
+        stats.set_backend("python")
+        sequential = RunningStats.from_values(lengths, lag=2)
+        stats.set_backend("numpy")
+        vectorised = RunningStats.from_values(lengths, lag=2)
+        assert vectorised.variance == pytest.approx(sequential.variance)
+        assert (vectorised.min, vectorised.max) == (sequential.min, sequential.max)
+        assert isinstance(vectorised.min, int)
+        assert vectorised.lag_sum == sequential.lag_sum
+
+
+# ============================================================================
+# 4. Merging surprisal statistics
+# ============================================================================
+
+
+class TestSurprisalMerge:
+    def test_merged_pieces_match_whole(self, restore_backend):
+        stats.set_backend("python")
+        rnd = random.Random(3)
+        values = [rnd.uniform(3.0, 20.0) for _ in range(400)]
+        whole = _SurprisalStats.from_values(values)
+        merged = _SurprisalStats()
+        for start in range(0, 400, 90):
+            merged.merge(_SurprisalStats.from_values(values[start:start + 90]))
+        assert merged.proxy_result() == whole.proxy_result()
+        assert merged.autocorrelation_result() == whole.autocorrelation_result()
+        assert merged.diffs.count == 399
@@ -0,0 +1,122 @@
+"""
+Unit tests for humanizer_mcp.streaming — bounded-memory streaming analysis.
+
+Run with:
+    pytest tests/test_streaming.py -v
+"""
+
+import pytest
+
+from humanizer_mcp import streaming
+from humanizer_mcp.metrics import compute_all_metrics
+from humanizer_mcp.streaming import (
+    StreamingAnalyzer,
+    _safe_cut,
+    _safe_cuts,
+    compute_all_metrics_stream,
+    iter_file_chunks,
+)
+
+
+# ---------------------------------------------------------------------------
+# Shared sample texts
+# ---------------------------------------------------------------------------
+
+SAMPLE_TEXT = """\
+Education mattered in ways we did not expect. But not in the straightforward way conventional wisdom suggests. People with college degrees were more likely to know what large language models actually do, and that awareness amplified their concern about job displacement.
+
+Partisan identity shaped the AI concern landscape profoundly. Democrats and Republicans expressed worry at nearly identical rates, yet the mechanisms driving their concern diverged sharply. Republicans worried about cultural displacement, while Democrats focused on economic disruption."""
+
+HUMANIZED_TEXT = """\
+Education mattered. Not in the clean, linear way the textbooks promised -- the reality proved messier. Respondents holding bachelor's degrees showed markedly higher awareness, and that knowledge colored everything that followed.
+
+Why do Democrats and Republicans worry about AI at nearly identical rates yet for entirely different reasons? That puzzle drove much of our analysis. Same thermometer reading, different fevers."""
+
+TRICKY_TEXT = (
+    "Smith et al. (2020) found p = .001 and 0.45 effects. See Fig. 3 for details. "
+    "Dr. Who said e.g. this. (Jones, 2019.) The end is near. In contrast, we can't.\n\n"
+    "It is possible that this may work; in some cases it might not.\n\n"
+    "To some extent, we don't know. However, in fact, the point stands. In\n"
+    "contrast, I think we should ask why? (Unclosed paren. And more text here. Final words."
+)
+
+TEXTS = [SAMPLE_TEXT, HUMANIZED_TEXT, TRICKY_TEXT, "", "Too short."]
+
+
+def _chunks(text: str, size: int):
+    return (text[i:i + size] for i in range(0, len(text), size))
+
+
+# ============================================================================
+# 1. Safe cut points
+# ============================================================================
+
+
+class TestSafeCut:
+    def test_cuts_after_last_sentence_end(self):
+        text = "One two three. Four five six. Seven"
+        assert text[:_safe_cut(text)] == "One two three. Four five six."
+
+    def test_refuses_abbreviation_dots(self):
+        assert _safe_cut("As shown by Smith et al. the effect") == 0
+        assert _safe_cut("See Fig. 3 now") == 0
+
+    def test_refuses_cuts_inside_open_parenthesis(self):
+        text = "First sentence here. (Author. Another. Still open"
+        assert text[:_safe_cut(text)] == "First sentence here."
+
+    def test_no_cut_without_trailing_whitespace(self):
+        assert _safe_cut("Ends here.") == 0
+
+    def test_every_cut_in_one_pass(self):
+        for text in TEXTS:
+            expected = [c for c in range(1, len(text)) if _safe_cut(text[:c + 1]) == c]
+            assert list(_safe_cuts(text)) == expected
+
+
+# ============================================================================
+# 2. Equivalence with compute_all_metrics
+# ============================================================================
+
+
+class TestStreamingEquivalence:
+    @pytest.mark.parametrize("text", TEXTS)
+    @pytest.mark.parametrize("size", [1, 7, 100])
+    def test_matches_whole_text_analysis(self, text, size):
+        analyzer = StreamingAnalyzer(min_piece_chars=16)
+        for chunk in _chunks(text, size):
+            analyzer.feed(chunk)
+        assert analyzer.result() == compute_all_metrics(text)
+
+    def test_scoring_options_are_forwarded(self):
+        kwargs = {"pattern_score": 40, "non_native": True, "scoring_version": "v2"}
+        result = compute_all_metrics_stream(_chunks(SAMPLE_TEXT, 50), **kwargs)
+        assert result == compute_all_metrics(SAMPLE_TEXT, **kwargs)
+
+    def test_spilled_tokens_are_read_back_in_order(self, monkeypatch):
+        monkeypatch.setattr(streaming._TokenSpill, "_BLOCK", 5)
+        text = "\n\n".join([SAMPLE_TEXT, HUMANIZED_TEXT] * 3)
+        result = compute_all_metrics_stream(_chunks(text, 64), min_piece_chars=128)
+        assert result == compute_all_metrics(text)
+
+
+# ============================================================================
+# 3. Lifecycle and file input
+# ============================================================================
+
+
+class TestStreamingLifecycle:
+    def test_result_is_cached_and_feed_is_closed(self):
+        analyzer = StreamingAnalyzer()
+        analyzer.feed(SAMPLE_TEXT)
+        assert analyzer.result() is analyzer.result()
+        with pytest.raises(RuntimeError):
+            analyzer.feed("More text.")
+
+    def test_file_chunks(self, tmp_path):
+        path = tmp_path / "book.txt"
+        path.write_text(TRICKY_TEXT, encoding="utf-8")
+        chunks = list(iter_file_chunks(str(path), chunk_size=32))
+        assert "".join(chunks) == TRICKY_TEXT
+        assert all(len(c) <= 32 for c in chunks)
+        assert compute_all_metrics_stream(chunks) == compute_all_metrics(TRICKY_TEXT)
@@ -0,0 +1,144 @@
+"""
+Unit tests for humanizer_mcp.vocabulary — token interning and per-type records.
+
+Run with:
+    pytest tests/test_vocabulary.py -v
+"""
+
+import sys
+import threading
+
+from humanizer_mcp import vocabulary
+from humanizer_mcp.vocabulary import Vocabulary, current_vocabulary
+
+
+TOKENS = "the study found that the effect was not what the study expected".split()
+
+
+# ============================================================================
+# 1. Interning
+# ============================================================================
+
+
+class TestIntern:
+    def test_ids_round_trip(self):
+        vocab = Vocabulary()
+        ids = vocab.intern(TOKENS)
+        assert ids.typecode == "I"
+        assert len(ids) == len(TOKENS)
+        assert vocab.lookup(ids) == TOKENS
+        assert len(vocab) == len(set(TOKENS))
+
+    def test_ids_are_stable(self):
+        vocab = Vocabulary()
+        first = vocab.intern(TOKENS)
+        second = vocab.intern(reversed(TOKENS))
+        assert second.tolist() == first.tolist()[::-1]
+        assert len(vocab) == len(set(TOKENS))
+
+    def test_equal_tokens_share_an_id(self):
+        ids = Vocabulary().intern(TOKENS)
+        assert ids[0] == ids[4] == ids[9]
+        assert ids[0] != ids[1]
+
+    def test_concurrent_interning(self):
+        vocab = Vocabulary()
+        words = [f"w{i}" for i in range(2000)]
+        results = []
+
+        def work(offset):
+            results.append(vocab.intern(words[offset:] + words[:offset]))
+
+        threads = [threading.Thread(target=work, args=(i * 250,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(vocab) == len(words)
+        assert sorted(vocab.tokens) == sorted(words)
+        for ids in results:
+            assert sorted(vocab.lookup(ids)) == sorted(words)
+
+
+# ============================================================================
+# 2. Per-type records
+# ============================================================================
+
+
+class TestColumns:
+    def test_record_computed_once_per_type(self):
+        vocab = Vocabulary()
+        calls = []
+
+        def record(token):
+            calls.append(token)
+            return len(token), token.startswith("s")
+
+        ids = vocab.intern(TOKENS)
+        lengths, flags = vocab.columns("record", record, "IB")
+        assert [lengths[i] for i in ids] == [len(t) for t in TOKENS]
+        assert [flags[i] for i in ids] == [int(t.startswith("s")) for t in TOKENS]
+        assert vocab.columns("record", record, "IB")[0] is lengths
+        assert len(calls) == len(set(TOKENS))
+
+    def test_columns_grow_with_vocabulary(self):
+        vocab = Vocabulary()
+        vocab.intern(["a", "bb"])
+        vocab.columns("long", lambda t: (len(t) > 1,), "B")
+        ids = vocab.intern(["a", "bb", "ccc"])
+        (flags,) = vocab.columns("long", lambda t: (len(t) > 1,), "B")
+        assert len(flags) == 3
+        assert [flags[i] for i in ids] == [0, 1, 1]
+
+    def test_concurrent_readers_see_whole_records(self):
+        vocab = Vocabulary()
+        typecodes = "I" + "d" * 15
+        barrier = threading.Barrier(4)
+        errors = []
+
+        def record(token):
+            return (len(token),) + tuple(len(token) * k for k in range(2, 17))
+
+        def work():
+            for r in range(1000):
+                # One thread interns a new type, then all read it at once.
+                if barrier.wait() == 0:
+                    vocab.intern([f"type{r}"])
+                barrier.wait()
+                try:
+                    columns = vocab.columns("record", record, typecodes)
+                    i = len(vocab) - 1
+                    assert columns[-1][i] == 16 * columns[0][i]
+                except (AssertionError, IndexError) as exc:
+                    errors.append(exc)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=work) for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            sys.setswitchinterval(interval)
+        assert errors == []
+        columns = vocab.columns("record", record, typecodes)
+        assert {len(column) for column in columns} == {len(vocab)}
+
+
+# ============================================================================
+# 3. Process-wide vocabulary
+# ============================================================================
+
+
+class TestCurrentVocabulary:
+    def test_shared_until_full(self, monkeypatch):
+        monkeypatch.setattr(vocabulary, "_CURRENT", Vocabulary())
+        monkeypatch.setattr(vocabulary, "MAX_TYPES", 3)
+        vocab = current_vocabulary()
+        assert current_vocabulary() is vocab
+        vocab.intern(["a", "b", "c"])
+        fresh = current_vocabulary()
+        assert fresh is not vocab
+        assert len(fresh) == 0